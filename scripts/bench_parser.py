@@ -0,0 +1,439 @@
+"""
+Golden-corpus benchmark and equivalence suite for the shared Telegram parser (tg_parser).
+
+Replays the sample corpora checked into the repo root through every parser variant:
+    legacy   - the pre-tg_parser crawler parsers, frozen in legacy_parsers.py
+    markdown - parse_text on Telethon-style markdown (`message.text`)
+    raw      - parse_raw on raw text + entity offsets (`message.message`)
+    router   - FormatRouter.parse_raw, with the format learned per source chat
+    pool     - tg_parser.batch pages on a process pool (--workers)
+
+For each variant it reports messages/sec (optionally over a synthetic corpus scaled to
+millions of messages) and tracemalloc allocations for one pass. It then diffs id /
+is_reply / created_at of every tg_parser variant against the raw one, and the raw
+output against parser_golden.json. Any difference makes the script exit non-zero.
+
+parser_golden.json holds what the legacy parsers return ("messages"), so the shared
+parser is checked against the code it replaced, not against itself. Where tg_parser
+is meant to differ, the expected output is listed under "deviations" with the
+reason. --update-golden regenerates "messages" from the legacy parsers and keeps the
+deviations. --accept REASON records every remaining difference under REASON.
+
+Corpus sources:
+    elon_tweets_sample.json, elon_final_sample.json  - alert messages (raw_text)
+    test_channel_output.json                          - alert messages (text)
+    parser_golden.json "cases"                        - hand-written alert headers (text), e.g.
+                                                        other accounts replying to or quoting Elon
+    every sample row with a tweet_id                  - synthesized ElonTweetsD messages
+tweet_sample.json is a PowerShell response dump, not JSON, and is skipped.
+
+It also times the ElonTweetsD "Posted at:" decoder against the previous
+regex + strptime + datetime bucketing path and checks both give the same values.
+
+Usage:
+    python scripts/bench_parser.py                        # 200 passes over the corpus
+    python scripts/bench_parser.py 2000                   # more passes for steadier numbers
+    python scripts/bench_parser.py --messages 2000000     # synthetic scaling
+    python scripts/bench_parser.py --variants raw,router --workers 8
+    python scripts/bench_parser.py --update-golden        # after the corpus changed
+    python scripts/bench_parser.py --accept "why"         # after an intended output change
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+
+from tg_parser import FormatRouter, TextEntity, decode_posted_at, parse_raw, parse_text
+from tg_parser.batch import PAGE_SIZE, parse_payload
+from tg_parser.entities import BOLD, CODE, TEXT_URL
+from tg_parser.patterns import DBOT_MARKER, RE_POSTED_AT, RE_WHITESPACE
+from legacy_parsers import parse_legacy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GOLDEN_PATH = os.path.join(ROOT, 'parser_golden.json')
+
+DBOT_TEMPLATE = """🚨🚨🚨
+**{kind}** from Elon Musk(@elonmusk)
+{content}
+
+Posted at: {posted_at}
+Link: https://x.com/elonmusk/status/{tweet_id}
+"""
+
+# Date for the hand-written cases in parser_golden.json
+CASE_TS = 1768287354
+# Message ids for sample rows that don't record one (elon_final_sample.json)
+SYNTHETIC_MSG_ID = 10_000_000
+# Synthetic scaling: each copy of the corpus gets its own message ids and a later date
+SCALE_MSG_ID_STEP = 100_000_000
+SCALE_TS_STEP = 3600
+
+VARIANTS = ("legacy", "markdown", "raw", "router", "pool")
+DIFF_FIELDS = ("id", "is_reply", "created_at")
+
+
+RE_MARKDOWN = re.compile(r"\[(.+?)\]\((\S+?)\)|\*\*(.+?)\*\*|`(.+?)`")
+
+
+def utf16_len(text):
+    return len(text.encode('utf-16-le')) // 2
+
+
+def markdown_to_raw(md):
+    """Undo Telethon's markdown rendering: (raw_text, entities) with UTF-16 offsets."""
+    parts = []
+    entities = []
+    pos = 0
+    last = 0
+    for m in RE_MARKDOWN.finditer(md):
+        before = md[last:m.start()]
+        parts.append(before)
+        pos += utf16_len(before)
+        link_text, url, bold, code = m.groups()
+        if link_text is not None:
+            inner = link_text
+            is_bold = len(inner) > 4 and inner.startswith('**') and inner.endswith('**')
+            if is_bold:
+                inner = inner[2:-2]
+            length = utf16_len(inner)
+            entities.append(TextEntity(TEXT_URL, pos, length, url))
+            if is_bold:
+                entities.append(TextEntity(BOLD, pos, length))
+        elif bold is not None:
+            inner = bold
+            length = utf16_len(inner)
+            entities.append(TextEntity(BOLD, pos, length))
+        else:
+            inner = code
+            length = utf16_len(inner)
+            entities.append(TextEntity(CODE, pos, length))
+        parts.append(inner)
+        pos += length
+        last = m.end()
+    parts.append(md[last:])
+    return "".join(parts), tuple(entities)
+
+
+def load_json(name):
+    with open(os.path.join(ROOT, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_cases():
+    """[msg_id, markdown text] alert headers kept in parser_golden.json next to the golden output."""
+    if not os.path.exists(GOLDEN_PATH):
+        return []
+    return load_json(GOLDEN_PATH).get("cases", [])
+
+
+def dbot_message(row):
+    dt = datetime.fromisoformat(row['tg_date'])
+    return DBOT_TEMPLATE.format(
+        kind="Reply" if row['tweet_type'] == "reply" else "Tweeted",
+        content=row['content'],
+        posted_at=dt.strftime("%a, %d %b %Y %H:%M:%S GMT"),
+        tweet_id=row['tweet_id'],
+    )
+
+
+def load_corpus():
+    """(text, msg_id, created_at, chat) tuples from the checked-in samples, plus dbot-format copies."""
+    corpus = []
+    dbot_ids = set()
+
+    def add_dbot(row, msg_id, ts):
+        if row.get('tweet_id') and row['tweet_id'] not in dbot_ids:
+            dbot_ids.add(row['tweet_id'])
+            corpus.append((dbot_message(row), msg_id, ts, 'ElonTweets_dBot'))
+
+    for row in load_json('elon_tweets_sample.json'):
+        ts = int(datetime.fromisoformat(row['tg_date']).timestamp())
+        corpus.append((row['raw_text'], row['tg_message_id'], ts, 'elonvitalikalerts'))
+        add_dbot(row, row['tg_message_id'], ts)
+    for i, row in enumerate(load_json('elon_final_sample.json')):
+        ts = int(datetime.fromisoformat(row['tg_date']).timestamp())
+        corpus.append((row['raw_text'], SYNTHETIC_MSG_ID + i, ts, 'elonvitalikalerts'))
+        add_dbot(row, SYNTHETIC_MSG_ID + i, ts)
+    for name in ('elon_filtered_sample.json', 'elon_with_links.json'):
+        for i, row in enumerate(load_json(name)):
+            ts = int(datetime.fromisoformat(row['tg_date']).timestamp())
+            add_dbot(row, row.get('tg_message_id') or SYNTHETIC_MSG_ID + i, ts)
+    for row in load_json('test_channel_output.json'):
+        ts = int(datetime.fromisoformat(row['date']).timestamp())
+        corpus.append((row['text'], row['id'], ts, 'test_channel'))
+    for msg_id, text in load_cases():
+        corpus.append((text, msg_id, CASE_TS, 'elonvitalikalerts'))
+    return corpus
+
+
+def build_messages(corpus):
+    """(markdown, raw, entities, msg_id, created_at, chat) for every corpus message."""
+    return [(text, *markdown_to_raw(text), msg_id, ts, chat) for text, msg_id, ts, chat in corpus]
+
+
+def scaled(messages, count):
+    """count messages cycling over the corpus; every copy gets new message ids and dates."""
+    copy = 0
+    while count > 0:
+        shift_id = copy * SCALE_MSG_ID_STEP
+        shift_ts = copy * SCALE_TS_STEP
+        for md, raw, entities, msg_id, ts, chat in islice(messages, count):
+            yield md, raw, entities, msg_id + shift_id, ts + shift_ts, chat
+        count -= len(messages)
+        copy += 1
+
+
+# --- variants: each maps an iterable of messages to an iterator of results (None for non-tweets) ---
+
+def run_legacy(messages, workers):
+    """[id, is_reply, created_at] lists (not ParsedTweets) from the baseline parsers."""
+    return (parse_legacy(md, msg_id, ts, entities) for md, _, entities, msg_id, ts, _ in messages)
+
+
+def run_markdown(messages, workers):
+    return (parse_text(md, msg_id, ts) for md, _, _, msg_id, ts, _ in messages)
+
+
+def run_raw(messages, workers):
+    return (parse_raw(raw, msg_id, ts, entities) for _, raw, entities, msg_id, ts, _ in messages)
+
+
+def run_router(messages, workers):
+    router = FormatRouter()
+    return (router.parse_raw(chat, raw, msg_id, ts, entities) for _, raw, entities, msg_id, ts, chat in messages)
+
+
+def parse_payload_page(page):
+    """Like tg_parser.batch.parse_page, but keeps None results so outputs line up for diffing."""
+    return list(map(parse_payload, page))
+
+
+def payload_pages(messages):
+    page = []
+    for _, raw, entities, msg_id, ts, _ in messages:
+        page.append((raw, msg_id, ts, entities, None))
+        if len(page) == PAGE_SIZE:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+def run_pool(messages, workers):
+    with ProcessPoolExecutor(workers) as pool:
+        for page_results in pool.map(parse_payload_page, payload_pages(messages)):
+            yield from page_results
+
+
+RUNNERS = {
+    "legacy": run_legacy,
+    "markdown": run_markdown,
+    "raw": run_raw,
+    "router": run_router,
+    "pool": run_pool,
+}
+
+
+def bench_variant(run, messages, count, workers):
+    start = time.perf_counter()
+    parsed = sum(1 for r in run(scaled(messages, count), workers) if r)
+    return parsed, time.perf_counter() - start
+
+
+def measure_allocations(run, messages, workers):
+    """(peak bytes, bytes still held by the results) for one pass; pool workers are not traced."""
+    tracemalloc.start()
+    results = list(run(messages, workers))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del results
+    return peak, current
+
+
+def report(mode, parsed, elapsed, total):
+    print(f"⏱️  {mode:<8} {elapsed:.3f}s | {total / elapsed:,.0f} msgs/sec | {elapsed / total * 1e6:.2f} µs/msg"
+          f" | {parsed:,}/{total:,} parsed")
+
+
+# --- equivalence ---
+
+def key_fields(parsed):
+    return None if parsed is None else [getattr(parsed, field) for field in DIFF_FIELDS]
+
+
+def diff_results(name, results, reference, messages, limit=5):
+    diffs = [i for i, (a, b) in enumerate(zip(results, reference)) if key_fields(a) != key_fields(b)]
+    for i in diffs[:limit]:
+        print(f"   ❌ {name} #{i} (msg {messages[i][3]}): {key_fields(results[i])} != {key_fields(reference[i])}")
+    return len(diffs)
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def golden_entries(messages, fields):
+    return [[msg_id, text_hash(raw), f] for (_, raw, _, msg_id, _, _), f in zip(messages, fields)]
+
+
+def load_golden():
+    if not os.path.exists(GOLDEN_PATH):
+        return None
+    return load_json(GOLDEN_PATH)
+
+
+def write_golden(messages, deviations):
+    """Regenerate "messages" from the legacy parsers; keep "cases" and the given deviations."""
+    golden = {
+        "fields": list(DIFF_FIELDS),
+        "cases": load_cases(),
+        "deviations": deviations,
+        "messages": golden_entries(messages, run_legacy(messages, 0)),
+    }
+    with open(GOLDEN_PATH, 'w', encoding='utf-8') as f:
+        json.dump(golden, f, indent=1, ensure_ascii=False)
+    print(f"💾 Wrote {len(messages)} legacy golden entries to {os.path.basename(GOLDEN_PATH)}")
+
+
+def expected_fields(golden):
+    """(msg_id, text hash) -> fields tg_parser should return: the legacy output unless a deviation says otherwise."""
+    expected = {(msg_id, digest): fields for msg_id, digest, fields in golden["messages"]}
+    for deviation in golden.get("deviations", []):
+        for msg_id, digest, fields in deviation["messages"]:
+            expected[(msg_id, digest)] = fields
+    return expected
+
+
+def check_golden(messages, results, limit=5):
+    """Number of messages whose output differs from parser_golden.json (-1 if missing or stale)."""
+    golden = load_golden()
+    if golden is None:
+        print("⚠️  No parser_golden.json yet, run with --update-golden")
+        return -1
+    actual = golden_entries(messages, map(key_fields, results))
+    if golden["fields"] != list(DIFF_FIELDS) or [e[:2] for e in golden["messages"]] != [a[:2] for a in actual]:
+        print("⚠️  parser_golden.json does not match the corpus (samples changed?), run with --update-golden")
+        return -1
+    expected = expected_fields(golden)
+    diffs = [a for a in actual if expected[tuple(a[:2])] != a[2]]
+    for msg_id, digest, fields in diffs[:limit]:
+        print(f"   ❌ golden (msg {msg_id}, {digest}): {fields} != {expected[(msg_id, digest)]}")
+    deviating = sum(len(d["messages"]) for d in golden.get("deviations", []))
+    print(f"   golden   vs raw: {len(diffs)} differences ({deviating} documented deviations from the legacy parsers)")
+    return len(diffs)
+
+
+def accept_differences(messages, results, reason):
+    """Record every raw output that differs from the golden expectation as a deviation with this reason."""
+    golden = load_golden()
+    expected = expected_fields(golden)
+    accepted = [a for a in golden_entries(messages, map(key_fields, results)) if expected[tuple(a[:2])] != a[2]]
+    if accepted:
+        golden["deviations"].append({"reason": reason, "messages": accepted})
+    write_golden(messages, golden["deviations"])
+    print(f"📝 Accepted {len(accepted)} differences: {reason}")
+
+
+# --- "Posted at:" decoder ---
+
+def strptime_posted_at(text):
+    """The pre-decoder path: regex, whitespace cleanup, strptime, then datetime ET buckets."""
+    time_match = RE_POSTED_AT.search(text)
+    if not time_match:
+        return None
+    time_str = RE_WHITESPACE.sub(' ', time_match.group(1).strip())
+    try:
+        dt = datetime.strptime(time_str, "%a, %d %b %Y %H:%M:%S %Z")
+    except ValueError:
+        return None
+    dt = dt.replace(tzinfo=timezone.utc)
+    et = dt.astimezone(timezone(timedelta(hours=-5)))
+    return int(dt.timestamp()), et.strftime('%Y-%m-%d'), et.strftime('%H:00')
+
+
+def bench_posted_at(decode, texts, passes):
+    decoded = 0
+    start = time.perf_counter()
+    for _ in range(passes):
+        for text in texts:
+            if decode(text):
+                decoded += 1
+    return decoded, time.perf_counter() - start
+
+
+def check_posted_at(texts):
+    mismatches = [text for text in texts if strptime_posted_at(text) != decode_posted_at(text)]
+    for text in mismatches[:5]:
+        print(f"❌ Posted at mismatch: {text!r}")
+    return len(mismatches)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Golden-corpus benchmark and equivalence suite for tg_parser.")
+    parser.add_argument('passes', nargs='?', type=int, default=200, help="passes over the corpus (default 200)")
+    parser.add_argument('--messages', type=int, help="total messages per variant (synthetic scaling), overrides passes")
+    parser.add_argument('--variants', default=",".join(VARIANTS), help="comma-separated subset of " + ", ".join(VARIANTS))
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2, help="process count for the pool variant")
+    parser.add_argument('--update-golden', action='store_true', help="regenerate parser_golden.json from the legacy parsers")
+    parser.add_argument('--accept', metavar='REASON', help="record the remaining raw vs golden differences as deviations")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    variants = [v for v in args.variants.split(',') if v]
+    unknown = set(variants) - set(RUNNERS)
+    if unknown:
+        print(f"❌ Unknown variants: {', '.join(sorted(unknown))}")
+        return 2
+
+    messages = build_messages(load_corpus())
+    total = args.messages or len(messages) * args.passes
+    print(f"📚 Corpus: {len(messages)} messages, {total:,} per variant")
+
+    for name in variants:
+        report(name, *bench_variant(RUNNERS[name], messages, total, args.workers), total)
+
+    print(f"\n🧮 Allocations (one pass, {len(messages)} messages)")
+    for name in variants:
+        peak, held = measure_allocations(RUNNERS[name], messages, args.workers)
+        print(f"   {name:<8} peak {peak / 1024:,.1f} KiB | results {held / len(messages):,.0f} B/msg")
+
+    print(f"\n🔍 Equivalence on {', '.join(DIFF_FIELDS)}")
+    reference = list(run_raw(messages, args.workers))
+    failures = 0
+    for name in variants:
+        if name not in ("raw", "legacy"):
+            diffs = diff_results(name, list(RUNNERS[name](messages, args.workers)), reference, messages)
+            print(f"   {name:<8} vs raw: {diffs} differences")
+            failures += diffs
+    if args.update_golden:
+        golden = load_golden()
+        write_golden(messages, golden.get("deviations", []) if golden else [])
+    if args.accept:
+        accept_differences(messages, reference, args.accept)
+    failures += abs(check_golden(messages, reference))
+
+    dbot_texts = [raw for _, raw, _, _, _, _ in messages if DBOT_MARKER in raw]
+    posted_at_diffs = check_posted_at(dbot_texts)
+    failures += posted_at_diffs
+    print(f"\n🕒 Posted at: {len(dbot_texts)} ElonTweetsD messages, {posted_at_diffs} mismatches")
+    report("strptime", *bench_posted_at(strptime_posted_at, dbot_texts, args.passes), len(dbot_texts) * args.passes)
+    report("decoder", *bench_posted_at(decode_posted_at, dbot_texts, args.passes), len(dbot_texts) * args.passes)
+
+    if failures:
+        print(f"\n❌ {failures} output differences, parser output changed")
+        return 1
+    print("\n✅ All variants match")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
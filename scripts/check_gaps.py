@@ -1,7 +1,22 @@
+"""
+Find (and optionally repair) gaps in cached_tweets.
+
+Usage:
+    python scripts/check_gaps.py                  # report suspicious gaps over the whole timeline
+    python scripts/check_gaps.py --repair         # also fetch each gap window from Telegram and upsert what was missing
+    python scripts/check_gaps.py --min-gap 4      # gaps longer than 4 hours (default 6)
+    python scripts/check_gaps.py --min-expected 1 # also gaps where the hourly profile predicts just 1 tweet (default 3, fractions allowed)
+"""
 import os
+import sys
+import asyncio
 from datetime import datetime, timezone
+from telethon import TelegramClient
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from tg_sync import ALERT_SOURCES, RequestScheduler, adjust_heatmap
+from tg_sync.cli import float_from_argv
+from tg_sync.gaps import MIN_EXPECTED, MIN_GAP_HOURS, fetch_missing, find_gaps, known_ids, load_timeline
 
 load_dotenv('.env.local')
 
@@ -12,46 +27,66 @@ SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-def check_continuity():
+def check_continuity(max_gap_hours=MIN_GAP_HOURS, min_expected=MIN_EXPECTED):
     print("🔍 Checking for data gaps in cached_tweets...")
     
-    # Fetch all tweet timestamps ordered chronologically
-    # 2000 limit should cover the transition period easily (since we have ~1000 total or so)
-    res = supabase.from_('cached_tweets').select('created_at, id').order('created_at', desc=True).limit(2000).execute()
-    
-    tweets = res.data
-    tweets.sort(key=lambda x: x['created_at']) # Sort oldest to newest
+    # Whole timeline, oldest first, as one int64 array
+    timeline = load_timeline(supabase)
     
-    if not tweets:
+    if not timeline:
         print("No tweets found.")
-        return
-
-    print(f"Total tweets: {len(tweets)}")
-    print(f"Oldest: {datetime.fromtimestamp(tweets[0]['created_at'], tz=timezone.utc)}")
-    print(f"Newest: {datetime.fromtimestamp(tweets[-1]['created_at'], tz=timezone.utc)}")
-
-    # Check for gaps > 6 hours
-    max_gap_hours = 6
-    gaps_found = 0
+        return []
+    
+    print(f"Total tweets: {len(timeline)}")
+    print(f"Oldest: {datetime.fromtimestamp(timeline[0], tz=timezone.utc)}")
+    print(f"Newest: {datetime.fromtimestamp(timeline[-1], tz=timezone.utc)}")
+    
+    # Gaps > max_gap_hours that the hour-of-day profile says should have held tweets
+    gaps = find_gaps(timeline, max_gap_hours, min_expected)
+    for gap in gaps:
+        print(f"⚠️ Gap found: {gap.describe()}")
     
-    for i in range(1, len(tweets)):
-        prev = tweets[i-1]
-        curr = tweets[i]
-        
-        diff_seconds = curr['created_at'] - prev['created_at']
-        diff_hours = diff_seconds / 3600.0
-        
-        if diff_hours > max_gap_hours:
-            t1 = datetime.fromtimestamp(prev['created_at'], tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
-            t2 = datetime.fromtimestamp(curr['created_at'], tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
-            print(f"⚠️ Gap found: {diff_hours:.2f} hours")
-            print(f"   Between {t1} and {t2}")
-            gaps_found += 1
-            
-    if gaps_found == 0:
+    if not gaps:
         print("✅ No significant gaps found. Data is continuous.")
     else:
-        print(f"❌ Found {gaps_found} gaps > {max_gap_hours} hours.")
+        print(f"❌ Found {len(gaps)} gaps > {max_gap_hours} hours.")
+    return gaps
+
+
+async def repair_gaps(gaps):
+    """Fetch only each gap's window from every alert source and upsert the tweets that were missing."""
+    client = RequestScheduler(TelegramClient('elon_crawler_session', API_ID, API_HASH))
+    await client.start()
+    
+    repaired = 0
+    for i, gap in enumerate(gaps, 1):
+        print(f"\n🩹 Gap {i}/{len(gaps)}: {gap.describe()}")
+        missing = await fetch_missing(client, ALERT_SOURCES, gap, known_ids(supabase, gap))
+        if not missing:
+            print("   ✅ Nothing missing (a genuinely quiet period)")
+            continue
+        try:
+            supabase.table('cached_tweets').upsert([parsed.to_row() for parsed in missing]).execute()
+        except Exception as e:
+            print(f"   ⚠️ Error saving {len(missing)} tweets: {e}")
+            continue
+        # New rows only, so the heatmap just needs +1 per tweet
+        for parsed in missing:
+            try:
+                adjust_heatmap(supabase, parsed, 1)
+            except Exception as e:
+                print(f"   ⚠️ Heatmap update failed for {parsed.id}: {e}")
+        repaired += len(missing)
+        print(f"   ✅ Filled {len(missing)} missing tweets")
+    
+    print(f"\n🎉 Repaired {repaired} tweets across {len(gaps)} gaps ({client.summary()})")
+    await client.disconnect()
+
 
 if __name__ == '__main__':
-    check_continuity()
+    gaps = check_continuity(
+        float_from_argv(sys.argv, '--min-gap', MIN_GAP_HOURS),
+        float_from_argv(sys.argv, '--min-expected', MIN_EXPECTED),
+    )
+    if gaps and "--repair" in sys.argv:
+        asyncio.run(repair_gaps(gaps))
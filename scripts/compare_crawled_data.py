@@ -8,50 +8,17 @@ This script will:
 import os
 import asyncio
 import json
-import re
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 from collections import defaultdict
-from telethon import TelegramClient, types
+from telethon import TelegramClient
 from dotenv import load_dotenv
+from tg_parser import parse_message
 
 load_dotenv('.env.local')
 
 API_ID = os.getenv('TG_API_ID')
 API_HASH = os.getenv('TG_API_HASH')
 
-# Eastern Time offset (UTC-5 for standard, ignoring DST for simplicity)
-ET_OFFSET = timedelta(hours=-5)
-
-def parse_elon_message(message):
-    text = message.text
-    if not text: return None
-    
-    if '**elonmusk**' not in text and '[elonmusk]' not in text:
-        return None
-    
-    tweet_type = None
-    if '`Retweeted`' in text:
-        tweet_type = "retweet"
-    elif '**Quoted**' in text:
-        tweet_type = "quote"
-    elif '`Replied To`' in text:
-        tweet_type = "reply"
-    elif 'Tweeted' in text and 'Retweeted' not in text:
-        tweet_type = "original"
-    
-    if not tweet_type: return None
-    
-    # Convert to ET
-    utc_time = message.date.replace(tzinfo=timezone.utc)
-    et_time = utc_time + ET_OFFSET
-    
-    return {
-        "tweet_type": tweet_type,
-        "et_time": et_time,
-        "date_str": et_time.strftime("%b %d"),  # e.g., "Jan 06"
-        "hour_str": et_time.strftime("%H:00"),  # e.g., "09:00"
-    }
-
 async def main():
     print("🚀 Connecting to Telegram...")
     client = TelegramClient('elon_crawler_session', API_ID, API_HASH)
@@ -66,12 +33,11 @@ async def main():
     
     count = 0
     async for message in client.iter_messages(channel, limit=5000):  # Start with 5000 for testing
-        parsed = parse_elon_message(message)
+        parsed = parse_message(message)
         if parsed:
-            date_str = parsed["date_str"]
-            hour_str = parsed["hour_str"]
+            _, hour_str, date_str = parsed.buckets()
             
-            if parsed["tweet_type"] == "reply":
+            if parsed.is_reply:
                 stats[date_str][hour_str]["reply"] += 1
             else:
                 stats[date_str][hour_str]["tweet"] += 1
@@ -1,13 +1,28 @@
 """
 Complete database reset and re-crawl with date validation.
+
+Usage:
+    python scripts/complete_reset.py               # parse inline
+    python scripts/complete_reset.py --workers 4   # parse pages on 4 processes while fetching
+    python scripts/complete_reset.py --shards 8    # crawl 8 time ranges of the window in parallel
+    python scripts/complete_reset.py --stream      # upsert while crawling, bounded memory
+    python scripts/complete_reset.py --takeout     # bulk-export history through a takeout session (lenient limits)
+    python scripts/complete_reset.py --shards 16 --sessions elon_crawler_session,second_session   # split across accounts
 """
 import os
+import sys
 import asyncio
-import re
 from datetime import datetime, timedelta, timezone
-from telethon import TelegramClient, types
+from telethon import TelegramClient
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from tg_parser import TweetBatch
+from tg_parser.batch import BatchParser
+from tg_parser.timeutil import et_year_bounds
+from tg_sync import (IngestPipeline, RequestScheduler, SessionPool, crawl_sharded, iter_sharded, pool_specs, since_date,
+                     takeout_session)
+from tg_sync.cli import int_from_argv, workers_from_argv
+from tg_sync.takeout import takeout_delay_seconds
 
 load_dotenv('.env.local')
 
@@ -18,100 +33,39 @@ SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
 
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Eastern Time offset (UTC-5)
-ET_OFFSET_HOURS = -5
-
-# Reference period start
-REF_PERIOD_START = 1766509200
-
-def get_period_start(timestamp):
-    diff = timestamp - REF_PERIOD_START
-    weeks = diff // (7 * 24 * 3600)
-    return REF_PERIOD_START + (weeks * 7 * 24 * 3600)
-
-def parse_elon_message(message):
-    text = message.text
-    if not text: return None
-    
-    if '**elonmusk**' not in text and '[elonmusk]' not in text:
-        return None
-    
-    tweet_type = None
-    if '`Retweeted`' in text:
-        tweet_type = "retweet"
-    elif '**Quoted**' in text:
-        tweet_type = "quote"
-    elif '`Replied To`' in text:
-        tweet_type = "reply"
-    elif 'Tweeted' in text and 'Retweeted' not in text:
-        tweet_type = "original"
-    
-    if not tweet_type: return None
-    
-    # Link Extraction
-    tweet_link = None
-    tweet_id = None
-    
-    if message.entities:
-        for entity in message.entities:
-            if isinstance(entity, types.MessageEntityTextUrl):
-                if any(x in entity.url for x in ['fxtwitter.com', 'x.com', 'twitter.com']):
-                    tweet_link = entity.url
-                    break
-    
-    if not tweet_link:
-        link_match = re.search(r'https://(?:fxtwitter\.com|x\.com|twitter\.com)/(\w+)/status/(\d+)', text)
-        if link_match: tweet_link = link_match.group(0)
-            
-    if not tweet_link and message.media and hasattr(message.media, 'webpage'):
-        wp = message.media.webpage
-        if wp and hasattr(wp, 'url') and wp.url and any(x in wp.url for x in ['fxtwitter.com', 'x.com', 'twitter.com']):
-            if '/status/' in wp.url: tweet_link = wp.url
-
-    if tweet_link:
-        id_match = re.search(r'status/(\d+)', tweet_link)
-        if id_match: tweet_id = id_match.group(1)
-    
-    if not tweet_id:
-        tweet_id = f"tg_{message.id}"
-
-    # Content extraction
-    lines = text.split('\n')
-    content_lines = []
-    for i, line in enumerate(lines):
-        if i == 0: continue
-        clean_line = line.strip()
-        if clean_line: content_lines.append(clean_line)
-    
-    content = '\n'.join(content_lines)
-    
-    # CRITICAL: Use message.date directly - it has correct year/month/day
-    msg_date = message.date  # This is UTC datetime with correct year
-    unix_ts = int(msg_date.timestamp())
-    
-    # Convert to ET by subtracting 5 hours
-    et_datetime = msg_date + timedelta(hours=ET_OFFSET_HOURS)
-    
-    return {
-        "id": tweet_id,
-        "tweet_type": tweet_type,
-        "is_reply": tweet_type == "reply",
-        "content": content,
-        "unix_ts": unix_ts,
-        "date_str": et_datetime.strftime("%b %d"),        # e.g., "Oct 31"
-        "date_normalized": et_datetime.strftime("%Y-%m-%d"),  # e.g., "2025-10-31"
-        "hour": et_datetime.strftime("%H:00"),
-        "period_start": get_period_start(unix_ts),
-        "tweet_link": tweet_link,
-        # For debugging
-        "_raw_date": str(msg_date),
-        "_et_date": str(et_datetime)
-    }
-
 async def main():
     print("🔄 COMPLETE DATABASE RESET AND RE-CRAWL")
     print("="*60)
     
+    # Paces history requests and sleeps through FloodWaits instead of dying on them
+    # --sessions / TG_SESSION_STRINGS: several accounts share the crawl, a FloodWait moves the cursor
+    specs = pool_specs(sys.argv)
+    if specs:
+        client = SessionPool.from_specs(specs, API_ID, API_HASH)
+        print(f"👥 Session pool: {client.size} accounts")
+    else:
+        client = RequestScheduler(TelegramClient('elon_crawler_session', API_ID, API_HASH))
+    await client.start()
+    
+    if "--takeout" in sys.argv:
+        # Opened before anything is deleted, so a refused export leaves the tables intact
+        print("\n📦 Opening a takeout session for the bulk export...")
+        try:
+            # A takeout belongs to one account: with a session pool, the first one exports
+            async with takeout_session(getattr(client, 'primary', client)) as history:
+                await reset_and_crawl(history)
+        except Exception as e:
+            seconds = takeout_delay_seconds(e)
+            if seconds is None:
+                raise
+            print(f"   ❌ Telegram delayed the export by {seconds}s. Allow it from another logged-in device, "
+                  f"then rerun (or run without --takeout). Nothing was deleted.")
+    else:
+        await reset_and_crawl(client)
+    
+    await client.disconnect()
+
+async def reset_and_crawl(client):
     # Step 1: Delete ALL data from tables
     print("\n🗑️ Step 1: Clearing ALL data from tables...")
     
@@ -129,10 +83,8 @@ async def main():
     except Exception as e:
         print(f"   ⚠️ cached_tweets error: {e}")
     
-    # Step 2: Connect to Telegram
-    print("\n📡 Step 2: Connecting to Telegram...")
-    client = TelegramClient('elon_crawler_session', API_ID, API_HASH)
-    await client.start()
+    # Step 2: Telegram (already connected; a takeout session when --takeout)
+    print(f"\n📡 Step 2: Fetching history via {'takeout export' if '--takeout' in sys.argv else 'iter_messages'}...")
     
     channel = 'elonvitalikalerts'
     
@@ -143,90 +95,97 @@ async def main():
     # Step 3: Crawl with validation
     print("\n📥 Step 3: Crawling messages with date validation...")
     
-    tweets_data = []
-    heatmap_data = {}
+    valid_from, valid_until = et_year_bounds(2025, 2026)
+    
+    def is_valid(parsed):
+        # VALIDATION: Check year is reasonable (2025 or 2026 only)
+        if not valid_from <= parsed.created_at < valid_until:
+            print(f"   ⚠️ Invalid year {parsed.buckets()[0][:4]} for message, skipping...")
+            return False
+        return True
     
-    count = 0
-    skipped = 0
+    shards = int_from_argv(sys.argv, '--shards')
+    workers = workers_from_argv(sys.argv)
+    if shards:
+        print(f"   🧩 Sharded crawl: {shards} time ranges")
+    
+    batch_size = 100
     
-    async for message in client.iter_messages(channel, limit=50000):
-        if message.date < six_months_ago:
-            print(f"   ⏹️ Reached 6-month boundary at {message.date}")
-            break
+    if "--stream" in sys.argv:
+        # Validated tweets are upserted while the crawl runs; only the hourly heatmap counters are kept
+        print("   🌊 Streaming ingest: fetch, parse, validate and upsert run concurrently")
+        if shards:
+            source = iter_sharded(client, channel, six_months_ago, datetime.now(timezone.utc), shards=shards)
+        else:
+            source = since_date(client.iter_messages(channel, limit=50000), six_months_ago)
         
-        parsed = parse_elon_message(message)
-        if parsed:
-            # VALIDATION: Check year is reasonable (2025 or 2026 only)
-            year = int(parsed["date_normalized"][:4])
-            if year < 2025 or year > 2026:
-                print(f"   ⚠️ Invalid year {year} for message, skipping...")
+        def write(tweets):
+            supabase.table('cached_tweets').upsert([parsed.to_row() for parsed in tweets]).execute()
+        
+        ingest = await IngestPipeline(write, parser=BatchParser(workers), validate=is_valid,
+                                      batch_size=batch_size).run(source)
+        print(f"\n   ✅ Saved {ingest.written} tweets ({ingest.failed} failed)")
+        print(f"   ⚠️ Skipped: {ingest.invalid} invalid")
+        heatmap_records = ingest.heatmap.rows()
+    else:
+        # Columnar store (int ids/timestamps/type codes); the heatmap is aggregated from it after the crawl
+        tweets_data = TweetBatch()
+        skipped = 0
+        
+        def add_tweet(parsed):
+            nonlocal skipped
+            if not is_valid(parsed):
                 skipped += 1
-                continue
-            
-            tweets_data.append(parsed)
+                return
             
-            key = (parsed["date_normalized"], parsed["hour"])
-            if key not in heatmap_data:
-                heatmap_data[key] = {"tweet_count": 0, "reply_count": 0, "date_str": parsed["date_str"]}
+            if not tweets_data.append(parsed):
+                return
             
-            if parsed["is_reply"]:
-                heatmap_data[key]["reply_count"] += 1
-            else:
-                heatmap_data[key]["tweet_count"] += 1
-            
-            count += 1
+            if len(tweets_data) % 500 == 0:
+                date_norm, _, date_str = parsed.buckets()
+                raw_date = datetime.fromtimestamp(parsed.created_at, timezone.utc)
+                print(f"   #{len(tweets_data)}: {date_norm} ({date_str}) - raw: {str(raw_date)[:10]}")
+        
+        if shards:
+            for parsed in await crawl_sharded(client, channel, six_months_ago, datetime.now(timezone.utc), shards=shards):
+                add_tweet(parsed)
+        else:
+            async with BatchParser(workers) as parser:
+                async for message in since_date(client.iter_messages(channel, limit=50000), six_months_ago):
+                    for parsed in await parser.feed(message):
+                        add_tweet(parsed)
+                for parsed in await parser.flush():
+                    add_tweet(parsed)
+        
+        print(f"\n   ✅ Crawled: {len(tweets_data)} tweets")
+        print(f"   ⚠️ Skipped: {skipped} invalid, {tweets_data.skipped} without an id")
+        
+        # Step 4: Show date range before saving
+        if tweets_data:
+            newest = tweets_data[0].buckets()[0]
+            oldest = tweets_data[-1].buckets()[0]
+            print(f"\n📅 Date range: {oldest} to {newest}")
+        
+        # Step 5: Save to Supabase
+        print("\n💾 Step 4: Saving to Supabase...")
+        
+        # Save tweets
+        print("   Saving tweets...")
+        for i in range(0, len(tweets_data), batch_size):
+            records = tweets_data.rows(i, i+batch_size)
             
-            if count % 500 == 0:
-                sample = parsed
-                print(f"   #{count}: {sample['date_normalized']} ({sample['date_str']}) - raw: {sample['_raw_date'][:10]}")
-    
-    print(f"\n   ✅ Crawled: {count} tweets")
-    print(f"   ⚠️ Skipped: {skipped} invalid")
-    
-    # Step 4: Show date range before saving
-    if tweets_data:
-        newest = tweets_data[0]["date_normalized"]
-        oldest = tweets_data[-1]["date_normalized"]
-        print(f"\n📅 Date range: {oldest} to {newest}")
-    
-    # Step 5: Save to Supabase
-    print("\n💾 Step 4: Saving to Supabase...")
-    
-    batch_size = 100
-    
-    # Save tweets
-    print("   Saving tweets...")
-    for i in range(0, len(tweets_data), batch_size):
-        batch = tweets_data[i:i+batch_size]
-        records = [{
-            "id": t["id"],
-            "period_start": t["period_start"],
-            "text": t["content"],
-            "msg": t["content"],
-            "created_at": t["unix_ts"],
-            "is_reply": t["is_reply"],
-            "raw_data": {"type": t["tweet_type"], "link": t["tweet_link"]}
-        } for t in batch]
+            try:
+                supabase.table('cached_tweets').upsert(records).execute()
+            except Exception as e:
+                print(f"   ⚠️ Error: {e}")
         
-        try:
-            supabase.table('cached_tweets').upsert(records).execute()
-        except Exception as e:
-            print(f"   ⚠️ Error: {e}")
+        print(f"   ✅ Saved {len(tweets_data)} tweets")
+        heatmap_records = tweets_data.heatmap_rows()
     
-    print(f"   ✅ Saved {len(tweets_data)} tweets")
+    print(f"   📡 Telegram: {client.summary()}")
     
     # Save heatmap
     print("   Saving heatmap...")
-    heatmap_records = []
-    for (date_norm, hour), data in heatmap_data.items():
-        heatmap_records.append({
-            "date_str": data["date_str"],
-            "date_normalized": date_norm,
-            "hour": hour,
-            "tweet_count": data["tweet_count"],
-            "reply_count": data["reply_count"]
-        })
-    
     for i in range(0, len(heatmap_records), batch_size):
         batch = heatmap_records[i:i+batch_size]
         try:
@@ -255,8 +214,6 @@ async def main():
     
     print("\n" + "="*60)
     print("🎉 COMPLETE! Database has been reset and re-populated.")
-    
-    await client.disconnect()
 
 if __name__ == '__main__':
     asyncio.run(main())
@@ -1,13 +1,24 @@
 """
 Crawl Elon Musk data from Telegram and save directly to MySQL using PyMySQL.
+
+Usage:
+    python scripts/crawl_to_mysql.py               # parse inline
+    python scripts/crawl_to_mysql.py --workers 4   # parse pages on 4 processes while fetching
+    python scripts/crawl_to_mysql.py --shards 8    # crawl 8 time ranges of the window in parallel
+    python scripts/crawl_to_mysql.py --shards 16 --sessions elon_crawler_session,second_session   # split across accounts
 """
 import os
+import sys
 import asyncio
-import re
 import pymysql
 from datetime import datetime, timedelta, timezone
-from telethon import TelegramClient, types
+from telethon import TelegramClient
 from dotenv import load_dotenv
+from tg_parser import TweetBatch, TweetType
+from tg_parser.batch import BatchParser
+from tg_parser.timeutil import et_year_bounds
+from tg_sync import RequestScheduler, SessionPool, crawl_sharded, pool_specs
+from tg_sync.cli import int_from_argv, workers_from_argv
 
 load_dotenv('.env.local')
 
@@ -21,93 +32,6 @@ MYSQL_USER = 'root'
 MYSQL_PASSWORD = '123456'
 MYSQL_DATABASE = 'elon_musk'
 
-# Eastern Time offset (UTC-5)
-ET_OFFSET_HOURS = -5
-
-# Reference period start
-REF_PERIOD_START = 1766509200
-
-def get_period_start(timestamp):
-    diff = timestamp - REF_PERIOD_START
-    weeks = diff // (7 * 24 * 3600)
-    return REF_PERIOD_START + (weeks * 7 * 24 * 3600)
-
-def parse_elon_message(message):
-    text = message.text
-    if not text: return None
-    
-    if '**elonmusk**' not in text and '[elonmusk]' not in text:
-        return None
-    
-    tweet_type = None
-    if '`Retweeted`' in text:
-        tweet_type = "retweet"
-    elif '**Quoted**' in text:
-        tweet_type = "quote"
-    elif '`Replied To`' in text:
-        tweet_type = "reply"
-    elif 'Tweeted' in text and 'Retweeted' not in text:
-        tweet_type = "original"
-    
-    if not tweet_type: return None
-    
-    # Link Extraction
-    tweet_link = None
-    tweet_id = None
-    
-    if message.entities:
-        for entity in message.entities:
-            if isinstance(entity, types.MessageEntityTextUrl):
-                if any(x in entity.url for x in ['fxtwitter.com', 'x.com', 'twitter.com']):
-                    tweet_link = entity.url
-                    break
-    
-    if not tweet_link:
-        link_match = re.search(r'https://(?:fxtwitter\.com|x\.com|twitter\.com)/(\w+)/status/(\d+)', text)
-        if link_match: tweet_link = link_match.group(0)
-            
-    if not tweet_link and message.media and hasattr(message.media, 'webpage'):
-        wp = message.media.webpage
-        if wp and hasattr(wp, 'url') and wp.url and any(x in wp.url for x in ['fxtwitter.com', 'x.com', 'twitter.com']):
-            if '/status/' in wp.url: tweet_link = wp.url
-
-    if tweet_link:
-        id_match = re.search(r'status/(\d+)', tweet_link)
-        if id_match: tweet_id = id_match.group(1)
-    
-    if not tweet_id:
-        tweet_id = f"tg_{message.id}"
-
-    # Content extraction
-    lines = text.split('\n')
-    content_lines = []
-    for i, line in enumerate(lines):
-        if i == 0: continue
-        clean_line = line.strip()
-        if clean_line: content_lines.append(clean_line)
-    
-    content = '\n'.join(content_lines)
-    
-    # Use message.date directly
-    msg_date = message.date
-    unix_ts = int(msg_date.timestamp())
-    
-    # Convert to ET
-    et_datetime = msg_date + timedelta(hours=ET_OFFSET_HOURS)
-    
-    return {
-        "id": tweet_id,
-        "tweet_type": tweet_type,
-        "is_reply": tweet_type == "reply",
-        "content": content,
-        "unix_ts": unix_ts,
-        "date_str": et_datetime.strftime("%b %d"),
-        "date_normalized": et_datetime.strftime("%Y-%m-%d"),
-        "hour": et_datetime.strftime("%H:00"),
-        "period_start": get_period_start(unix_ts),
-        "tweet_link": tweet_link
-    }
-
 async def main():
     print("🚀 CRAWL TO MYSQL")
     print("="*60)
@@ -170,7 +94,14 @@ async def main():
     
     # Step 2: Connect to Telegram
     print("\n2. Connecting to Telegram...")
-    client = TelegramClient('elon_crawler_session', API_ID, API_HASH)
+    # Paces history requests and sleeps through FloodWaits instead of dying on them
+    # --sessions / TG_SESSION_STRINGS: several accounts share the crawl, a FloodWait moves the cursor
+    specs = pool_specs(sys.argv)
+    if specs:
+        client = SessionPool.from_specs(specs, API_ID, API_HASH)
+        print(f"👥 Session pool: {client.size} accounts")
+    else:
+        client = RequestScheduler(TelegramClient('elon_crawler_session', API_ID, API_HASH))
     await client.start()
     print("   ✅ Connected")
     
@@ -181,39 +112,41 @@ async def main():
     # Step 3: Crawl and save
     print("\n3. Crawling messages...")
     
-    tweets_data = []
-    heatmap_data = {}
-    count = 0
+    # Columnar store (int ids/timestamps/type codes); the heatmap is aggregated from it after the crawl
+    tweets_data = TweetBatch()
+    valid_from, valid_until = et_year_bounds(2025, 2026)
     
-    async for message in client.iter_messages(channel, limit=50000):
-        if message.date < six_months_ago:
-            print(f"   ⏹️ Reached 6-month boundary")
-            break
+    def add_tweet(parsed):
+        # Validate year (2025 or 2026 in ET)
+        if not valid_from <= parsed.created_at < valid_until:
+            return
         
-        parsed = parse_elon_message(message)
-        if parsed:
-            # Validate year
-            year = int(parsed["date_normalized"][:4])
-            if year < 2025 or year > 2026:
-                continue
-            
-            tweets_data.append(parsed)
-            
-            key = (parsed["date_normalized"], parsed["hour"])
-            if key not in heatmap_data:
-                heatmap_data[key] = {"tweet_count": 0, "reply_count": 0, "date_str": parsed["date_str"]}
-            
-            if parsed["is_reply"]:
-                heatmap_data[key]["reply_count"] += 1
-            else:
-                heatmap_data[key]["tweet_count"] += 1
-            
-            count += 1
+        if not tweets_data.append(parsed):
+            return
+        
+        if len(tweets_data) % 500 == 0:
+            print(f"   Processed {len(tweets_data)} tweets (oldest: {parsed.buckets()[0]})")
+    
+    shards = int_from_argv(sys.argv, '--shards')
+    if shards:
+        print(f"   🧩 Sharded crawl: {shards} time ranges")
+        for parsed in await crawl_sharded(client, channel, six_months_ago, datetime.now(timezone.utc), shards=shards):
+            add_tweet(parsed)
+    else:
+        async with BatchParser(workers_from_argv(sys.argv)) as parser:
+            async for message in client.iter_messages(channel, limit=50000):
+                if message.date < six_months_ago:
+                    print(f"   ⏹️ Reached 6-month boundary")
+                    break
             
-            if count % 500 == 0:
-                print(f"   Processed {count} tweets (oldest: {parsed['date_normalized']})")
+                for parsed in await parser.feed(message):
+                    add_tweet(parsed)
+        
+            for parsed in await parser.flush():
+                add_tweet(parsed)
     
-    print(f"\n   ✅ Crawled {count} tweets")
+    print(f"\n   ✅ Crawled {len(tweets_data)} tweets ({tweets_data.skipped} skipped without an id)")
+    print(f"   📡 Telegram: {client.summary()}")
     
     # Step 4: Save tweets to MySQL
     print("\n4. Saving tweets to MySQL...")
@@ -228,20 +161,19 @@ async def main():
             tweet_link = VALUES(tweet_link)
     """
     
-    for i, t in enumerate(tweets_data):
-        cursor.execute(insert_tweet, (
-            t["id"],
-            t["period_start"],
-            t["content"],
-            t["content"],
-            t["unix_ts"],
-            t["is_reply"],
-            t["tweet_type"],
-            t["tweet_link"]
-        ))
-        if (i+1) % 1000 == 0:
-            conn.commit()
-            print(f"   Saved {i+1}/{len(tweets_data)} tweets...")
+    for i in range(0, len(tweets_data), 1000):
+        cursor.executemany(insert_tweet, [(
+            r["id"],
+            r["period_start"],
+            r["text"],
+            r["msg"],
+            r["created_at"],
+            r["is_reply"],
+            TweetType(r["raw_data"]["type"]).label,
+            r["raw_data"]["link"]
+        ) for r in tweets_data.rows(i, i+1000)])
+        conn.commit()
+        print(f"   Saved {min(i+1000, len(tweets_data))}/{len(tweets_data)} tweets...")
     
     conn.commit()
     print(f"   ✅ Saved {len(tweets_data)} tweets")
@@ -257,17 +189,17 @@ async def main():
             reply_count = VALUES(reply_count)
     """
     
-    for (date_norm, hour), data in heatmap_data.items():
-        cursor.execute(insert_heatmap, (
-            data["date_str"],
-            date_norm,
-            hour,
-            data["tweet_count"],
-            data["reply_count"]
-        ))
+    heatmap_records = tweets_data.heatmap_rows()
+    cursor.executemany(insert_heatmap, [(
+        data["date_str"],
+        data["date_normalized"],
+        data["hour"],
+        data["tweet_count"],
+        data["reply_count"]
+    ) for data in heatmap_records])
     
     conn.commit()
-    print(f"   ✅ Saved {len(heatmap_data)} heatmap entries")
+    print(f"   ✅ Saved {len(heatmap_records)} heatmap entries")
     
     # Step 6: Verify
     print("\n6. Verification...")
@@ -15,6 +15,7 @@ import os
 import mysql.connector
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from tg_parser import TweetType
 
 load_dotenv('.env.local')
 
@@ -145,7 +146,7 @@ def main():
                 tweet.get('msg', ''),
                 tweet.get('created_at'),
                 tweet.get('is_reply', False),
-                raw_data.get('type', 'unknown'),
+                TweetType.from_label(raw_data.get('type', 'unknown')).label,
                 raw_data.get('link', None)
             ))
         conn.commit()
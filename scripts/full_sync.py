@@ -6,13 +6,15 @@ Fetches all messages from Telegram and populates:
 - cached_heatmap: For Activity Matrix display
 """
 import os
-import re
+import time
 import asyncio
 from datetime import datetime, timezone, timedelta
 from collections import defaultdict
 from telethon import TelegramClient
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from tg_parser import FormatRouter
+from tg_sync import ALERT_SOURCES, RequestScheduler, TweetMerger
 
 # Load environment variables
 load_dotenv('.env.local')
@@ -23,117 +25,29 @@ SUPABASE_URL = os.getenv('SUPABASE_URL')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
 
 # Telegram channels to fetch from
-CHANNELS = ['elonvitalikalerts', 'ElonTweets_dBot']
+CHANNELS = list(ALERT_SOURCES)
 
-# Regex patterns
-RE_POSTED_AT = r"Posted at:.*?(\w{3},\s+\d{1,2}\s+\w{3}\s+\d{4}\s+\d{2}:\d{2}:\d{2}\s+[GS]MT)"
-RE_LINK_ELONTWEETS = r"Link:.*?(https://x\.com/elonmusk/status/(\d+))"
-RE_LINK_FXTWITTER = r"https://(?:fx)?twitter\.com/(\w+)/status/(\d+)"
-RE_LINK_X = r"https://x\.com/(\w+)/status/(\d+)"
+# Learns each channel's message format once instead of detecting it per message
+router = FormatRouter()
 
-def parse_message(text, message_date):
-    """Parse Telegram message to extract tweet data"""
-    if not text:
-        return None
-    
-    tweet_id = None
-    username = None
-    
-    # Try ElonTweetsD format
-    link_match = re.search(RE_LINK_ELONTWEETS, text)
-    if link_match:
-        tweet_id = link_match.group(2)
-        username = 'elonmusk'
-    else:
-        # Try fxtwitter format
-        link_match = re.search(RE_LINK_FXTWITTER, text)
-        if link_match:
-            username = link_match.group(1).lower()
-            tweet_id = link_match.group(2)
-        else:
-            # Try x.com format
-            link_match = re.search(RE_LINK_X, text)
-            if link_match:
-                username = link_match.group(1).lower()
-                tweet_id = link_match.group(2)
-    
-    if not tweet_id:
-        return None
-    
-    # Filter for Elon's tweets only
-    if username and username != 'elonmusk':
-        return None
-    
-    # Extract timestamp
-    ts = 0
-    time_match = re.search(RE_POSTED_AT, text)
-    if time_match:
-        time_str = time_match.group(1).strip()
-        time_str = re.sub(r'\s+', ' ', time_str)
-        try:
-            dt = datetime.strptime(time_str, "%a, %d %b %Y %H:%M:%S %Z")
-            dt = dt.replace(tzinfo=timezone.utc)
-            ts = int(dt.timestamp())
-        except:
-            pass
-    
-    # Fallback to message date
-    if ts == 0 and message_date:
-        if hasattr(message_date, 'timestamp'):
-            ts = int(message_date.timestamp())
-    
-    if ts == 0:
-        return None
-    
-    # Determine tweet type
-    text_lower = text.lower()
-    is_reply = 'replied' in text_lower or '`replied`' in text_lower
-    
-    # Extract content
-    lines = text.split('\n')
-    content = ""
-    for line in lines:
-        if not any(x in line.lower() for x in ['posted at:', 'link:', '🚨', 'http', 'fxtwitter', 'x.com']):
-            if line.strip():
-                content = line.strip()
-                break
-    
-    return {
-        'id': str(tweet_id),
-        'created_at': ts,
-        'msg': content[:500] if content else None,
-        'is_reply': is_reply,
-    }
-
-
-async def fetch_all_messages(client, channel_name, limit=5000):
-    """Fetch messages from a Telegram channel"""
+async def fetch_all_messages(client, channel_name, merger, limit=5000):
+    """Fetch messages from a Telegram channel, feeding each Elon tweet to the merger as it arrives"""
     print(f"\n📥 Fetching from {channel_name}...")
-    messages = []
+    found = 0
     
     try:
         entity = await client.get_entity(channel_name)
         async for msg in client.iter_messages(entity, limit=limit):
-            if msg.text:
-                parsed = parse_message(msg.text, msg.date)
-                if parsed:
-                    messages.append(parsed)
-        print(f"   ✓ Found {len(messages)} Elon tweets")
+            if msg.message:
+                parsed = router.parse(msg, chat=channel_name)
+                if parsed and parsed.created_at:
+                    merger.offer(parsed, channel_name)
+                    found += 1
+        print(f"   ✓ {channel_name}: found {found} Elon tweets")
     except Exception as e:
-        print(f"   ❌ Error: {e}")
+        print(f"   ❌ {channel_name} error: {e}")
     
-    return messages
-
-
-def deduplicate_tweets(all_tweets):
-    """Remove duplicates, keeping the one with content"""
-    seen = {}
-    for t in all_tweets:
-        if t['id'] not in seen:
-            seen[t['id']] = t
-        elif t['msg'] and not seen[t['id']].get('msg'):
-            seen[t['id']] = t
-    return list(seen.values())
+    return found
 
 
 def build_heatmap(tweets):
@@ -142,7 +56,7 @@ def build_heatmap(tweets):
     
     for t in tweets:
         # Convert to ET timezone
-        dt = datetime.fromtimestamp(t['created_at'], tz=timezone.utc)
+        dt = datetime.fromtimestamp(t.created_at, tz=timezone.utc)
         et_offset = timedelta(hours=-5)  # EST
         dt_et = dt + et_offset
         
@@ -151,7 +65,7 @@ def build_heatmap(tweets):
         
         key = (date_iso, hour)
         heatmap[key]['count'] += 1
-        if t['is_reply']:
+        if t.is_reply:
             heatmap[key]['reply_count'] += 1
     
     return heatmap
@@ -168,22 +82,22 @@ async def main():
     # Use local session file
     print("⚠️ Using local session...")
     session_file = 'elon_crawler_session'
-    client = TelegramClient(session_file, API_ID, API_HASH)
+    # One scheduler for all channels: a FloodWait on one cursor pauses the others too
+    client = RequestScheduler(TelegramClient(session_file, API_ID, API_HASH))
     
     await client.start()
     print("✅ Connected to Telegram")
     
-    # Fetch from all channels
-    all_tweets = []
-    for channel in CHANNELS:
-        tweets = await fetch_all_messages(client, channel, limit=10000)
-        all_tweets.extend(tweets)
+    # Fetch all channels concurrently on the one client; duplicates are merged as they arrive
+    merger = TweetMerger(CHANNELS)
+    started = time.perf_counter()
+    await asyncio.gather(*(fetch_all_messages(client, channel, merger, limit=10000) for channel in CHANNELS))
+    print(f"\n⏱️ Fetched {len(CHANNELS)} channels in {time.perf_counter() - started:.1f}s ({client.summary()})")
     
     await client.disconnect()
     
-    # Deduplicate
-    unique_tweets = deduplicate_tweets(all_tweets)
-    print(f"\n📊 Total unique tweets: {len(unique_tweets)}")
+    unique_tweets = merger.values()
+    print(f"📊 Total unique tweets: {len(unique_tweets)} ({merger.duplicates} duplicates merged)")
     
     if not unique_tweets:
         print("❌ No tweets found!")
@@ -216,16 +130,16 @@ async def main():
         rows = []
         for t in batch:
             # Calculate period_start
-            diff = t['created_at'] - ref_start
+            diff = t.created_at - ref_start
             period_num = diff // week_seconds
             period_start = ref_start + (period_num * week_seconds)
             
             rows.append({
-                'id': str(t['id']),
+                'id': t.id,
                 'period_start': period_start,
-                'msg': t.get('msg'),
-                'created_at': t['created_at'],
-                'is_reply': t['is_reply'],
+                'msg': t.content[:500] or None,
+                'created_at': t.created_at,
+                'is_reply': t.is_reply,
             })
         
         try:
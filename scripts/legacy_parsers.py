@@ -0,0 +1,182 @@
+"""
+Frozen copies of the pre-tg_parser crawler parsers, the reference for bench_parser.py.
+
+Copied unchanged from the baseline tree, before the shared parser existed:
+    parse_elon_message  - complete_reset.py (the same id / is_reply / date logic as the
+                          copies in crawl_full_history.py and crawl_to_mysql.py)
+    parse_tg_message    - telegram_crawler_ci.py (ElonTweets_dBot format)
+
+There is one adaptation, so the module imports without Telethon: the
+isinstance(entity, types.MessageEntityTextUrl) check reads entity.url instead.
+Do not fix bugs here. Where tg_parser intentionally differs from these, the
+difference is listed in parser_golden.json "deviations" with the reason.
+
+    parse_legacy(markdown_text, msg_id, created_at, entities)  -> [id, is_reply, created_at] or None
+"""
+import re
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from tg_parser.patterns import DBOT_MARKER
+
+# Eastern Time offset (UTC-5)
+ET_OFFSET_HOURS = -5
+
+# Reference period start
+REF_PERIOD_START = 1766509200
+
+def get_period_start(timestamp):
+    diff = timestamp - REF_PERIOD_START
+    weeks = diff // (7 * 24 * 3600)
+    return REF_PERIOD_START + (weeks * 7 * 24 * 3600)
+
+def parse_elon_message(message):
+    text = message.text
+    if not text: return None
+    
+    if '**elonmusk**' not in text and '[elonmusk]' not in text:
+        return None
+    
+    tweet_type = None
+    if '`Retweeted`' in text:
+        tweet_type = "retweet"
+    elif '**Quoted**' in text:
+        tweet_type = "quote"
+    elif '`Replied To`' in text:
+        tweet_type = "reply"
+    elif 'Tweeted' in text and 'Retweeted' not in text:
+        tweet_type = "original"
+    
+    if not tweet_type: return None
+    
+    # Link Extraction
+    tweet_link = None
+    tweet_id = None
+    
+    if message.entities:
+        for entity in message.entities:
+            if getattr(entity, 'url', None):  # was isinstance(entity, types.MessageEntityTextUrl)
+                if any(x in entity.url for x in ['fxtwitter.com', 'x.com', 'twitter.com']):
+                    tweet_link = entity.url
+                    break
+    
+    if not tweet_link:
+        link_match = re.search(r'https://(?:fxtwitter\.com|x\.com|twitter\.com)/(\w+)/status/(\d+)', text)
+        if link_match: tweet_link = link_match.group(0)
+            
+    if not tweet_link and message.media and hasattr(message.media, 'webpage'):
+        wp = message.media.webpage
+        if wp and hasattr(wp, 'url') and wp.url and any(x in wp.url for x in ['fxtwitter.com', 'x.com', 'twitter.com']):
+            if '/status/' in wp.url: tweet_link = wp.url
+
+    if tweet_link:
+        id_match = re.search(r'status/(\d+)', tweet_link)
+        if id_match: tweet_id = id_match.group(1)
+    
+    if not tweet_id:
+        tweet_id = f"tg_{message.id}"
+
+    # Content extraction
+    lines = text.split('\n')
+    content_lines = []
+    for i, line in enumerate(lines):
+        if i == 0: continue
+        clean_line = line.strip()
+        if clean_line: content_lines.append(clean_line)
+    
+    content = '\n'.join(content_lines)
+    
+    # CRITICAL: Use message.date directly - it has correct year/month/day
+    msg_date = message.date  # This is UTC datetime with correct year
+    unix_ts = int(msg_date.timestamp())
+    
+    # Convert to ET by subtracting 5 hours
+    et_datetime = msg_date + timedelta(hours=ET_OFFSET_HOURS)
+    
+    return {
+        "id": tweet_id,
+        "tweet_type": tweet_type,
+        "is_reply": tweet_type == "reply",
+        "content": content,
+        "unix_ts": unix_ts,
+        "date_str": et_datetime.strftime("%b %d"),        # e.g., "Oct 31"
+        "date_normalized": et_datetime.strftime("%Y-%m-%d"),  # e.g., "2025-10-31"
+        "hour": et_datetime.strftime("%H:00"),
+        "period_start": get_period_start(unix_ts),
+        "tweet_link": tweet_link,
+        # For debugging
+        "_raw_date": str(msg_date),
+        "_et_date": str(et_datetime)
+    }
+
+
+# Regex patterns
+RE_POSTED_AT = r"Posted at:.*?(\w{3},\s+\d{1,2}\s+\w{3}\s+\d{4}\s+\d{2}:\d{2}:\d{2}\s+[GS]MT)"
+RE_LINK = r"Link:.*?(https://x\.com/elonmusk/status/(\d+))"
+
+def parse_tg_message(text):
+    if not text:
+        return None
+    try:
+        link_match = re.search(RE_LINK, text)
+        if not link_match:
+            return None
+        
+        tweet_id = link_match.group(2)
+        tweet_link = link_match.group(1)
+
+        time_match = re.search(RE_POSTED_AT, text)
+        ts = 0
+        date_str = ""
+        if time_match:
+            time_str = time_match.group(1).strip()
+            time_str = re.sub(r'\s+', ' ', time_str)
+            try:
+                dt = datetime.strptime(time_str, "%a, %d %b %Y %H:%M:%S %Z")
+                dt = dt.replace(tzinfo=timezone.utc)
+                ts = int(dt.timestamp())
+                date_str = dt.strftime("%Y-%m-%d")
+            except Exception:
+                pass
+        
+        first_line = text.split('\n')[0]
+        is_reply = "Reply" in first_line
+        
+        lines = text.split('\n')
+        content_lines = []
+        for line in lines:
+            if "🚨🚨🚨" in line: continue
+            if "Posted at:" in line: break
+            if "Link:" in line: break
+            clean_line = line.strip().replace("┃", "").strip()
+            if clean_line:
+                content_lines.append(clean_line)
+        content = " ".join(content_lines)
+        
+        return {
+            "id": tweet_id,
+            "text": content,
+            "created_at": ts,
+            "date_str": date_str,
+            "is_reply": is_reply,
+            "link": tweet_link
+        }
+    except Exception as e:
+        print(f"Error parsing: {e}")
+        return None
+
+
+def parse_legacy(text, msg_id, created_at, entities=()):
+    """[id, is_reply, created_at] from the baseline parser for the message's format, or None."""
+    if DBOT_MARKER in (text or ''):
+        parsed = parse_tg_message(text)
+        return parsed and [parsed['id'], parsed['is_reply'], parsed['created_at']]
+    message = SimpleNamespace(
+        id=msg_id,
+        text=text,
+        entities=list(entities or ()),
+        media=None,
+        date=datetime.fromtimestamp(created_at, timezone.utc),
+    )
+    parsed = parse_elon_message(message)
+    return parsed and [parsed['id'], parsed['is_reply'], parsed['unix_ts']]
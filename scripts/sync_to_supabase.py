@@ -8,6 +8,7 @@ import os
 import pymysql
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from tg_parser import TweetType
 
 load_dotenv('.env.local')
 
@@ -76,7 +77,7 @@ def main():
             "msg": t["msg"] or "",
             "created_at": t["created_at"],
             "is_reply": bool(t["is_reply"]),
-            "raw_data": {"type": t.get("tweet_type", "unknown"), "link": t.get("tweet_link", None)}
+            "raw_data": {"type": int(TweetType.from_label(t.get("tweet_type", "unknown"))), "link": t.get("tweet_link", None)}
         } for t in batch]
         
         try:
@@ -1,13 +1,26 @@
+"""
+Telegram crawler for @elonvitalikalerts.
+
+Usage:
+    python scripts/telegram_crawler.py             # sync history above the checkpoint, rebuild heatmap
+    python scripts/telegram_crawler.py --listen    # push updates only, while the window is open
+    python scripts/telegram_crawler.py --daemon    # catch up, then push updates; reconnects forever
+    python scripts/telegram_crawler.py --daemon --max-runtime 20700   # exit cleanly after N seconds (CI)
+"""
 import os
-import re
+import sys
 import asyncio
-import json
-from datetime import datetime, timezone
-import calendar
 from telethon import TelegramClient, events
 from telethon.sessions import StringSession
 from supabase import create_client, Client
 from dotenv import load_dotenv
+from tg_parser import FormatRouter, ParseCache, et_buckets
+from tg_sync import (ALERT_SOURCES, ArrivalRace, CheckpointStore, ContinuityStore, CorrectionError, MessageCorrections,
+                     PeerCache, RequestScheduler, StateStore, UpdateStateStore, Watermark, adjust_heatmap, fill_holes,
+                     iter_since)
+from tg_sync.cli import int_from_argv
+from tg_sync.peers import is_stale_peer
+from tg_sync.race import QUIET_AFTER
 
 # Load environment variables
 load_dotenv('.env.local')
@@ -24,128 +37,34 @@ if not all([API_ID, API_HASH, SUPABASE_URL, SUPABASE_KEY]):
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Regex patterns for both message formats
-# ElonTweetsD bot format
-RE_HEADER = r"🚨🚨🚨"
-RE_POSTED_AT = r"Posted at:.*?(\w{3},\s+\d{1,2}\s+\w{3}\s+\d{4}\s+\d{2}:\d{2}:\d{2}\s+[GS]MT)"
-RE_LINK_ELONTWEETS = r"Link:.*?(https://x\.com/elonmusk/status/(\d+))"
+# Daemon mode
+CATCH_UP_EVERY = 10 * 60        # seconds between safety-net catch-up passes
+RECONNECT_DELAY = 5             # first reconnect delay, doubled per failure
+MAX_RECONNECT_DELAY = 300
+MAX_RECONNECT_FAILURES = 5      # consecutive failed reconnects before the daemon exits non-zero
+# Errors a reconnect cannot fix (revoked or duplicated session); matched by class name, MRO included
+FATAL_ERRORS = {'UnauthorizedError', 'AuthKeyError', 'AuthKeyDuplicatedError'}
 
-# elonvitalikalerts channel format (uses fxtwitter.com or x.com)
-RE_LINK_FXTWITTER = r"https://(?:fx)?twitter\.com/\w+/status/(\d+)"
-RE_LINK_X = r"https://x\.com/\w+/status/(\d+)"
 
-def parse_tg_message(text, message_date=None):
-    """Parse Telegram message from either ElonTweetsD or elonvitalikalerts"""
-    if not text: return None
-    try:
-        tweet_id = None
-        tweet_link = None
-        
-        # Try ElonTweetsD format first
-        link_match = re.search(RE_LINK_ELONTWEETS, text)
-        if link_match:
-            tweet_id = link_match.group(2)
-            tweet_link = link_match.group(1)
-        else:
-            # Try fxtwitter format (elonvitalikalerts)
-            link_match = re.search(RE_LINK_FXTWITTER, text)
-            if link_match:
-                tweet_id = link_match.group(1)
-                tweet_link = f"https://x.com/elonmusk/status/{tweet_id}"
-            else:
-                # Try x.com format
-                link_match = re.search(RE_LINK_X, text)
-                if link_match:
-                    tweet_id = link_match.group(1)
-                    tweet_link = f"https://x.com/elonmusk/status/{tweet_id}"
-        
-        if not tweet_id:
-            return None
-        
-        # Only process elonmusk tweets
-        if "elonmusk" not in text.lower() and "elonmusk" not in tweet_link.lower():
-            # Check if this is actually an Elon tweet
-            if not any(x in text.lower() for x in ['elon', 'musk']):
-                return None
-
-        # Extract Timestamp - try multiple methods
-        ts = 0
-        date_str = ""
-        
-        # Method 1: ElonTweetsD "Posted at:" format
-        time_match = re.search(RE_POSTED_AT, text)
-        if time_match:
-            time_str = time_match.group(1).strip()
-            time_str = re.sub(r'\s+', ' ', time_str)
-            try:
-                dt = datetime.strptime(time_str, "%a, %d %b %Y %H:%M:%S %Z")
-                dt = dt.replace(tzinfo=timezone.utc)
-                ts = int(dt.timestamp())
-                date_str = dt.strftime("%Y-%m-%d")
-            except Exception:
-                pass
-        
-        # Method 2: Use message date if timestamp not found
-        if ts == 0 and message_date:
-            if hasattr(message_date, 'timestamp'):
-                ts = int(message_date.timestamp())
-                date_str = message_date.strftime("%Y-%m-%d")
-        
-        # Determine Type: Reply, Retweet, or Original
-        is_reply = False
-        text_lower = text.lower()
-        
-        # Check for reply indicators
-        if "replied" in text_lower or "`replied`" in text_lower:
-            is_reply = True
-        elif "retweeted" in text_lower or "reposted" in text_lower or "🔄" in text:
-            is_reply = False  # Retweet counts as non-reply
-        elif "tweeted" in text_lower:
-            is_reply = False
-        
-        # Extract Content - simplified
-        content = text[:500] if len(text) > 500 else text
-        
-        return {
-            "id": tweet_id,
-            "text": content,
-            "created_at": ts,
-            "date_str": date_str,
-            "is_reply": is_reply,
-            "link": tweet_link
-        }
-    except Exception as e:
-        print(f"Error parsing message: {e}")
-        return None
+def is_fatal(error):
+    return any(cls.__name__ in FATAL_ERRORS for cls in type(error).__mro__)
 
 async def sync_to_supabase(parsed):
-    if not parsed or not parsed['created_at']: 
-        return
-    
-    # Calculate period_start (Tuesday Dec 23 2025 12pm ET = 1766509200)
-    # This aligns with the User's "Tuesday to Tuesday" cycle requirement
-    ref_start = 1766509200 
-    diff = parsed['created_at'] - ref_start
-    weeks = diff // (7 * 24 * 3600)
-    period_start = ref_start + (weeks * 7 * 24 * 3600)
+    if not parsed or not parsed.created_at:
+        return False
 
     try:
         # Upsert into cached_tweets ONLY
         # We will rebuild heatmap later to avoid double counting distortion
-        supabase.table('cached_tweets').upsert({
-            "id": parsed['id'],
-            "period_start": period_start,
-            "text": parsed['text'],
-            "msg": parsed['text'],
-            "created_at": parsed['created_at'],
-            "is_reply": parsed['is_reply'],
-            "raw_data": parsed
-        }).execute()
+        # period_start follows the User's "Tuesday to Tuesday" cycle (see tg_parser.timeutil)
+        supabase.table('cached_tweets').upsert(parsed.to_row()).execute()
         
-        print(f"✅ Synced: {parsed['id']} | Reply: {parsed['is_reply']} | {parsed['date_str']}")
+        print(f"✅ Synced: {parsed.id} | Reply: {parsed.is_reply} | {parsed.buckets()[0]}")
+        return True
             
     except Exception as e:
         print(f"❌ Supabase sync error: {e}")
+        return False
 
 async def rebuild_heatmap():
     print("\n🔄 Rebuilding Heatmap from Cached Tweets...")
@@ -167,10 +86,7 @@ async def rebuild_heatmap():
     
     for row in all_tweets:
         ts = row['created_at']
-        dt_et = datetime.fromtimestamp(ts - 5*3600, tz=timezone.utc)
-        date_norm = dt_et.strftime("%Y-%m-%d")
-        hour_str = dt_et.strftime("%H:00")
-        date_str = dt_et.strftime("%b %d") # Jan 08
+        date_norm, hour_str, date_str = et_buckets(ts) # Jan 08
         
         key = f"{date_norm}|{hour_str}"
         if key not in heatmap:
@@ -201,54 +117,278 @@ async def rebuild_heatmap():
     print("🔥 Heatmap rebuild complete!")
 
 
-async def listen_mode(client, bot_entity):
-    print(f"👂 Listening for new messages from {bot_entity}...")
+async def update_heatmap(parsed):
+    """Increment the tweet's heatmap slot (lightweight alternative to rebuild_heatmap)."""
+    try:
+        adjust_heatmap(supabase, parsed, 1)
+        print(f"   🔥 Heatmap updated for {parsed.buckets()[1]}")
+    except Exception as e:
+        print(f"   ⚠️ Heatmap update failed: {e}")
+
+
+def recent_tweet_ids(limit=1000):
+    """Newest tweet ids already in cached_tweets, so a restarted listener doesn't count them twice."""
+    try:
+        res = supabase.table('cached_tweets').select('id').order('created_at', desc=True).limit(limit).execute()
+        return [row['id'] for row in res.data or []]
+    except Exception as e:
+        print(f"⚠️ Could not load recent tweet ids: {e}")
+        return []
+
+
+async def source_peers(client, sources, peers):
+    """Configured channel name -> input peer, from the peer cache (ResolveUsername only on a miss)."""
+    return {source: await peers.resolve(source, client.get_input_entity) for source in sources}
+
+
+async def source_names(client, resolved):
+    """Peer id -> configured channel name, to tell which feed an event came from."""
+    return {await client.get_peer_id(peer): source for source, peer in resolved.items()}
+
+
+async def listen_mode(client, sources, updates, peers):
+    print(f"👂 Listening for new messages from {', '.join(sources)}...")
     print("   (Keep this window open. Updates will be synced in real-time.)")
     
-    @client.on(events.NewMessage(chats=bot_entity))
+    # Every source is a redundant feed: the first copy of a tweet is written, later ones dropped
+    race = ArrivalRace(sources)
+    race.seed(recent_tweet_ids())
+    resolved = await source_peers(client, sources, peers)
+    names = await source_names(client, resolved)
+    chats = list(resolved.values())
+    # The cache remembers which tweet each message wrote, so edits/deletes are corrected in place
+    cache = ParseCache(router=FormatRouter())
+    corrections = MessageCorrections(supabase, cache, race)
+    # Ids handled here count as ingested, so the next sync/daemon catch-up doesn't refetch them
+    continuity = ContinuityStore(supabase)
+    ranges = {source: continuity.get(source, resolved[source]) for source in sources}
+    
+    @client.on(events.NewMessage(chats=chats))
+    @client.on(events.MessageEdited(chats=chats))
     async def handler(event):
-        print(f"\n⚡ New message received! (ID: {event.message.id})")
-        if event.message.text:
-            parsed = parse_tg_message(event.message.text, event.message.date)
-            if parsed:
-                # 1. Sync the tweet
-                await sync_to_supabase(parsed)
-                
-                # 2. Increment heatmap immediately (lightweight update)
-                # We don't do full rebuild here to be fast
-                ts = parsed['created_at']
-                dt_et = datetime.fromtimestamp(ts - 5*3600, tz=timezone.utc)
-                date_norm = dt_et.strftime("%Y-%m-%d")
-                hour_str = dt_et.strftime("%H:00")
-                date_str = dt_et.strftime("%b %d")
-                
-                # Upsert/Increment logic for heatmap
-                # For simplicity, we just fetch-modify-save or relies on the fact we have a unique row
-                # Let's just do a safe RPC or simple select-update
+        message = event.message
+        source = names.get(event.chat_id, str(event.chat_id))
+        print(f"\n⚡ {'Edited' if message.edit_date else 'New'} message received from {source}! (ID: {message.id})")
+        try:
+            handled = message.edit_date and corrections.edited(message)
+        except CorrectionError:
+            updates.failed(event)
+            return
+        if not handled and message.message:
+            parsed, written = cache.parse(message)
+            if parsed and not written:
+                if not race.arrive(parsed, source, message.date.timestamp()):
+                    print(f"   ↩️ {parsed.id} already written from another source")
+                    cache.mark_written(message, duplicate=True)
+                # 1. Sync the tweet, 2. increment heatmap immediately (no full rebuild, to be fast)
+                elif await sync_to_supabase(parsed):
+                    await update_heatmap(parsed)
+                    cache.mark_written(message)
+                else:
+                    # Let a later copy from another source retry the write, and the next start replay it
+                    race.forget(parsed.id)
+                    updates.failed(event)
+                    return
+        ranges[source].add(message.id)
+        updates.processed(event)
+    
+    @client.on(events.MessageDeleted(chats=chats))
+    async def deleted(event):
+        print(f"\n🗑️ Messages deleted: {event.deleted_ids}")
+        try:
+            corrections.deleted(event.chat_id, event.deleted_ids)
+        except CorrectionError:
+            updates.failed(event)
+            return
+        updates.processed(event)
+    
+    try:
+        await client.run_until_disconnected()
+    finally:
+        print(f"📊 Sources:\n{race.report()}")
+        print(f"✏️ Corrections: {corrections.stats()}")
+        for source in sources:
+            continuity.set(source, ranges[source])
+            print(f"🧾 {source} ids: {ranges[source].describe()}")
+        cache.close()
+        updates.capture(client.session)
+        updates.save()
+
+
+async def daemon_mode(client, sources, updates, peers, max_runtime=0):
+    """
+    Listen mode that survives disconnects. Every (re)connect first catches up each
+    source from its stored checkpoint, then push events take over. Catch-up and push
+    share one parse cache, so a message seen by both is written and counted in the
+    heatmap once; an ArrivalRace does the same for the copies each source posts.
+    Each catch-up also fetches any message id missing between the ranges already
+    ingested, so a push Telegram never delivered is still picked up.
+    Network errors are retried with backoff. An auth/session error, or
+    MAX_RECONNECT_FAILURES reconnects in a row that fail before catch-up completes,
+    is raised so the process exits non-zero.
+    """
+    print(f"🛰️ Daemon: catch-up from checkpoint, then live updates from {', '.join(sources)}")
+    checkpoints = CheckpointStore(supabase)
+    cache = ParseCache(router=FormatRouter())
+    lock = asyncio.Lock()           # catch-up and push handlers never interleave
+    marks = {source: Watermark(checkpoints.get(source)) for source in sources}
+    race = ArrivalRace(sources)
+    race.seed(recent_tweet_ids())
+    corrections = MessageCorrections(supabase, cache, race)
+    resolved = await source_peers(client, sources, peers)
+    # Id-hole checks only for channels; private/bot chat ids are shared across the account
+    continuity = ContinuityStore(supabase)
+    ranges = {source: continuity.get(source, peer) for source, peer in resolved.items()}
+    names = await source_names(client, resolved)
+    chats = list(resolved.values())
+    caught_up = False               # push messages only move checkpoints once history is complete
+    stopping = False
+    
+    async def ingest(message, source):
+        mark = marks[source]
+        mark.seen(message.id)
+        handled = await write(message, source)
+        if handled:
+            ranges[source].add(message.id)
+        else:
+            mark.failed(message.id)
+        return handled
+    
+    async def write(message, source):
+        # An edit of a message that already wrote a tweet corrects that row instead
+        try:
+            if message.edit_date and corrections.edited(message):
+                return True
+        except CorrectionError:
+            return False
+        if not message.message:
+            return True
+        parsed, written = cache.parse(message)
+        if not parsed or written:
+            return True
+        if not race.arrive(parsed, source, message.date.timestamp()):
+            cache.mark_written(message, duplicate=True)
+            return True
+        if await sync_to_supabase(parsed):
+            await update_heatmap(parsed)
+            cache.mark_written(message)
+            return True
+        race.forget(parsed.id)
+        return False
+    
+    async def catch_up():
+        nonlocal caught_up
+        async with lock:
+            for source in sources:
+                mark = marks[source] = Watermark(checkpoints.get(source))
+                count = 0
+                # Bare client: RequestScheduler zeroes flood_sleep_threshold while its requests run,
+                # which would also hit Telethon's update loop
+                peer = await peers.resolve(source, client.get_input_entity)
+                async for message in iter_since(client, peer, mark.start, first_run_limit=100):
+                    await ingest(message, source)
+                    count += 1
+                checkpoints.set(source, mark.value)
+                print(f"🔁 Catch-up {source} from {mark.start or 'none'}: {count} messages, checkpoint now {mark.value}")
+                # Pushes Telegram never delivered leave holes between the ingested id ranges
+                fetched, deleted = await fill_holes(client, peer, ranges[source], lambda m, s=source: ingest(m, s))
+                if fetched or deleted:
+                    print(f"🧩 {source}: filled id holes, {fetched} messages fetched, {deleted} deleted")
+                continuity.set(source, ranges[source])
+            caught_up = True
+    
+    async def periodic_catch_up():
+        # Safety net for updates Telegram drops around silent reconnects
+        while True:
+            await asyncio.sleep(CATCH_UP_EVERY)
+            await catch_up()
+            print(f"📊 Sources:\n{race.report()}")
+            for source in race.quiet():
+                print(f"⚠️ {source} has been quiet for over {QUIET_AFTER // 3600}h")
+    
+    async def stop_after(seconds):
+        nonlocal stopping
+        await asyncio.sleep(seconds)
+        print(f"⏹️ Max runtime {seconds}s reached, stopping")
+        stopping = True
+        await client.disconnect()
+    
+    @client.on(events.NewMessage(chats=chats))
+    @client.on(events.MessageEdited(chats=chats))
+    async def handler(event):
+        source = names.get(event.chat_id, str(event.chat_id))
+        kind = 'Edited' if event.message.edit_date else 'New'
+        print(f"\n⚡ {kind} message received from {source}! (ID: {event.message.id})")
+        async with lock:
+            handled = await ingest(event.message, source)
+            if caught_up:
+                checkpoints.set(source, marks[source].value)
+            # A failed write keeps the pts (and checkpoint) behind it, so catch_up replays the update
+            if handled:
+                updates.processed(event)
+            else:
+                updates.failed(event)
+    
+    @client.on(events.MessageDeleted(chats=chats))
+    async def deleted(event):
+        print(f"\n🗑️ Messages deleted: {event.deleted_ids}")
+        async with lock:
+            try:
+                corrections.deleted(event.chat_id, event.deleted_ids)
+            except CorrectionError:
+                updates.failed(event)
+                return
+            updates.processed(event)
+    
+    timer = asyncio.create_task(stop_after(max_runtime)) if max_runtime else None
+    delay = RECONNECT_DELAY
+    failures = 0                    # consecutive (re)connects that never got through catch-up
+    try:
+        while not stopping:
+            try:
+                if not client.is_connected():
+                    await client.connect()
+                await catch_up()
+                delay = RECONNECT_DELAY
+                failures = 0
+                poller = asyncio.create_task(periodic_catch_up())
                 try:
-                    res = supabase.table('cached_heatmap').select('*').match({"date_normalized": date_norm, "hour": hour_str}).execute()
-                    if res.data:
-                        row = res.data[0]
-                        field = 'reply_count' if parsed['is_reply'] else 'tweet_count'
-                        new_count = row[field] + 1
-                        supabase.table('cached_heatmap').update({field: new_count}).eq('id', row['id']).execute()
-                    else:
-                        supabase.table('cached_heatmap').insert({
-                            "date_str": date_str,
-                            "date_normalized": date_norm,
-                            "hour": hour_str,
-                            "tweet_count": 0 if parsed['is_reply'] else 1,
-                            "reply_count": 1 if parsed['is_reply'] else 0
-                        }).execute()
-                    print(f"   🔥 Heatmap updated for {hour_str}")
-                except Exception as e:
-                    print(f"   ⚠️ Heatmap update failed: {e}")
+                    await client.run_until_disconnected()
+                finally:
+                    poller.cancel()
+                    updates.capture(client.session)
+                    updates.save()
+            except Exception as e:
+                print(f"❌ Daemon error: {e}")
+                failures += 1
+                # Exit non-zero so the workflow falls back to adaptive polling
+                if is_fatal(e) or failures >= MAX_RECONNECT_FAILURES:
+                    print(f"🛑 Giving up after {failures} failed reconnect(s)")
+                    raise
+                if is_stale_peer(e):
+                    # A cached access_hash from another account: resolve the usernames again
+                    for source in sources:
+                        peers.forget(source)
+            caught_up = False
+            if not stopping:
+                print(f"🔌 Disconnected, reconnecting in {delay}s...")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+    finally:
+        if timer:
+            timer.cancel()
+        print(f"📊 Sources:\n{race.report()}")
+        print(f"✏️ Corrections: {corrections.stats()}")
+        for source in sources:
+            continuity.set(source, ranges[source])
+            print(f"🧾 {source} ids: {ranges[source].describe()}")
+        cache.close()
 
-    await client.run_until_disconnected()
 
 async def main():
-    import sys
-    mode = "listen" if "--listen" in sys.argv else "sync"
+    mode = "daemon" if "--daemon" in sys.argv else "listen" if "--listen" in sys.argv else "sync"
+
+    live = mode != "sync"   # listen/daemon: catch up on missed updates when connecting
 
     print(f"🚀 Starting Telegram Crawler ({mode.upper()} mode)...")
     
@@ -263,15 +403,26 @@ async def main():
         try:
             # Ensure API_ID is int
             api_id_int = int(API_ID)
-            client = TelegramClient(StringSession(clean_session), api_id_int, API_HASH)
+            client = TelegramClient(StringSession(clean_session), api_id_int, API_HASH, catch_up=live)
         except Exception as e:
             print(f"❌ Session Init Error: {e}")
             return
     else:
         # Fallback to local session file
         print("📂 Using Local Session File...")
-        client = TelegramClient('elon_crawler_session', API_ID, API_HASH)
+        client = TelegramClient('elon_crawler_session', API_ID, API_HASH, catch_up=live)
+    
+    # Listeners resume the update stream where the last run stopped (a StringSession forgets it)
+    updates = None
+    if live:
+        updates = UpdateStateStore(StateStore(supabase))
+        restored = updates.restore(client.session)
+        if restored:
+            print(f"📍 Restored update state for {restored} entities; catching up from the last processed update")
         
+    # Usernames resolved by earlier runs are reused instead of calling ResolveUsername again
+    peers = PeerCache(StateStore(supabase))
+    
     await client.start()
     
     try:
@@ -282,23 +433,62 @@ async def main():
         
         if mode == "sync":
             print(f"📡 Deep syncing history from @{bot_entity}...")
+            # Listen mode keeps the bare client; the sync crawl is paced and survives FloodWaits
+            paced = RequestScheduler(client, peers=peers)
             count = 0
-            # Increase limit to 10,000 to cover 50+ days of history (User requirement)
-            async for message in client.iter_messages(bot_entity, limit=10000):
-                if message.text:
-                    parsed = parse_tg_message(message.text, message.date)
-                    if parsed:
-                        await sync_to_supabase(parsed)
-                        count += 1
-            print(f"📥 Crawled {count} messages.")
+            skipped = 0
+            # First run: 10,000 messages to cover 50+ days of history (User requirement)
+            # Later runs only fetch messages above the channel checkpoint
+            checkpoints = CheckpointStore(supabase)
+            mark = Watermark(checkpoints.get(bot_entity))
+            print(f"📍 Checkpoint: {mark.start or 'none'}")
+            continuity = ContinuityStore(supabase)
+            ranges = continuity.get(bot_entity, await paced.get_input_entity(bot_entity))
+            # Unchanged messages already upserted by a previous run are skipped (parse cache)
+            with ParseCache(router=FormatRouter()) as cache:
+                async def handle(message):
+                    nonlocal count, skipped
+                    if message.message:
+                        parsed, written = cache.parse(message)
+                        if not parsed:
+                            return True
+                        if written:
+                            skipped += 1
+                        elif await sync_to_supabase(parsed):
+                            cache.mark_written(message)
+                            count += 1
+                        else:
+                            return False
+                    return True
+                
+                async for message in iter_since(paced, bot_entity, mark.start, first_run_limit=10000):
+                    mark.seen(message.id)
+                    if await handle(message):
+                        ranges.add(message.id)
+                    else:
+                        mark.failed(message.id)
+                # Fetch exactly the ids missing between the ranges ingested so far
+                fetched, deleted = await fill_holes(paced, bot_entity, ranges, handle)
+                if fetched or deleted:
+                    print(f"🧩 Filled id holes: {fetched} messages fetched, {deleted} deleted")
+                print(f"📥 Crawled {count} messages, {skipped} unchanged ({cache.stats()}).")
+            print(f"📡 Telegram: {paced.summary()}, {peers.stats()}")
+            checkpoints.set(bot_entity, mark.value)
+            continuity.set(bot_entity, ranges)
+            print(f"🧾 Ids: {ranges.describe()}")
             await rebuild_heatmap()
             print("💡 Tip: Run 'python scripts/telegram_crawler.py --listen' to keep receiving new tweets in real-time!")
             
         elif mode == "listen":
-            await listen_mode(client, bot_entity)
+            await listen_mode(client, ALERT_SOURCES, updates, peers)
+        
+        elif mode == "daemon":
+            await daemon_mode(client, ALERT_SOURCES, updates, peers, max_runtime=int_from_argv(sys.argv, '--max-runtime'))
         
     except Exception as e:
         print(f"❌ Error during execution: {e}")
+        if mode == "daemon":
+            raise   # exit non-zero so the workflow falls back to adaptive polling
     finally:
         if mode == "sync":
             await client.disconnect()
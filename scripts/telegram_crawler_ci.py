@@ -2,16 +2,32 @@
 Telegram Crawler for CI/CD (GitHub Actions)
 
 This is a streamlined version specifically for running in GitHub Actions.
-It syncs the last 100 messages (to catch anything new since last run).
+It syncs only messages above the channel checkpoint (crawler_state table), or the
+last 100 messages on the first run. For channel sources, any id missing between
+the message-id ranges already ingested (tg_sync.continuity) is then fetched
+directly. Messages already written by a previous run are skipped via the parse
+cache, which the workflow keeps between runs with actions/cache.
+
+    python scripts/telegram_crawler_ci.py                                # one pass
+    python scripts/telegram_crawler_ci.py --poll --max-runtime 20700     # adaptive polling (tg_sync.polling)
+
+--poll covers every alert source (tg_sync.ALERT_SOURCES) and writes the first copy
+of each tweet, like the push daemon. crawler.yml runs it for the rest of the job
+when the daemon exits with an error.
 """
 
 import os
-import re
+import sys
+import time
 import asyncio
-from datetime import datetime, timezone
+from datetime import datetime
 from telethon import TelegramClient
 from telethon.sessions import StringSession
 from supabase import create_client, Client
+from tg_parser import FormatRouter, ParseCache
+from tg_sync import (ALERT_SOURCES, ArrivalRace, CheckpointStore, ContinuityStore, CorrectionError, MessageCorrections,
+                     PeerCache, PollPlanner, RequestScheduler, StateStore, Watermark, adjust_heatmap, fill_holes, iter_since)
+from tg_sync.cli import int_from_argv
 
 # Environment Variables (from GitHub Secrets)
 API_ID = os.getenv('TG_API_ID')
@@ -27,141 +43,147 @@ if not all([API_ID, API_HASH, SESSION_STRING, SUPABASE_URL, SUPABASE_KEY]):
 # Initialize Supabase
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
-# Regex patterns
-RE_POSTED_AT = r"Posted at:.*?(\w{3},\s+\d{1,2}\s+\w{3}\s+\d{4}\s+\d{2}:\d{2}:\d{2}\s+[GS]MT)"
-RE_LINK = r"Link:.*?(https://x\.com/elonmusk/status/(\d+))"
-
-def parse_tg_message(text):
-    if not text:
-        return None
-    try:
-        link_match = re.search(RE_LINK, text)
-        if not link_match:
-            return None
-        
-        tweet_id = link_match.group(2)
-        tweet_link = link_match.group(1)
-
-        time_match = re.search(RE_POSTED_AT, text)
-        ts = 0
-        date_str = ""
-        if time_match:
-            time_str = time_match.group(1).strip()
-            time_str = re.sub(r'\s+', ' ', time_str)
-            try:
-                dt = datetime.strptime(time_str, "%a, %d %b %Y %H:%M:%S %Z")
-                dt = dt.replace(tzinfo=timezone.utc)
-                ts = int(dt.timestamp())
-                date_str = dt.strftime("%Y-%m-%d")
-            except Exception:
-                pass
-        
-        first_line = text.split('\n')[0]
-        is_reply = "Reply" in first_line
-        
-        lines = text.split('\n')
-        content_lines = []
-        for line in lines:
-            if "🚨🚨🚨" in line: continue
-            if "Posted at:" in line: break
-            if "Link:" in line: break
-            clean_line = line.strip().replace("┃", "").strip()
-            if clean_line:
-                content_lines.append(clean_line)
-        content = " ".join(content_lines)
-        
-        return {
-            "id": tweet_id,
-            "text": content,
-            "created_at": ts,
-            "date_str": date_str,
-            "is_reply": is_reply,
-            "link": tweet_link
-        }
-    except Exception as e:
-        print(f"Error parsing: {e}")
-        return None
+# Cap per run so a long outage is caught up over several runs within the job timeout
+CATCH_UP_LIMIT = 2000
 
 async def sync_to_supabase(parsed):
-    if not parsed or not parsed['created_at']:
+    if not parsed or not parsed.created_at:
         return False
-    
-    ref_start = 1766509200
-    diff = parsed['created_at'] - ref_start
-    weeks = diff // (7 * 24 * 3600)
-    period_start = ref_start + (weeks * 7 * 24 * 3600)
 
     try:
-        supabase.table('cached_tweets').upsert({
-            "id": parsed['id'],
-            "period_start": period_start,
-            "text": parsed['text'],
-            "msg": parsed['text'],
-            "created_at": parsed['created_at'],
-            "is_reply": parsed['is_reply'],
-            "raw_data": parsed
-        }).execute()
+        supabase.table('cached_tweets').upsert(parsed.to_row()).execute()
         return True
     except Exception as e:
         print(f"❌ Sync error: {e}")
         return False
 
 async def update_heatmap(parsed):
-    if not parsed or not parsed['created_at']:
+    if not parsed or not parsed.created_at:
         return
     
-    ts = parsed['created_at']
-    dt_et = datetime.fromtimestamp(ts - 5*3600, tz=timezone.utc)
-    date_norm = dt_et.strftime("%Y-%m-%d")
-    hour_str = dt_et.strftime("%H:00")
-    date_str = dt_et.strftime("%b %d")
-    
     try:
-        res = supabase.table('cached_heatmap').select('*').match({
-            "date_normalized": date_norm, 
-            "hour": hour_str
-        }).execute()
-        
-        if res.data:
-            row = res.data[0]
-            field = 'reply_count' if parsed['is_reply'] else 'tweet_count'
-            new_count = row[field] + 1
-            supabase.table('cached_heatmap').update({field: new_count}).eq('id', row['id']).execute()
-        else:
-            supabase.table('cached_heatmap').insert({
-                "date_str": date_str,
-                "date_normalized": date_norm,
-                "hour": hour_str,
-                "tweet_count": 0 if parsed['is_reply'] else 1,
-                "reply_count": 1 if parsed['is_reply'] else 0
-            }).execute()
+        adjust_heatmap(supabase, parsed, 1)
     except Exception as e:
         print(f"⚠️ Heatmap error: {e}")
 
+def recent_tweet_ids(limit=1000):
+    """Newest tweet ids already in cached_tweets, so polling doesn't count them again from another source."""
+    try:
+        res = supabase.table('cached_tweets').select('id').order('created_at', desc=True).limit(limit).execute()
+        return [row['id'] for row in res.data or []]
+    except Exception as e:
+        print(f"⚠️ Could not load recent tweet ids: {e}")
+        return []
+
+async def sync_pass(client, cache, corrections, planner=None, bot_entity='ElonTweets_dBot', race=None):
+    """One catch-up above the checkpoint plus id-hole fill; returns the number of tweets synced."""
+    count = 0
+    synced = 0
+    skipped = 0
+    
+    # Only fetch messages newer than the checkpoint (first run: the last 100 messages)
+    checkpoints = CheckpointStore(supabase)
+    mark = Watermark(checkpoints.get(bot_entity))
+    print(f"📍 {bot_entity} checkpoint: {mark.start or 'none'}")
+    
+    continuity = ContinuityStore(supabase)
+    # ElonTweets_dBot is a bot chat: its ids are shared across the account, so only channels are hole-checked
+    ranges = continuity.get(bot_entity, await client.get_input_entity(bot_entity))
+    
+    async def handle(message):
+        """True once the message needs nothing more (written, unchanged or not a tweet)."""
+        nonlocal count, synced, skipped
+        # Edited since it was written: fix that row and heatmap bucket instead of counting it again
+        try:
+            if message.edit_date and corrections.edited(message):
+                return True
+        except CorrectionError:
+            return False
+        if not message.message:
+            return True
+        parsed, written = cache.parse(message)
+        if not parsed:
+            return True
+        count += 1
+        if written:
+            # Already upserted and counted in the heatmap by an earlier run
+            skipped += 1
+            return True
+        if race and not race.arrive(parsed, bot_entity, message.date.timestamp()):
+            # The same tweet was already written from another source
+            cache.mark_written(message, duplicate=True)
+            return True
+        if await sync_to_supabase(parsed):
+            await update_heatmap(parsed)
+            cache.mark_written(message)
+            synced += 1
+            if planner:
+                planner.seen(parsed.created_at)
+            return True
+        if race:
+            race.forget(parsed.id)
+        return False
+    
+    async for message in iter_since(client, bot_entity, mark.start, first_run_limit=100, limit=CATCH_UP_LIMIT):
+        mark.seen(message.id)
+        if await handle(message):
+            ranges.add(message.id)
+        else:
+            mark.failed(message.id)
+    
+    # Ids between ingested ranges were missed (or failed) earlier: fetch exactly those
+    fetched, deleted = await fill_holes(client, bot_entity, ranges, handle)
+    if fetched or deleted:
+        print(f"🧩 Filled id holes: {fetched} messages fetched, {deleted} deleted")
+    
+    print(f"📊 Processed: {count} messages, Synced: {synced}, Unchanged: {skipped} ({cache.stats()}, {corrections.stats()})")
+    
+    continuity.set(bot_entity, ranges)
+    print(f"🧾 Ids: {ranges.describe()}")
+    checkpoints.set(bot_entity, mark.value)
+    print(f"📍 Checkpoint now {mark.value}")
+    return synced
+
+async def poll(client, cache, corrections, race, max_runtime):
+    """Repeat sync_pass over every source at intervals that follow the hour-of-week profile and recent arrivals."""
+    planner = PollPlanner.from_supabase(supabase)
+    deadline = time.monotonic() + max_runtime if max_runtime else None
+    passes = 0
+    while True:
+        passes += 1
+        print(f"\n🔄 Poll #{passes} ({datetime.now().isoformat(timespec='seconds')})")
+        for source in ALERT_SOURCES:
+            await sync_pass(client, cache, corrections, planner, source, race)
+        interval = planner.next_interval()
+        if deadline and time.monotonic() + interval > deadline:
+            print(f"⏹️ Max runtime reached after {passes} polls")
+            return
+        print(f"💤 Next poll in {interval:.0f}s ({planner.describe()})")
+        await asyncio.sleep(interval)
+
 async def main():
     print(f"🚀 CI Crawler Starting... ({datetime.now().isoformat()})")
     
     clean_session = SESSION_STRING.replace('\n', '').replace(' ', '').strip()
-    client = TelegramClient(StringSession(clean_session), int(API_ID), API_HASH)
+    # A fresh runner's StringSession knows no usernames: reuse the peers resolved by earlier runs
+    peers = PeerCache(StateStore(supabase))
+    client = RequestScheduler(TelegramClient(StringSession(clean_session), int(API_ID), API_HASH), peers=peers)
     
     await client.start()
     print("✅ Connected to Telegram")
     
-    bot_entity = 'ElonTweets_dBot'
-    count = 0
-    synced = 0
-    
-    # Only process the last 100 messages (5-minute window should have very few new ones)
-    async for message in client.iter_messages(bot_entity, limit=100):
-        if message.text:
-            parsed = parse_tg_message(message.text)
-            if parsed:
-                count += 1
-                if await sync_to_supabase(parsed):
-                    await update_heatmap(parsed)
-                    synced += 1
+    with ParseCache(router=FormatRouter()) as cache:
+        if "--poll" in sys.argv:
+            race = ArrivalRace(ALERT_SOURCES)
+            race.seed(recent_tweet_ids())
+            corrections = MessageCorrections(supabase, cache, race)
+            await poll(client, cache, corrections, race, int_from_argv(sys.argv, '--max-runtime'))
+            print(f"📊 Sources:\n{race.report()}")
+        else:
+            corrections = MessageCorrections(supabase, cache)
+            await sync_pass(client, cache, corrections)
     
-    print(f"📊 Processed: {count} messages, Synced: {synced}")
+    print(f"📡 Telegram: {client.summary()}, {peers.stats()}")
     await client.disconnect()
     print("✅ Done!")
 
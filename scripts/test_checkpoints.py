@@ -0,0 +1,47 @@
+"""
+Checks for tg_sync.Watermark: the checkpoint never moves past a message that
+failed to write.
+
+Usage:
+    python scripts/test_checkpoints.py
+"""
+from tg_sync.checkpoints import Watermark
+
+
+def test_advances_to_max_seen():
+    mark = Watermark(100)
+    for msg_id in (103, 101, 102):
+        mark.seen(msg_id)
+    assert mark.value == 103
+
+
+def test_nothing_new_keeps_start():
+    assert Watermark(100).value == 100
+    assert Watermark().value == 0
+
+
+def test_stops_before_first_failure():
+    mark = Watermark(100)
+    for msg_id in range(101, 111):
+        mark.seen(msg_id)
+    mark.failed(107)
+    mark.failed(104)
+    mark.failed(109)
+    assert mark.value == 103
+
+
+def test_failure_never_moves_below_start():
+    mark = Watermark(100)
+    mark.seen(101)
+    mark.failed(101)
+    assert mark.value == 100
+    # A retried message older than the checkpoint does not rewind it
+    mark.failed(50)
+    assert mark.value == 100
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
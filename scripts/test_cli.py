@@ -0,0 +1,37 @@
+"""
+Checks for tg_sync.cli: flag values are parsed, malformed ones are usage errors.
+
+Usage:
+    python scripts/test_cli.py
+"""
+from tg_sync.cli import float_from_argv, int_from_argv, workers_from_argv
+
+
+def exit_code(read, argv, flag):
+    try:
+        read(argv, flag)
+    except SystemExit as e:
+        return e.code
+    return None
+
+
+def test_values():
+    argv = ['crawl.py', '--shards', '8', '--max-runtime=20700', '--min-expected', '2.5']
+    assert int_from_argv(argv, '--shards') == 8
+    assert int_from_argv(argv, '--max-runtime') == 20700
+    assert float_from_argv(argv, '--min-expected', 3.0) == 2.5
+    assert float_from_argv(argv, '--min-gap', 6) == 6
+    assert workers_from_argv(['crawl.py', '--workers=4']) == 4
+
+
+def test_malformed_values_are_usage_errors():
+    assert exit_code(int_from_argv, ['crawl.py', '--max-runtime', 'abc'], '--max-runtime') == 2
+    assert exit_code(int_from_argv, ['crawl.py', '--shards=2.5'], '--shards') == 2
+    assert exit_code(float_from_argv, ['gaps.py', '--min-expected'], '--min-expected') == 2
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
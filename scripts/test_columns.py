@@ -0,0 +1,47 @@
+"""
+Checks for tg_parser.columns: id encoding round-trips, tweets without an id are skipped.
+
+Usage:
+    python scripts/test_columns.py
+"""
+from tg_parser import TweetBatch, parse_alert
+from tg_parser.columns import decode_id, encode_id
+from tg_parser.models import ParsedTweet
+from tg_parser.tweet_types import TweetType
+
+TS = 1768287354
+
+
+def tweet(tweet_id, tg_id=None):
+    return ParsedTweet(id=tweet_id, tweet_type=TweetType.ORIGINAL, content="hi", created_at=TS,
+                       link=None, author=None, tg_id=tg_id)
+
+
+def test_id_round_trip():
+    for tweet_id in ("2010720067705835580", "tg_41160"):
+        assert decode_id(encode_id(tweet_id)) == tweet_id
+
+
+def test_missing_ids_are_not_encoded():
+    for tweet_id in (None, "", "tg_None", "tg_", "abc"):
+        assert encode_id(tweet_id) is None
+
+
+def test_batch_skips_tweets_without_id():
+    batch = TweetBatch([tweet("2010720067705835580"), tweet("tg_None"), tweet("tg_41160", 41160)])
+    assert len(batch) == 2
+    assert batch.skipped == 1
+    assert [row["id"] for row in batch.rows()] == ["2010720067705835580", "tg_41160"]
+
+
+def test_alert_without_link_or_message_id():
+    text = "📝 **elonmusk** Tweeted\nno link here"
+    assert parse_alert(text, None, TS) is None
+    assert parse_alert(text, 41160, TS).id == "tg_41160"
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,90 @@
+"""
+Checks for tg_sync.IdRanges (interval merging, hole detection) and fill_holes.
+
+Usage:
+    python scripts/test_continuity.py
+"""
+import asyncio
+from types import SimpleNamespace
+
+from tg_sync import ContinuityStore, IdRanges, UntrackedIds, fill_holes
+
+
+class InputPeerChannel:
+    """Stands in for telethon's type; peers are matched by class name."""
+
+
+class InputPeerUser:
+    pass
+
+
+class FakeClient:
+    """get_messages(ids=[...]) over a fixed set of existing message ids."""
+
+    def __init__(self, existing):
+        self.existing = set(existing)
+        self.requested = []
+
+    async def get_messages(self, channel, ids):
+        self.requested.append(list(ids))
+        return [SimpleNamespace(id=i) if i in self.existing else None for i in ids]
+
+
+def test_add_merges_adjacent_and_overlapping():
+    ranges = IdRanges()
+    for msg_id in (5, 3, 4, 10, 12, 11):
+        ranges.add(msg_id)
+    assert ranges.to_list() == [[3, 5], [10, 12]]
+    ranges.add_range(6, 9)
+    assert ranges.to_list() == [[3, 12]]
+    assert len(ranges) == 10
+    assert 7 in ranges and 2 not in ranges and 13 not in ranges
+
+
+def test_constructor_merges_unsorted_ranges():
+    assert IdRanges([[20, 25], [1, 4], [3, 8], [9, 9]]).to_list() == [[1, 9], [20, 25]]
+
+
+def test_missing():
+    ranges = IdRanges([[1, 3], [7, 7], [10, 12]])
+    assert ranges.missing() == [(4, 6), (8, 9)]
+    assert ranges.missing(0, 15) == [(0, 0), (4, 6), (8, 9), (13, 15)]
+    assert ranges.missing(5, 8) == [(5, 6), (8, 8)]
+    assert IdRanges().missing() == []
+
+
+def test_fill_holes_fetches_only_holes_and_records_deletions():
+    ranges = IdRanges([[1, 3], [8, 10]])
+    client = FakeClient(existing=[4, 6])
+    handled = []
+
+    async def handle(message):
+        handled.append(message.id)
+        return message.id != 6          # a failed write stays a hole
+
+    fetched, deleted = asyncio.run(fill_holes(client, 'channel', ranges, handle))
+    assert client.requested == [[4, 5, 6, 7]]
+    assert (fetched, deleted) == (2, 2)
+    assert handled == [4, 6]
+    assert ranges.missing() == [(6, 6)]
+
+
+def test_private_chats_are_not_tracked():
+    store = ContinuityStore(path='/nonexistent/crawler_state.json')
+    assert isinstance(store.get('ElonTweets_dBot', InputPeerUser()), UntrackedIds)
+    assert not isinstance(store.get('elonvitalikalerts', InputPeerChannel()), UntrackedIds)
+
+    ranges = UntrackedIds()
+    ranges.add(5)
+    ranges.add(900)
+    assert ranges.to_list() == [] and ranges.missing() == []
+    client = FakeClient(existing=[])
+    assert asyncio.run(fill_holes(client, 'ElonTweets_dBot', ranges, None)) == (0, 0)
+    assert client.requested == []
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,108 @@
+"""
+Checks for tg_sync.MessageCorrections: failed corrections raise, and private-chat
+deletions (no chat id) find their owning message.
+
+Usage:
+    python scripts/test_corrections.py
+"""
+import os
+import tempfile
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from tg_parser import ParseCache
+from tg_parser.models import ParsedTweet
+from tg_parser.tweet_types import TweetType
+from tg_sync import CorrectionError, MessageCorrections
+
+BOT_CHAT = 7000001              # private/bot chats have positive chat ids
+CHANNEL_CHAT = -1001234567890
+TWEET = ParsedTweet('2010720067705835580', TweetType.ORIGINAL, 'hello', 1768287270, tg_id=41160)
+
+
+class FakeTable:
+    def __init__(self, supabase, name):
+        self.supabase = supabase
+        self.name = name
+
+    def __getattr__(self, op):
+        def chain(*args, **kwargs):
+            self.supabase.calls.append((self.name, op))
+            return self
+        return chain
+
+    def execute(self):
+        if self.supabase.fail:
+            raise RuntimeError("supabase unavailable")
+        return SimpleNamespace(data=[])
+
+
+class FakeSupabase:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.calls = []
+
+    def table(self, name):
+        return FakeTable(self, name)
+
+
+def message(chat_id, msg_id, text, edit_date=None):
+    return SimpleNamespace(chat_id=chat_id, id=msg_id, edit_date=edit_date, message=text)
+
+
+def written_cache(directory, chat_id, msg_id):
+    cache = ParseCache(os.path.join(directory, 'cache.sqlite3'))
+    cache.store(chat_id, msg_id, 0, TWEET, written=True)
+    return cache
+
+
+def test_private_chat_delete_without_chat_id():
+    with tempfile.TemporaryDirectory() as directory:
+        with written_cache(directory, BOT_CHAT, 41160) as cache:
+            corrections = MessageCorrections(FakeSupabase(), cache)
+            assert corrections.deleted(None, [41160, 41161]) == 1
+            assert cache.owned(BOT_CHAT, 41160) is None
+
+
+def test_channel_rows_need_the_chat_id():
+    with tempfile.TemporaryDirectory() as directory:
+        with written_cache(directory, CHANNEL_CHAT, 41160) as cache:
+            corrections = MessageCorrections(FakeSupabase(), cache)
+            assert corrections.deleted(None, [41160]) == 0
+            assert corrections.deleted(CHANNEL_CHAT, [41160]) == 1
+
+
+def test_failed_delete_raises_and_keeps_owner():
+    with tempfile.TemporaryDirectory() as directory:
+        with written_cache(directory, CHANNEL_CHAT, 41160) as cache:
+            corrections = MessageCorrections(FakeSupabase(fail=True), cache)
+            try:
+                corrections.deleted(CHANNEL_CHAT, [41160])
+            except CorrectionError:
+                pass
+            else:
+                raise AssertionError("expected CorrectionError")
+            assert cache.owned(CHANNEL_CHAT, 41160) == TWEET
+
+
+def test_failed_edit_raises_and_keeps_cache():
+    with tempfile.TemporaryDirectory() as directory:
+        with written_cache(directory, CHANNEL_CHAT, 41160) as cache:
+            corrections = MessageCorrections(FakeSupabase(fail=True), cache)
+            cache.reparse = lambda m: TWEET
+            edit = message(CHANNEL_CHAT, 41160, 'edited', datetime(2026, 1, 13, tzinfo=timezone.utc))
+            try:
+                corrections.edited(edit)
+            except CorrectionError:
+                pass
+            else:
+                raise AssertionError("expected CorrectionError")
+            # Not recorded as seen, so the next catch-up retries the correction
+            assert not cache.lookup(CHANNEL_CHAT, 41160, int(edit.edit_date.timestamp()))[0]
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
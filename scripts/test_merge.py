@@ -0,0 +1,63 @@
+"""
+Checks for tg_sync.TweetMerger: the richest record per tweet id wins, whatever
+order the sources deliver in.
+
+Usage:
+    python scripts/test_merge.py
+"""
+from itertools import permutations
+
+from tg_parser.models import ParsedTweet
+from tg_parser.tweet_types import TweetType
+from tg_sync.merge import TweetMerger
+
+SOURCES = ('elonvitalikalerts', 'ElonTweets_dBot')
+TWEET_ID = '2010720067705835580'
+LINK = f'https://x.com/elonmusk/status/{TWEET_ID}'
+
+
+def tweet(content, link=None, tweet_id=TWEET_ID):
+    return ParsedTweet(id=tweet_id, tweet_type=TweetType.ORIGINAL, content=content, created_at=1768287270,
+                       link=link, author='elonmusk')
+
+
+def merged(offers):
+    merger = TweetMerger(SOURCES)
+    for record, source in offers:
+        merger.offer(record, source)
+    return merger
+
+
+def test_richest_record_wins_in_any_order():
+    offers = [(tweet(''), SOURCES[0]), (tweet('short', LINK), SOURCES[1]), (tweet('longer text'), SOURCES[0]),
+              (tweet('longer text', LINK), SOURCES[1])]
+    for order in permutations(offers):
+        merger = merged(order)
+        assert len(merger) == 1
+        assert merger.duplicates == 3
+        best = merger.values()[0]
+        assert (best.content, best.link) == ('longer text', LINK)
+
+
+def test_ties_go_to_the_first_source():
+    alert, dbot = tweet('same', LINK), tweet('same', LINK)
+    for order in ([(alert, SOURCES[0]), (dbot, SOURCES[1])], [(dbot, SOURCES[1]), (alert, SOURCES[0])]):
+        assert merged(order).values()[0] is alert
+    # Unlisted sources rank below every configured one
+    assert merged([(alert, 'other'), (dbot, SOURCES[1])]).values()[0] is dbot
+
+
+def test_offer_reports_new_and_replaced():
+    merger = TweetMerger(SOURCES)
+    assert merger.offer(tweet('a'), SOURCES[1])
+    assert not merger.offer(tweet('a'), SOURCES[1])
+    assert merger.offer(tweet('a', LINK), SOURCES[1])
+    assert merger.offer(tweet('b', tweet_id='1'), SOURCES[1])
+    assert len(merger) == 2
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
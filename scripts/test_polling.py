@@ -0,0 +1,119 @@
+"""
+Checks for tg_sync.polling: the hour-of-week profile is averaged over the days the
+heatmap covers, and PollPlanner intervals follow the profile and recent bursts.
+
+Usage:
+    python scripts/test_polling.py
+"""
+from types import SimpleNamespace
+
+from tg_parser.timeutil import DAY_SECONDS, ET_OFFSET_SECONDS, days_from_civil
+from tg_sync.polling import (BURST_WINDOW, MAX_INTERVAL, MIN_INTERVAL, PAGE, PollPlanner, hour_of_week,
+                             weekly_profile)
+
+MONDAY = 0                      # weekday index used by hour_of_week
+THURSDAY = 3
+
+
+def et_time(year, month, day, hour=0):
+    """Unix timestamp of an ET wall-clock hour."""
+    return days_from_civil(year, month, day) * DAY_SECONDS + hour * 3600 - ET_OFFSET_SECONDS
+
+
+def row(date, hour, tweets, replies=0):
+    return {'date_normalized': date, 'hour': hour, 'tweet_count': tweets, 'reply_count': replies}
+
+
+def test_hour_of_week():
+    # 2026-01-12 was a Monday
+    assert hour_of_week(et_time(2026, 1, 12)) == 0
+    assert hour_of_week(et_time(2026, 1, 12, 8)) == 8
+    assert hour_of_week(et_time(2026, 1, 18, 23)) == 167
+
+
+def test_profile_divides_by_weeks_covered():
+    # Two full weeks (Mon Jan 5 .. Sun Jan 18): Monday 08:00 averages 5, not 10 / PROFILE_WEEKS
+    rows = [row('2026-01-05', '08:00', 3, 1), row('2026-01-12', '08:00', 6), row('2026-01-18', '23:00', 2)]
+    profile = weekly_profile(rows)
+    assert profile[MONDAY * 24 + 8] == 5
+    assert profile[6 * 24 + 23] == 1
+
+
+def test_profile_partial_week():
+    # Mon Jan 5 .. Wed Jan 14 is ten days: Mondays occur twice, Thursdays once
+    rows = [row('2026-01-05', 8, 2), row('2026-01-12', 8, 2), row('2026-01-08', 8, 3), row('2026-01-14', 0, 1)]
+    profile = weekly_profile(rows)
+    assert profile[MONDAY * 24 + 8] == 2
+    assert profile[THURSDAY * 24 + 8] == 3
+
+
+def test_empty_profile_polls_at_max_interval():
+    profile = weekly_profile([])
+    assert profile == [0.0] * 168
+    assert PollPlanner(profile).next_interval(et_time(2026, 1, 12, 8)) == MAX_INTERVAL
+
+
+def test_interval_from_profile():
+    now = et_time(2026, 1, 12, 8)
+    profile = [0.0] * 168
+    profile[hour_of_week(now)] = 16
+    assert PollPlanner(profile).next_interval(now) == 100
+    # The next hour's rate is used up to MAX_INTERVAL ahead
+    assert PollPlanner(profile).next_interval(now - 600) == 100
+
+
+def test_burst_raises_rate_until_it_goes_quiet():
+    now = et_time(2026, 1, 12, 3)
+    recent = [now - 60 * i for i in range(10)]
+    planner = PollPlanner([1.0] * 168, recent)
+    assert planner.burst_rate(now) == 60
+    assert planner.next_interval(now) == max(MIN_INTERVAL, 400 / 60 ** 0.5)
+    assert planner.burst_rate(now + BURST_WINDOW + 1) == 0
+    assert planner.next_interval(now + BURST_WINDOW + 1) == 400
+
+
+def test_seen_keeps_the_newest_arrivals():
+    planner = PollPlanner([0.0] * 168)
+    for created_at in (300, 100, 0, 200):
+        planner.seen(created_at)
+    assert planner.recent == [100, 200, 300]
+
+
+class FakeQuery:
+    def __init__(self, data):
+        self.data = data
+        self.start, self.stop = 0, None
+
+    def range(self, start, stop):
+        self.start, self.stop = start, stop + 1
+        return self
+
+    def __getattr__(self, op):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        return SimpleNamespace(data=self.data[self.start:self.stop])
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+
+    def table(self, name):
+        return FakeQuery(self.tables[name])
+
+
+def test_from_supabase_pages_through_heatmap():
+    # More than one page of rows over two weeks of dates
+    heatmap = [row('2026-01-05', 8, 1)] * PAGE + [row('2026-01-18', 8, 0)]
+    supabase = FakeSupabase({'cached_heatmap': heatmap, 'cached_tweets': [{'created_at': 100}, {'created_at': 40}]})
+    planner = PollPlanner.from_supabase(supabase)
+    assert planner.profile[MONDAY * 24 + 8] == PAGE / 2
+    assert planner.recent == [40, 100]
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
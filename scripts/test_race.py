@@ -0,0 +1,64 @@
+"""
+Checks for tg_sync.ArrivalRace: the first arrival of a tweet wins, later copies
+and seeded ids are dropped, and per-source lag and quiet feeds are tracked.
+
+Usage:
+    python scripts/test_race.py
+"""
+from tg_parser.models import ParsedTweet
+from tg_parser.tweet_types import TweetType
+from tg_sync.race import ArrivalRace
+
+SOURCES = ('elonvitalikalerts', 'ElonTweets_dBot')
+POSTED = 1768287270
+
+
+def tweet(tweet_id, created_at=POSTED):
+    return ParsedTweet(id=tweet_id, tweet_type=TweetType.ORIGINAL, content='hi', created_at=created_at)
+
+
+def test_first_arrival_wins():
+    race = ArrivalRace(SOURCES)
+    assert race.arrive(tweet('1'), SOURCES[1], POSTED + 5)
+    assert not race.arrive(tweet('1'), SOURCES[0], POSTED + 12)
+    fast, slow = race.stats[SOURCES[1]], race.stats[SOURCES[0]]
+    assert (fast.wins, fast.duplicates, slow.wins, slow.duplicates) == (1, 0, 0, 1)
+    assert (slow.lag_max, slow.behind_max, slow.behind_count) == (12, 7, 1)
+    assert "1 first / 0 duplicate" in race.report()
+
+
+def test_seeded_ids_are_duplicates_without_behind_time():
+    race = ArrivalRace(SOURCES)
+    race.seed(['1'])
+    assert not race.arrive(tweet('1'), SOURCES[0], POSTED + 3)
+    assert race.stats[SOURCES[0]].behind_count == 0
+
+
+def test_forget_lets_the_next_copy_win():
+    race = ArrivalRace(SOURCES)
+    assert race.arrive(tweet('1'), SOURCES[0], POSTED + 1)
+    race.forget('1')
+    assert race.arrive(tweet('1'), SOURCES[1], POSTED + 2)
+
+
+def test_recent_ids_are_bounded():
+    race = ArrivalRace(SOURCES, recent_ids=2)
+    for tweet_id in ('1', '2', '3'):
+        race.arrive(tweet(tweet_id), SOURCES[0], POSTED)
+    assert list(race.recent) == ['2', '3']
+    assert race.arrive(tweet('1'), SOURCES[1], POSTED)
+
+
+def test_quiet_sources():
+    race = ArrivalRace(SOURCES)
+    race.arrive(tweet('1'), SOURCES[0], POSTED)
+    assert race.quiet(now=POSTED + 60) == [SOURCES[1]]
+    assert race.quiet(now=POSTED + 60, after=30) == list(SOURCES)
+    assert f"{SOURCES[1]}: no arrivals" in race.report()
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
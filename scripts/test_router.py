@@ -0,0 +1,82 @@
+"""
+Checks for tg_parser.FormatRouter: a chat is locked to its format after a streak,
+and relearned when it starts posting the other format.
+
+Usage:
+    python scripts/test_router.py
+"""
+from tg_parser import FormatRouter, parse_raw
+from tg_parser.entities import BOLD, TextEntity
+from tg_parser.router import ALERT, DBOT, LOCK_AFTER
+
+CHAT = 'ElonTweets_dBot'
+TS = 1768287354
+
+
+def dbot(tweet_id):
+    return (f"🚨🚨🚨\n**Reply** from Elon Musk(@elonmusk)\nhello\n\n"
+            f"Posted at: Sat, 10 Jan 2026 14:27:17 GMT\nLink: https://x.com/elonmusk/status/{tweet_id}\n"), ()
+
+
+def alert(tweet_id):
+    # "📝" is two UTF-16 units, so the bold "elonmusk" starts at 3
+    return f"📝 elonmusk Tweeted\nhello https://x.com/elonmusk/status/{tweet_id}", (TextEntity(BOLD, 3, 8),)
+
+
+def route(router, message, msg_id=1):
+    text, entities = message
+    parsed = router.parse_raw(CHAT, text, msg_id, TS, entities)
+    assert parsed == parse_raw(text, msg_id, TS, entities)
+    return parsed
+
+
+def test_locks_after_streak():
+    router = FormatRouter()
+    for i in range(LOCK_AFTER - 1):
+        route(router, dbot(100 + i))
+    assert CHAT not in router.formats
+    route(router, dbot(200))
+    assert router.formats[CHAT] == DBOT
+
+
+def test_alternating_formats_do_not_lock():
+    router = FormatRouter()
+    for i in range(LOCK_AFTER * 2):
+        route(router, dbot(i + 1) if i % 2 else alert(i + 1))
+    assert CHAT not in router.formats
+
+
+def test_relearns_when_the_chat_changes_format():
+    router = FormatRouter()
+    for i in range(LOCK_AFTER):
+        route(router, dbot(100 + i))
+    parsed = route(router, alert(300))
+    assert parsed.id == '300'
+    assert CHAT not in router.formats and router.streaks[CHAT] == (ALERT, 1)
+    for i in range(LOCK_AFTER - 1):
+        route(router, alert(400 + i))
+    assert router.formats[CHAT] == ALERT
+
+
+def test_rejected_message_of_the_locked_format_keeps_the_lock():
+    router = FormatRouter()
+    for i in range(LOCK_AFTER):
+        route(router, dbot(100 + i))
+    text, entities = dbot(500)
+    assert route(router, (text.replace('Link:', 'Source:'), entities)) is None
+    assert router.formats[CHAT] == DBOT
+
+
+def test_other_text_is_parsed_like_parse_raw():
+    router = FormatRouter()
+    for i in range(LOCK_AFTER):
+        route(router, dbot(100 + i))
+    assert route(router, ("just chatting", ())) is None
+    assert route(router, dbot(600)).id == '600'
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
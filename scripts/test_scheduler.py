@@ -0,0 +1,92 @@
+"""
+Checks for tg_sync.RequestScheduler: the client's flood_sleep_threshold is only
+zeroed while scheduler requests run, FloodWaits are slept through and counted,
+and pacing counts pages per cursor.
+
+Usage:
+    python scripts/test_scheduler.py
+"""
+import asyncio
+from types import SimpleNamespace
+
+from tg_sync import RequestScheduler
+from tg_sync.scheduler import PAGE_SIZE
+
+
+class FloodWaitError(Exception):
+    """Matched by class name, like Telethon's."""
+
+    def __init__(self, seconds):
+        super().__init__(f"A wait of {seconds} seconds is required")
+        self.seconds = seconds
+
+
+class Cursor:
+    def __init__(self, client, ids):
+        self.client = client
+        self.ids = list(ids)
+        self.wait_time = 0
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        self.client.thresholds.append(self.client.flood_sleep_threshold)
+        await asyncio.sleep(0)
+        if not self.ids:
+            raise StopAsyncIteration
+        return SimpleNamespace(id=self.ids.pop(0))
+
+
+class FakeClient:
+    def __init__(self, floods=0):
+        self.flood_sleep_threshold = 60
+        self.thresholds = []
+        self.floods = floods
+
+    async def get_me(self):
+        self.thresholds.append(self.flood_sleep_threshold)
+        if self.floods:
+            self.floods -= 1
+            raise FloodWaitError(0)
+        return 'me'
+
+    def iter_messages(self, entity, limit=None, wait_time=0, offset_id=0, **kwargs):
+        top = offset_id - 1 if offset_id else 1000
+        return Cursor(self, range(top, max(0, top - (limit or top)), -1))
+
+
+def test_threshold_only_zero_inside_requests():
+    client = FakeClient(floods=1)
+    scheduler = RequestScheduler(client)
+    assert client.flood_sleep_threshold == 60
+    assert asyncio.run(scheduler.get_me()) == 'me'
+    assert client.thresholds == [0, 0]
+    assert client.flood_sleep_threshold == 60
+    assert scheduler.flood_waits == 1
+
+
+def test_pages_counted_per_cursor():
+    client = FakeClient()
+    scheduler = RequestScheduler(client)
+    pages = []
+    scheduler.page_done = lambda: pages.append(scheduler.messages)
+
+    async def drain(count):
+        return [m.id async for m in scheduler.iter_messages('channel', limit=count)]
+
+    async def both():
+        # Interleaved cursors: 150 + 150 messages share scheduler.messages but are only 2 full pages
+        return await asyncio.gather(drain(150), drain(150))
+
+    first, second = asyncio.run(both())
+    assert len(first) == len(second) == 150
+    assert len(pages) == 2 * (150 // PAGE_SIZE)
+    assert client.flood_sleep_threshold == 60
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,66 @@
+"""
+Checks for tg_sync.shards: time shards tile the window exactly, newest first,
+and boundary messages land in exactly one shard.
+
+Usage:
+    python scripts/test_shards.py
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from tg_sync.shards import shard_messages, time_shards
+
+SINCE = datetime(2025, 7, 1, tzinfo=timezone.utc)
+UNTIL = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def test_shards_tile_the_window_newest_first():
+    shards = time_shards(SINCE, UNTIL, 8)
+    assert len(shards) == 8
+    assert shards[0][1] == UNTIL and shards[-1][0] == SINCE
+    for (start, end), (_, older_end) in zip(shards, shards[1:]):
+        assert older_end == start and start < end
+
+
+def test_shard_count_edge_cases():
+    assert time_shards(SINCE, UNTIL, 0) == [(SINCE, UNTIL)]
+    assert time_shards(SINCE, UNTIL, 1) == [(SINCE, UNTIL)]
+    # More shards than seconds still tiles the window
+    tiny = time_shards(SINCE, SINCE + timedelta(seconds=2), 5)
+    assert tiny[0][1] == SINCE + timedelta(seconds=2) and tiny[-1][0] == SINCE
+
+
+class FakeClient:
+    """iter_messages over dated messages, newest first, from offset_date inclusive."""
+
+    def __init__(self, dates):
+        self.messages = [SimpleNamespace(id=i, date=date) for i, date in enumerate(sorted(dates, reverse=True))]
+
+    async def iter_messages(self, channel, offset_date=None, wait_time=None):
+        for message in self.messages:
+            if message.date <= offset_date:
+                yield message
+
+
+async def collect(client, shards):
+    seen = []
+    for start, end in shards:
+        seen.extend([m.date async for m in shard_messages(client, 'channel', start, end)])
+    return seen
+
+
+def test_boundary_messages_land_in_one_shard():
+    shards = time_shards(SINCE, UNTIL, 4)
+    bounds = [start for start, _ in shards] + [UNTIL - timedelta(seconds=1)]
+    client = FakeClient(bounds + [SINCE - timedelta(seconds=1), UNTIL])
+    seen = asyncio.run(collect(client, shards))
+    # Both outer edges are excluded ([since, until) is half-open), every inner bound appears once
+    assert seen == sorted(bounds, reverse=True)
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
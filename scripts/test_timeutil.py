@@ -0,0 +1,63 @@
+"""
+Checks for tg_parser.timeutil.decode_posted_at: calendar edge cases and the ET
+date/hour buckets around midnight.
+
+Usage:
+    python scripts/test_timeutil.py
+"""
+from datetime import datetime, timezone
+
+from tg_parser.timeutil import decode_posted_at, et_buckets
+
+
+def posted(date):
+    return f"🚨🚨🚨\n**Tweet** from Elon Musk(@elonmusk)\nhi\n\nPosted at: {date}\nLink: https://x.com/elonmusk/status/1\n"
+
+
+def utc(*args):
+    return int(datetime(*args, tzinfo=timezone.utc).timestamp())
+
+
+def test_decodes_like_strptime():
+    assert decode_posted_at(posted("Sat, 10 Jan 2026 14:27:17 GMT")) == (utc(2026, 1, 10, 14, 27, 17), "2026-01-10", "09:00")
+    assert decode_posted_at(posted("Mon, 5 Jan 2026 14:00:00 GMT"))[0] == utc(2026, 1, 5, 14)
+
+
+def test_et_buckets_roll_back_a_day():
+    # 03:00 GMT is 22:00 ET the previous day, across month and year ends too
+    assert decode_posted_at(posted("Sun, 11 Jan 2026 03:00:00 GMT"))[1:] == ("2026-01-10", "22:00")
+    assert decode_posted_at(posted("Sun, 01 Mar 2026 04:59:59 GMT"))[1:] == ("2026-02-28", "23:00")
+    assert decode_posted_at(posted("Thu, 01 Jan 2026 00:00:00 GMT"))[1:] == ("2025-12-31", "19:00")
+    assert decode_posted_at(posted("Thu, 01 Jan 2026 05:00:00 GMT"))[1:] == ("2026-01-01", "00:00")
+
+
+def test_buckets_match_et_buckets():
+    for date in ("Sat, 10 Jan 2026 14:27:17 GMT", "Tue, 29 Feb 2028 02:10:00 GMT", "Wed, 31 Dec 2025 23:59:59 GMT"):
+        ts, date_normalized, hour = decode_posted_at(posted(date))
+        assert et_buckets(ts)[:2] == (date_normalized, hour)
+
+
+def test_leap_days():
+    assert decode_posted_at(posted("Tue, 29 Feb 2028 12:00:00 GMT"))[0] == utc(2028, 2, 29, 12)
+    assert decode_posted_at(posted("Tue, 29 Feb 2000 12:00:00 GMT"))[0] == utc(2000, 2, 29, 12)
+    assert decode_posted_at(posted("Sun, 29 Feb 2026 12:00:00 GMT")) is None
+    assert decode_posted_at(posted("Fri, 29 Feb 2100 12:00:00 GMT")) is None
+
+
+def test_invalid_dates():
+    for date in ("Thu, 31 Apr 2026 12:00:00 GMT", "Sat, 00 Jan 2026 12:00:00 GMT", "Sat, 10 Jan 2026 24:00:00 GMT",
+                 "Sat, 10 Jan 2026 12:60:00 GMT", "Sat, 10 Jan 2026 12:00:60 GMT", "Sat, 10 Foo 2026 12:00:00 GMT",
+                 "Sat, 10 Jan 2026 12:00:00 UTC"):
+        assert decode_posted_at(posted(date)) is None, date
+
+
+def test_missing_line():
+    assert decode_posted_at("📝 elonmusk Tweeted\nhello") is None
+    assert decode_posted_at("") is None
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,72 @@
+"""
+Round-trip tg_sync.UpdateStateStore through a real Telethon MemorySession
+(the base of the StringSession used in CI).
+
+Usage:
+    python scripts/test_update_state.py
+"""
+import os
+import tempfile
+from datetime import datetime, timezone
+
+from telethon.sessions import MemorySession
+from telethon.tl.types.updates import State
+
+from tg_sync import StateStore, UpdateStateStore
+from tg_sync.updates import ACCOUNT
+
+CHANNEL = 1234567890
+DATE = datetime(2026, 1, 13, 6, 55, 54, tzinfo=timezone.utc)
+
+
+def state(pts, qts=0, seq=0):
+    return State(pts=pts, qts=qts, date=DATE, seq=seq, unread_count=0)
+
+
+def new_store(directory):
+    return UpdateStateStore(StateStore(path=os.path.join(directory, 'crawler_state.json')))
+
+
+def test_capture_reads_session_states():
+    with tempfile.TemporaryDirectory() as directory:
+        session = MemorySession()
+        session.set_update_state(ACCOUNT, state(500, qts=7, seq=3))
+        session.set_update_state(CHANNEL, state(41161))
+
+        updates = new_store(directory)
+        updates.capture(session)
+        updates.save()
+
+        saved = new_store(directory).states
+        assert saved[str(ACCOUNT)] == [500, 7, int(DATE.timestamp()), 3]
+        assert saved[str(CHANNEL)][0] == 41161
+
+
+def test_restore_into_empty_session():
+    with tempfile.TemporaryDirectory() as directory:
+        updates = new_store(directory)
+        updates.update(CHANNEL, 41161, date=DATE)
+        updates.save()
+
+        session = MemorySession()
+        assert new_store(directory).restore(session) == 1
+        restored = dict(session.get_update_states())
+        assert restored[CHANNEL].pts == 41161
+        assert restored[CHANNEL].date == DATE
+
+
+def test_capture_never_moves_backwards():
+    with tempfile.TemporaryDirectory() as directory:
+        updates = new_store(directory)
+        updates.update(CHANNEL, 41161)
+        session = MemorySession()
+        session.set_update_state(CHANNEL, state(41000))
+        updates.capture(session)
+        assert updates.states[str(CHANNEL)][0] == 41161
+
+
+if __name__ == '__main__':
+    for name, test in list(globals().items()):
+        if name.startswith('test_'):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,44 @@
+"""
+Shared Telegram message parser used by every crawler script.
+
+    from tg_parser import parse_message
+
+    async for message in client.iter_messages('elonvitalikalerts', limit=100):
+        tweet = parse_message(message)
+        if tweet:
+            supabase.table('cached_tweets').upsert(tweet.to_row()).execute()
+
+Scripts are run as `python scripts/<name>.py`, which puts this directory on sys.path.
+"""
+from .alerts import parse_alert, parse_alert_raw
+from .cache import ParseCache
+from .columns import HeatmapCounter, TweetBatch
+from .dbot import parse_dbot, parse_posted_at
+from .entities import TextEntity, compact_entities
+from .message import parse_message, parse_raw, parse_text
+from .models import ParsedTweet
+from .router import FormatRouter
+from .timeutil import decode_posted_at, et_buckets, period_start, REF_PERIOD_START
+from .tweet_types import TweetType
+
+__all__ = [
+    "ParsedTweet",
+    "ParseCache",
+    "TweetBatch",
+    "HeatmapCounter",
+    "FormatRouter",
+    "TweetType",
+    "parse_message",
+    "parse_text",
+    "parse_raw",
+    "parse_alert",
+    "parse_alert_raw",
+    "parse_dbot",
+    "parse_posted_at",
+    "TextEntity",
+    "compact_entities",
+    "decode_posted_at",
+    "et_buckets",
+    "period_start",
+    "REF_PERIOD_START",
+]
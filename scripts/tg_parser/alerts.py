@@ -0,0 +1,140 @@
+"""
+Parser for the @elonvitalikalerts channel format.
+
+    [🖇️](https://fxtwitter.com/user/status/123) **elonmusk** `Replied To` **user**
+
+    reply text...
+
+Two entry points share the link/content logic:
+    parse_alert      - markdown-rendered text (Telethon `message.text`)
+    parse_alert_raw  - raw text + entity offsets (`message.message`), no markdown rendering
+"""
+from .entities import BOLD, CODE, entity_bytes, utf16
+from .models import ParsedTweet
+from .patterns import RE_LINE_BREAKS, RE_LINK_AUTHOR, RE_STATUS_ID, RE_TWEET_LINK
+from .tweet_types import TweetType, classify_alert_header, header_end
+
+
+def is_tweet_url(url):
+    return 'fxtwitter.com' in url or 'x.com' in url or 'twitter.com' in url
+
+
+ELONMUSK_UTF16 = utf16('elonmusk')
+SPACE_UTF16 = utf16(' ')
+TWEETED_UTF16 = utf16('Tweeted')
+RAW_MARKERS = {
+    (CODE, utf16('Retweeted')): TweetType.RETWEET,
+    (BOLD, utf16('Quoted')): TweetType.QUOTE,
+    (CODE, utf16('Replied To')): TweetType.REPLY,
+}
+# Lengths of the marker words; other entities are never sliced
+MARKER_LENGTHS = frozenset(len(m) // 2 for m in [ELONMUSK_UTF16] + [m for _, m in RAW_MARKERS])
+
+
+def classify_alert_raw(text, entities):
+    """
+    Return (is_elon, TweetType) for raw text, matching RE_ALERT_HEADER on the header line:
+    a bold/link "elonmusk" entity, one space, then the type marker entity (or plain "Tweeted").
+    An elonmusk entity anywhere else is another account replying to, quoting or retweeting him.
+    """
+    header = utf16(text[:header_end(text)])
+    units = len(header) // 2
+    candidates = [e for e in entities if e.length in MARKER_LENGTHS and e.offset + e.length <= units]
+    if not candidates:
+        return False, TweetType.UNKNOWN
+
+    elon_ends = []
+    markers = {}
+    for entity in candidates:
+        span = entity_bytes(header, entity)
+        if span == ELONMUSK_UTF16:
+            if entity.kind != CODE:
+                elon_ends.append(entity.offset + entity.length)
+        else:
+            found = RAW_MARKERS.get((entity.kind, span))
+            if found:
+                markers[entity.offset] = found
+
+    starts = {entity.offset for entity in entities}
+    for end in sorted(elon_ends):
+        if header[end * 2:end * 2 + 2] != SPACE_UTF16:
+            continue
+        marker = end + 1
+        if marker in markers:
+            return True, markers[marker]
+        # "Tweeted" is plain text in the header, not an entity
+        if marker not in starts and header.startswith(TWEETED_UTF16, marker * 2):
+            return True, TweetType.ORIGINAL
+    return False, TweetType.UNKNOWN
+
+
+def find_tweet_link(text, entities=None, webpage_url=None):
+    """Link lookup order: hidden entity links, literal URLs, then the webpage preview."""
+    if entities:
+        for entity in entities:
+            url = getattr(entity, 'url', None)
+            if url and is_tweet_url(url):
+                return url
+
+    link_match = RE_TWEET_LINK.search(text)
+    if link_match:
+        return link_match.group(0)
+
+    if webpage_url and is_tweet_url(webpage_url) and '/status/' in webpage_url:
+        return webpage_url
+    return None
+
+
+def parse_alert(text, msg_id=None, created_at=0, entities=None, webpage_url=None):
+    """Parse a markdown-rendered elonvitalikalerts message. Returns None for non-Elon messages."""
+    if not text:
+        return None
+
+    tweet_type = classify_alert_header(text)
+    if not tweet_type:
+        return None
+    return build_alert(text, tweet_type, msg_id, created_at, entities, webpage_url)
+
+
+def parse_alert_raw(text, msg_id=None, created_at=0, entities=None, webpage_url=None):
+    """Parse raw elonvitalikalerts text with TextEntity offsets. Returns None for non-Elon messages."""
+    if not text or not entities:
+        return None
+
+    is_elon, tweet_type = classify_alert_raw(text, entities)
+    if not is_elon or not tweet_type:
+        return None
+    return build_alert(text, tweet_type, msg_id, created_at, entities, webpage_url)
+
+
+def build_alert(text, tweet_type, msg_id, created_at, entities, webpage_url):
+    tweet_link = find_tweet_link(text, entities, webpage_url)
+    tweet_id = None
+    author = None
+    if tweet_link:
+        id_match = RE_STATUS_ID.search(tweet_link)
+        if id_match:
+            tweet_id = id_match.group(1)
+        author_match = RE_LINK_AUTHOR.search(tweet_link)
+        if author_match:
+            author = author_match.group(1)
+
+    # Use telegram message ID if no tweet ID found; without either there is nothing to key the row on
+    if not tweet_id:
+        if msg_id is None:
+            return None
+        tweet_id = f"tg_{msg_id}"
+
+    # Content is everything after the header line, stripped, without blank lines
+    body = text.partition('\n')[2].strip()
+    content = RE_LINE_BREAKS.sub('\n', body)
+
+    return ParsedTweet(
+        id=tweet_id,
+        tweet_type=tweet_type,
+        content=content,
+        created_at=created_at,
+        link=tweet_link,
+        author=author,
+        tg_id=msg_id,
+    )
@@ -0,0 +1,96 @@
+"""
+Process-pool batch parsing for large history backfills.
+
+Telethon messages can't be sent to another process, so each message is reduced to
+a small picklable payload (raw text, msg id, date, TextEntity tuples, webpage URL).
+Payloads are grouped into pages, parsed by a ProcessPoolExecutor while the event
+loop keeps fetching, and handed back in the original message order.
+
+    async with BatchParser(workers=4) as batch:
+        async for message in client.iter_messages(channel, limit=50000):
+            for parsed in await batch.feed(message):
+                handle(parsed)
+        for parsed in await batch.flush():
+            handle(parsed)
+
+With workers <= 1 every message is parsed inline, the same as parse_message().
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from .entities import compact_entities
+from .message import parse_raw, webpage_url
+
+PAGE_SIZE = 500
+
+
+def message_payload(message):
+    """(text, msg_id, created_at, entities, webpage_url) for a Telethon Message."""
+    created_at = int(message.date.timestamp()) if message.date else 0
+    return message.message, message.id, created_at, compact_entities(message.entities), webpage_url(message)
+
+
+def parse_payload(payload):
+    text, msg_id, created_at, entities, webpage = payload
+    return parse_raw(text, msg_id, created_at, entities, webpage)
+
+
+def parse_page(page):
+    """Worker entry point: parsed tweets of one page, in order, non-tweets dropped."""
+    return [parsed for parsed in map(parse_payload, page) if parsed]
+
+
+class BatchParser:
+    """Parse Telethon messages in pages on a process pool, returning results in message order."""
+
+    def __init__(self, workers=0, page_size=PAGE_SIZE, max_pending=None):
+        self.workers = workers
+        self.page_size = page_size
+        # Pages in flight before feed() waits on the oldest one (bounds memory on huge crawls)
+        self.max_pending = max_pending or max(2, workers * 2)
+        self.pool = ProcessPoolExecutor(workers) if workers > 1 else None
+        self.page = []
+        self.pending = deque()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+            self.pool = None
+
+    def submit(self):
+        if self.page:
+            loop = asyncio.get_running_loop()
+            self.pending.append(loop.run_in_executor(self.pool, parse_page, self.page))
+            self.page = []
+
+    async def collect(self, wait_for=0):
+        """Results of finished pages at the head of the queue; waits until at most wait_for remain."""
+        results = []
+        while self.pending and (self.pending[0].done() or len(self.pending) > wait_for):
+            results.extend(await self.pending.popleft())
+        return results
+
+    async def feed(self, message):
+        """Queue a message; returns the parsed tweets that are ready, oldest pages first."""
+        if self.pool is None:
+            parsed = parse_payload(message_payload(message)) if message.message else None
+            return [parsed] if parsed else []
+
+        self.page.append(message_payload(message))
+        if len(self.page) >= self.page_size:
+            self.submit()
+        return await self.collect(self.max_pending)
+
+    async def flush(self):
+        """Parse whatever is still queued and return it in order."""
+        if self.pool is None:
+            return []
+        self.submit()
+        return await self.collect()
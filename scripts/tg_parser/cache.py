@@ -0,0 +1,163 @@
+"""
+On-disk cache of parse results, keyed by (chat_id, message id, edit date).
+
+The sync crawlers re-read the same recent messages on every run. With the cache,
+a message that hasn't changed since the last run skips parsing entirely, and
+also skips the Supabase upsert once it has been written.
+
+    with ParseCache() as cache:
+        async for message in client.iter_messages(channel, limit=100):
+            parsed, written = cache.parse(message)
+            if parsed and not written and upsert(parsed):
+                cache.mark_written(message)
+
+Messages that are not Elon tweets are cached too (as a NULL record), so
+they are never parsed again either. An edit changes edit_date, which turns
+into a miss and a fresh parse; owned() still returns what the message wrote
+before the edit, which is what edit/delete corrections need.
+
+Plain parse results are committed on close(), but ownership changes (written
+flags, forgotten messages) are committed immediately: a daemon killed at the
+job timeout must not lose the message id -> tweet id map corrections rely on.
+"""
+import json
+import os
+import sqlite3
+
+from .message import parse_message
+from .models import ParsedTweet
+from .tweet_types import TweetType
+
+DEFAULT_CACHE_PATH = os.getenv('TG_PARSE_CACHE', os.path.join('.cache', 'tg_parse_cache.sqlite3'))
+
+# parsed_messages.written
+WRITTEN = 1         # this message's tweet was upserted (and counted in the heatmap)
+DUPLICATE = 2       # same tweet already written from another message/source
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed_messages (
+    chat_id   INTEGER NOT NULL,
+    msg_id    INTEGER NOT NULL,
+    edit_date INTEGER NOT NULL,   -- 0 if never edited
+    record    TEXT,               -- ParsedTweet as JSON, NULL for non-tweet messages
+    written   INTEGER NOT NULL DEFAULT 0,   -- WRITTEN: owns its cached_tweets row, DUPLICATE: another copy did
+    PRIMARY KEY (chat_id, msg_id)
+) WITHOUT ROWID
+"""
+
+
+def message_key(message):
+    """(chat_id, msg_id, edit_date) for a Telethon Message."""
+    edit_date = int(message.edit_date.timestamp()) if message.edit_date else 0
+    return message.chat_id or 0, message.id, edit_date
+
+
+def encode_record(parsed):
+    if parsed is None:
+        return None
+    return json.dumps([parsed.id, int(parsed.tweet_type), parsed.content, parsed.created_at,
+                       parsed.link, parsed.author, parsed.tg_id], ensure_ascii=False)
+
+
+def decode_record(record):
+    if record is None:
+        return None
+    tweet_id, tweet_type, content, created_at, link, author, tg_id = json.loads(record)
+    return ParsedTweet(tweet_id, TweetType.from_label(tweet_type), content, created_at, link, author, tg_id)
+
+
+class ParseCache:
+    """SQLite-backed parse cache. Written flags commit at once, other changes on close()/exit."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, router=None):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.router = router    # FormatRouter used for misses; parse_message() when None
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.commit()
+            self.conn.close()
+            self.conn = None
+
+    def lookup(self, chat_id, msg_id, edit_date):
+        """(found, parsed, written). found is False when missing or the message was edited since."""
+        row = self.conn.execute(
+            "SELECT edit_date, record, written FROM parsed_messages WHERE chat_id = ? AND msg_id = ?",
+            (chat_id, msg_id),
+        ).fetchone()
+        if row is None or row[0] != edit_date:
+            return False, None, False
+        return True, decode_record(row[1]), bool(row[2])
+
+    def store(self, chat_id, msg_id, edit_date, parsed, written=False):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO parsed_messages (chat_id, msg_id, edit_date, record, written) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (chat_id, msg_id, edit_date, encode_record(parsed), int(written)),
+        )
+        if written:
+            self.conn.commit()
+
+    def reparse(self, message, markdown=False):
+        """Parse without reading or writing the cache."""
+        if self.router is not None and not markdown:
+            return self.router.parse(message)
+        return parse_message(message, markdown)
+
+    def parse(self, message, markdown=False):
+        """parse_message() (or the router) through the cache. Returns (parsed, written)."""
+        key = message_key(message)
+        found, parsed, written = self.lookup(*key)
+        if found:
+            self.hits += 1
+            return parsed, written
+        self.misses += 1
+        parsed = self.reparse(message, markdown)
+        self.store(*key, parsed)
+        return parsed, False
+
+    def mark_written(self, message, duplicate=False):
+        chat_id, msg_id, edit_date = message_key(message)
+        self.conn.execute(
+            "UPDATE parsed_messages SET written = ? WHERE chat_id = ? AND msg_id = ? AND edit_date = ?",
+            (DUPLICATE if duplicate else WRITTEN, chat_id, msg_id, edit_date),
+        )
+        self.conn.commit()
+
+    def owned(self, chat_id, msg_id):
+        """The tweet this message wrote to cached_tweets (whatever its edit date), or None."""
+        row = self.conn.execute(
+            "SELECT record FROM parsed_messages WHERE chat_id = ? AND msg_id = ? AND written = ?",
+            (chat_id, msg_id, WRITTEN),
+        ).fetchone()
+        return decode_record(row[0]) if row else None
+
+    def private_chat(self, msg_id):
+        """
+        chat_id of the private/bot chat holding msg_id, or None. Telegram deletes there
+        carry no chat id, but ids are unique across an account's private chats (chat_id > 0).
+        """
+        row = self.conn.execute(
+            "SELECT chat_id FROM parsed_messages WHERE msg_id = ? AND chat_id > 0 LIMIT 1", (msg_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def forget(self, chat_id, msg_id):
+        self.conn.execute("DELETE FROM parsed_messages WHERE chat_id = ? AND msg_id = ?", (chat_id, msg_id))
+        self.conn.commit()
+
+    def stats(self):
+        return f"cache {self.hits} hits / {self.misses} misses"
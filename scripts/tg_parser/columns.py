@@ -0,0 +1,160 @@
+"""
+Columnar container for large numbers of parsed tweets (backfills, exports).
+
+A list of ParsedTweet objects keeps a str id, an int timestamp object and a
+TweetType per tweet. TweetBatch keeps typed arrays instead:
+
+    ids      array('q')  tweet id; the "tg_<message id>" fallback is stored as -<message id>
+    created  array('q')  unix seconds (UTC)
+    types    array('B')  TweetType code
+    periods  array('h')  weeks since REF_PERIOD_START
+    texts    list[str]   content, kept separately from the numeric columns
+    links    list        tweet URL or None
+
+Aggregation (heatmap_rows) and the bulk writers (rows) read the arrays directly.
+HeatmapCounter does the same aggregation for streamed tweets that are not kept.
+Iterating or indexing still gives back ParsedTweet objects (without author,
+which no writer stores).
+"""
+from array import array
+from collections import Counter
+
+from .models import ParsedTweet
+from .timeutil import ET_OFFSET_SECONDS, REF_PERIOD_START, WEEK_SECONDS, et_buckets
+from .tweet_types import TweetType
+
+TG_ID_PREFIX = "tg_"
+
+
+def encode_id(tweet_id):
+    """Tweet id string -> int64; "tg_123" fallbacks become -123. None for a missing or non-numeric id."""
+    if not tweet_id:
+        return None
+    fallback = tweet_id.startswith(TG_ID_PREFIX)
+    digits = tweet_id[len(TG_ID_PREFIX):] if fallback else tweet_id
+    if not digits.isdigit():
+        return None
+    return -int(digits) if fallback else int(digits)
+
+
+def decode_id(value):
+    return str(value) if value > 0 else f"{TG_ID_PREFIX}{-value}"
+
+
+class TweetBatch:
+    """Append-only columnar store of ParsedTweet records."""
+
+    __slots__ = ("ids", "created", "types", "periods", "texts", "links", "tg_ids", "skipped")
+
+    def __init__(self, tweets=()):
+        self.ids = array('q')
+        self.created = array('q')
+        self.types = array('B')
+        self.periods = array('h')
+        self.texts = []
+        self.links = []
+        self.tg_ids = array('q')    # 0 when unknown
+        self.skipped = 0            # tweets dropped by append for lack of a usable id
+        self.extend(tweets)
+
+    def append(self, tweet):
+        """Add one tweet; False (and counted in skipped) when its id cannot be encoded."""
+        encoded = encode_id(tweet.id)
+        if encoded is None:
+            self.skipped += 1
+            return False
+        self.ids.append(encoded)
+        self.created.append(tweet.created_at)
+        self.types.append(tweet.tweet_type)
+        self.periods.append((tweet.created_at - REF_PERIOD_START) // WEEK_SECONDS)
+        self.texts.append(tweet.content)
+        self.links.append(tweet.link)
+        self.tg_ids.append(tweet.tg_id or 0)
+        return True
+
+    def extend(self, tweets):
+        for tweet in tweets:
+            self.append(tweet)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        return ParsedTweet(
+            id=decode_id(self.ids[i]),
+            tweet_type=TweetType(self.types[i]),
+            content=self.texts[i],
+            created_at=self.created[i],
+            link=self.links[i],
+            author=None,
+            tg_id=self.tg_ids[i] or None,
+        )
+
+    def __iter__(self):
+        for i in range(len(self.ids)):
+            yield self[i]
+
+    def period_start(self, i):
+        return REF_PERIOD_START + self.periods[i] * WEEK_SECONDS
+
+    def rows(self, start=0, stop=None):
+        """cached_tweets rows for a slice of the batch (same shape as ParsedTweet.to_row)."""
+        stop = len(self.ids) if stop is None else min(stop, len(self.ids))
+        reply = TweetType.REPLY
+        rows = []
+        for i in range(start, stop):
+            text = self.texts[i]
+            code = self.types[i]
+            rows.append({
+                "id": decode_id(self.ids[i]),
+                "period_start": REF_PERIOD_START + self.periods[i] * WEEK_SECONDS,
+                "text": text,
+                "msg": text,
+                "created_at": self.created[i],
+                "is_reply": code == reply,
+                "raw_data": {"type": code, "link": self.links[i]},
+            })
+        return rows
+
+    def heatmap_counts(self):
+        """Counter of (et_hour_index, is_reply) where et_hour_index is hours since the epoch in ET."""
+        offset = ET_OFFSET_SECONDS
+        reply = TweetType.REPLY
+        return Counter(zip([(ts + offset) // 3600 for ts in self.created], [code == reply for code in self.types]))
+
+    def heatmap_rows(self):
+        """cached_heatmap rows; bucket strings are only built once per distinct hour."""
+        return heatmap_rows(self.heatmap_counts())
+
+
+def heatmap_rows(counts):
+    """cached_heatmap rows from a Counter of (et_hour_index, is_reply)."""
+    slots = {}
+    for (hour_index, is_reply), n in counts.items():
+        slot = slots.get(hour_index)
+        if slot is None:
+            date_norm, hour, date_str = et_buckets(hour_index * 3600 - ET_OFFSET_SECONDS)
+            slot = slots[hour_index] = {
+                "date_str": date_str,
+                "date_normalized": date_norm,
+                "hour": hour,
+                "tweet_count": 0,
+                "reply_count": 0,
+            }
+        slot["reply_count" if is_reply else "tweet_count"] += n
+    return list(slots.values())
+
+
+class HeatmapCounter:
+    """Streaming heatmap aggregation: one counter per ET hour, however many tweets are added."""
+
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def add(self, tweet):
+        self.counts[(tweet.created_at + ET_OFFSET_SECONDS) // 3600, tweet.is_reply] += 1
+
+    def rows(self):
+        return heatmap_rows(self.counts)
@@ -0,0 +1,57 @@
+"""
+Parser for the @ElonTweets_dBot format.
+
+    🚨🚨🚨
+    **Reply** from Elon Musk(@elonmusk)
+    tweet text...
+
+    Posted at: Sat, 10 Jan 2026 14:27:17 GMT
+    Link: https://x.com/elonmusk/status/2006833428424171844
+"""
+from .models import ParsedTweet
+from .patterns import DBOT_HEADER, RE_LINK_ELONTWEETS
+from .timeutil import decode_posted_at
+from .tweet_types import classify_dbot_line
+
+
+def parse_posted_at(text):
+    """Unix timestamp from the "Posted at:" line, or 0 if missing/invalid."""
+    decoded = decode_posted_at(text)
+    return decoded[0] if decoded else 0
+
+
+def extract_dbot_content(text):
+    """Lines before "Posted at:"/"Link:", without the 🚨 header and ┃ quote bars, joined by spaces."""
+    end = len(text)
+    for marker in ("Posted at:", "Link:"):
+        idx = text.find(marker)
+        if idx != -1 and idx < end:
+            end = idx
+    # Drop the whole line holding the first marker
+    end = text.rfind('\n', 0, end) + 1
+    lines = text[:end].replace("┃", "").split('\n')
+    return " ".join([line for line in map(str.strip, lines) if line and DBOT_HEADER not in line])
+
+
+def parse_dbot(text, created_at=0, msg_id=None):
+    """Parse an ElonTweetsD message. Falls back to created_at when "Posted at:" is missing."""
+    if not text:
+        return None
+    link_match = RE_LINK_ELONTWEETS.search(text)
+    if not link_match:
+        return None
+
+    ts = parse_posted_at(text) or created_at
+    # The type ("Reply from ...") sits on the line after the 🚨 header
+    head = text.split('\n', 2)
+    first_line = head[1] if DBOT_HEADER in head[0] and len(head) > 1 else head[0]
+
+    return ParsedTweet(
+        id=link_match.group(2),
+        tweet_type=classify_dbot_line(first_line),
+        content=extract_dbot_content(text),
+        created_at=ts,
+        link=link_match.group(1),
+        author="elonmusk",
+        tg_id=msg_id,
+    )
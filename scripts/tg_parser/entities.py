@@ -0,0 +1,52 @@
+"""
+Compact formatting entities for parsing raw message text.
+
+Telethon's `message.text` is the raw text re-rendered as markdown from the entity
+list. The raw-mode parsers read `message.message` instead and look at the few
+entity types the alert formats use:
+
+    **elonmusk**          -> BOLD      "elonmusk"
+    `Retweeted`           -> CODE      "Retweeted"
+    [🖇️](https://...)     -> TEXT_URL  "🖇️" + url
+
+Offsets and lengths are in UTF-16 code units, as sent by Telegram.
+"""
+from typing import NamedTuple, Optional
+
+BOLD = 1
+CODE = 2
+TEXT_URL = 3
+
+ENTITY_KINDS = {
+    'MessageEntityBold': BOLD,
+    'MessageEntityCode': CODE,
+    'MessageEntityTextUrl': TEXT_URL,
+}
+
+
+class TextEntity(NamedTuple):
+    kind: int
+    offset: int
+    length: int
+    url: Optional[str] = None
+
+
+def compact_entities(entities):
+    """Convert Telethon entities to TextEntity tuples, keeping only the kinds parsers use."""
+    if not entities:
+        return ()
+    compact = []
+    for entity in entities:
+        kind = ENTITY_KINDS.get(type(entity).__name__)
+        if kind:
+            compact.append(TextEntity(kind, entity.offset, entity.length, getattr(entity, 'url', None)))
+    return tuple(compact)
+
+
+def utf16(text):
+    return text.encode('utf-16-le')
+
+
+def entity_bytes(encoded, entity):
+    """The UTF-16-LE bytes an entity covers; compare against utf16("...") without decoding."""
+    return encoded[entity.offset * 2:(entity.offset + entity.length) * 2]
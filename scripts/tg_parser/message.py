@@ -0,0 +1,47 @@
+"""
+Entry point for Telethon messages: picks the right format parser.
+
+By default messages are parsed from raw text (`message.message`) plus entity
+offsets, so Telethon never has to render markdown. Pass markdown=True to parse
+`message.text` the way the original crawlers did.
+"""
+from .alerts import parse_alert, parse_alert_raw
+from .dbot import parse_dbot
+from .entities import compact_entities
+from .patterns import DBOT_MARKER
+
+
+def webpage_url(message):
+    """URL of the link preview attached to a message, if any."""
+    webpage = getattr(message.media, 'webpage', None) if message.media else None
+    return getattr(webpage, 'url', None)
+
+
+def parse_text(text, msg_id=None, created_at=0, entities=None, webpage=None):
+    """Parse markdown-rendered message text from either alert source."""
+    if not text:
+        return None
+    if DBOT_MARKER in text:
+        return parse_dbot(text, created_at, msg_id)
+    return parse_alert(text, msg_id, created_at, entities, webpage)
+
+
+def parse_raw(text, msg_id=None, created_at=0, entities=(), webpage=None):
+    """Parse raw message text with TextEntity offsets from either alert source."""
+    if not text:
+        return None
+    if DBOT_MARKER in text:
+        return parse_dbot(text, created_at, msg_id)
+    return parse_alert_raw(text, msg_id, created_at, entities, webpage)
+
+
+def parse_message(message, markdown=False):
+    """Parse a Telethon Message into a ParsedTweet, or None if it is not an Elon tweet."""
+    created_at = int(message.date.timestamp()) if message.date else 0
+    if markdown:
+        return parse_text(message.text, message.id, created_at, message.entities, webpage_url(message))
+
+    text = message.message
+    if not text:
+        return None
+    return parse_raw(text, message.id, created_at, compact_entities(message.entities), webpage_url(message))
@@ -0,0 +1,43 @@
+"""
+Typed result returned by every parser in this package.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from .timeutil import et_buckets, period_start
+from .tweet_types import TweetType
+
+
+@dataclass(slots=True)
+class ParsedTweet:
+    id: str                         # Tweet ID, or "tg_<message id>" when no link was found
+    tweet_type: TweetType           # Compact int code, see tweet_types
+    content: str
+    created_at: int                 # Unix timestamp (UTC)
+    link: Optional[str] = None
+    author: Optional[str] = None    # Account the link points at
+    tg_id: Optional[int] = None     # Telegram message ID
+
+    @property
+    def is_reply(self):
+        return self.tweet_type == TweetType.REPLY
+
+    @property
+    def period_start(self):
+        return period_start(self.created_at)
+
+    def buckets(self):
+        """(date_normalized, hour, date_str) in Eastern Time."""
+        return et_buckets(self.created_at)
+
+    def to_row(self):
+        """Row for the cached_tweets table."""
+        return {
+            "id": self.id,
+            "period_start": self.period_start,
+            "text": self.content,
+            "msg": self.content,
+            "created_at": self.created_at,
+            "is_reply": self.is_reply,
+            "raw_data": {"type": int(self.tweet_type), "link": self.link},
+        }
@@ -0,0 +1,22 @@
+"""
+Precompiled regex patterns shared by every Telegram message parser.
+"""
+import re
+
+# ElonTweetsD bot format ("🚨🚨🚨 / Posted at: / Link:")
+DBOT_HEADER = "🚨🚨🚨"
+DBOT_MARKER = "Posted at:"
+RE_POSTED_AT = re.compile(r"Posted at:.*?(\w{3},\s+\d{1,2}\s+\w{3}\s+\d{4}\s+\d{2}:\d{2}:\d{2}\s+[GS]MT)")
+RE_POSTED_AT_FIELDS = re.compile(
+    r"Posted at:.*?\w{3},\s+(\d{1,2})\s+(\w{3})\s+(\d{4})\s+(\d{2}):(\d{2}):(\d{2})\s+GMT"
+)
+RE_LINK_ELONTWEETS = re.compile(r"Link:.*?(https://x\.com/elonmusk/status/(\d+))")
+
+# elonvitalikalerts channel format (bold header + fxtwitter/x.com links)
+RE_TWEET_LINK = re.compile(r"https://(?:fxtwitter\.com|x\.com|twitter\.com)/(\w+)/status/(\d+)")
+RE_STATUS_ID = re.compile(r"status/(\d+)")
+RE_LINK_AUTHOR = re.compile(r"(?:fxtwitter\.com|x\.com|twitter\.com)/(\w+)")
+
+# Helpers used while building content
+RE_WHITESPACE = re.compile(r"\s+")
+RE_LINE_BREAKS = re.compile(r"\s*\n\s*")
@@ -0,0 +1,86 @@
+"""
+Per-chat format router.
+
+Each source channel only ever posts one format: ElonTweetsD ("🚨🚨🚨 / Posted at: /
+Link:") or the elonvitalikalerts bold header. parse_raw() decides per message
+by scanning the text for "Posted at:"; the router learns a chat's format from
+its first few tweets and then sends every message straight to that parser.
+
+    router = FormatRouter()
+    async for message in client.iter_messages(channel, limit=10000):
+        parsed = router.parse(message)
+
+A message the locked parser rejects is checked against the other format.
+If the chat really changed formats, the lock is dropped and the format is
+learned again.
+"""
+from .alerts import parse_alert_raw
+from .dbot import parse_dbot
+from .entities import compact_entities
+from .message import webpage_url
+from .patterns import DBOT_MARKER
+
+DBOT = "dbot"
+ALERT = "alert"
+
+# Consecutive tweets of one format before a chat is locked to it
+LOCK_AFTER = 3
+
+
+def detect_format(text):
+    return DBOT if DBOT_MARKER in text else ALERT
+
+
+def parse_dbot_raw(text, msg_id=None, created_at=0, entities=(), webpage=None):
+    """parse_dbot with the parse_raw argument order (entities/webpage are not used)."""
+    return parse_dbot(text, created_at, msg_id)
+
+
+RAW_PARSERS = {
+    DBOT: parse_dbot_raw,
+    ALERT: parse_alert_raw,
+}
+
+
+class FormatRouter:
+    """Learns and caches the message format of each chat."""
+
+    def __init__(self, lock_after=LOCK_AFTER):
+        self.lock_after = lock_after
+        self.formats = {}    # chat -> locked format
+        self.streaks = {}    # chat -> (format, consecutive tweets seen)
+
+    def learn(self, chat, fmt):
+        seen_fmt, seen = self.streaks.get(chat, (fmt, 0))
+        seen = seen + 1 if seen_fmt == fmt else 1
+        self.streaks[chat] = (fmt, seen)
+        if seen >= self.lock_after:
+            self.formats[chat] = fmt
+
+    def parse_raw(self, chat, text, msg_id=None, created_at=0, entities=(), webpage=None):
+        """Same result as tg_parser.parse_raw(), routed by the chat's known format."""
+        if not text:
+            return None
+        fmt = self.formats.get(chat)
+        if fmt is not None:
+            parsed = RAW_PARSERS[fmt](text, msg_id, created_at, entities, webpage)
+            if parsed or detect_format(text) == fmt:
+                return parsed
+            # Not this chat's format after all; forget it and learn again
+            del self.formats[chat]
+            self.streaks.pop(chat, None)
+
+        fmt = detect_format(text)
+        parsed = RAW_PARSERS[fmt](text, msg_id, created_at, entities, webpage)
+        if parsed:
+            self.learn(chat, fmt)
+        return parsed
+
+    def parse(self, message, chat=None):
+        """Parse a Telethon Message; chat defaults to message.chat_id."""
+        text = message.message
+        if not text:
+            return None
+        created_at = int(message.date.timestamp()) if message.date else 0
+        return self.parse_raw(message.chat_id if chat is None else chat, text, message.id, created_at,
+                              compact_entities(message.entities), webpage_url(message))
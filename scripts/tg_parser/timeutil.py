@@ -0,0 +1,97 @@
+"""
+Period and Eastern Time bucket helpers used by crawlers and heatmap builders.
+
+Everything here is plain integer arithmetic on unix timestamps (no datetime
+objects, no strptime), since it runs once or twice for every parsed message.
+"""
+from .patterns import RE_POSTED_AT_FIELDS
+
+# Eastern Time offset (UTC-5, DST ignored like the rest of the pipeline)
+ET_OFFSET_SECONDS = -5 * 3600
+
+# Reference period start (Tuesday Dec 23 2025 12pm ET)
+REF_PERIOD_START = 1766509200
+WEEK_SECONDS = 7 * 24 * 3600
+DAY_SECONDS = 24 * 3600
+
+MONTH_NAMES = ("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")
+MONTHS = {name.lower(): i + 1 for i, name in enumerate(MONTH_NAMES)}
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+HOURS = tuple(f"{h:02d}:00" for h in range(24))
+
+
+def period_start(timestamp):
+    """Calculate period start based on the weekly Tuesday-to-Tuesday cycle."""
+    weeks = (timestamp - REF_PERIOD_START) // WEEK_SECONDS
+    return REF_PERIOD_START + weeks * WEEK_SECONDS
+
+
+def days_from_civil(year, month, day):
+    """Days since 1970-01-01 for a proleptic Gregorian date (H. Hinnant's algorithm)."""
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+def civil_from_days(days):
+    """Inverse of days_from_civil: (year, month, day)."""
+    days += 719468
+    era = days // 146097
+    doe = days - era * 146097
+    yoe = (doe - doe // 1460 + doe // 36524 - doe // 146096) // 365
+    doy = doe - (365 * yoe + yoe // 4 - yoe // 100)
+    mp = (5 * doy + 2) // 153
+    day = doy - (153 * mp + 2) // 5 + 1
+    month = mp + 3 if mp < 10 else mp - 9
+    return yoe + era * 400 + (month <= 2), month, day
+
+
+def et_buckets(timestamp):
+    """Return (date_normalized, hour, date_str) for a unix timestamp, e.g. ("2026-01-14", "08:00", "Jan 14")."""
+    days, seconds = divmod(timestamp + ET_OFFSET_SECONDS, DAY_SECONDS)
+    year, month, day = civil_from_days(days)
+    return f"{year:04d}-{month:02d}-{day:02d}", HOURS[seconds // 3600], f"{MONTH_NAMES[month - 1]} {day:02d}"
+
+
+def et_year_bounds(first_year, last_year):
+    """[start, end) unix range covering ET calendar years first_year..last_year."""
+    start = days_from_civil(first_year, 1, 1) * DAY_SECONDS - ET_OFFSET_SECONDS
+    end = days_from_civil(last_year + 1, 1, 1) * DAY_SECONDS - ET_OFFSET_SECONDS
+    return start, end
+
+
+def is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def decode_posted_at(text):
+    """
+    Decode the ElonTweetsD "Posted at: Sat, 10 Jan 2026 14:27:17 GMT" line.
+
+    Returns (timestamp, date_normalized, hour) with the buckets in Eastern Time,
+    or None when the line is missing or the date is invalid.
+    """
+    m = RE_POSTED_AT_FIELDS.search(text)
+    if not m:
+        return None
+    day_s, month_s, year_s, hour_s, minute_s, second_s = m.groups()
+    month = MONTHS.get(month_s.lower())
+    if not month:
+        return None
+    year, day = int(year_s), int(day_s)
+    hour, minute, second = int(hour_s), int(minute_s), int(second_s)
+    max_day = 29 if month == 2 and is_leap(year) else MONTH_DAYS[month - 1]
+    if not 1 <= day <= max_day or hour > 23 or minute > 59 or second > 59:
+        return None
+
+    ts = days_from_civil(year, month, day) * DAY_SECONDS + hour * 3600 + minute * 60 + second
+    et_days, et_seconds = divmod(ts + ET_OFFSET_SECONDS, DAY_SECONDS)
+    if et_days == ts // DAY_SECONDS:
+        date_normalized = f"{year:04d}-{month:02d}-{day:02d}"
+    else:
+        y, mo, d = civil_from_days(et_days)
+        date_normalized = f"{y:04d}-{mo:02d}-{d:02d}"
+    return ts, date_normalized, HOURS[et_seconds // 3600]
@@ -0,0 +1,70 @@
+"""
+Compact tweet type codes and the single-pass header classifiers.
+
+Parsers return a TweetType (an int) instead of a string; it is stored as-is in
+cached_tweets.raw_data["type"]. Rows written before tg_parser still hold the string
+label, so readers must accept both: from_label here, rawTweetData in
+src/lib/cache/index.ts for the dashboard. Use .label where a string is still needed
+(MySQL tweet_type column read by the dashboard, sample JSON files).
+"""
+import re
+from enum import IntEnum
+
+
+class TweetType(IntEnum):
+    UNKNOWN = 0
+    ORIGINAL = 1
+    REPLY = 2
+    RETWEET = 3
+    QUOTE = 4
+
+    @property
+    def label(self):
+        return self.name.lower()
+
+    @classmethod
+    def from_label(cls, value):
+        """Accept a stored code or a legacy string ("reply", "retweet", ...)."""
+        if isinstance(value, int):
+            return cls(value) if value in cls._value2member_map_ else cls.UNKNOWN
+        return cls.__members__.get(str(value).upper(), cls.UNKNOWN)
+
+
+# elonvitalikalerts markdown header: the elonmusk marker directly followed by the type marker
+#   🔄 **elonmusk** `Retweeted` **user**
+#   [💬](...) [elonmusk](https://x.com/elonmusk) **Quoted** [user](...)
+#   [🖇️](...) **elonmusk** `Replied To` **user**
+#   📝 **elonmusk** Tweeted
+RE_ALERT_HEADER = re.compile(
+    r"(?:\*\*elonmusk\*\*|\[elonmusk\]\(\S*?\)) "
+    r"(?:`(?P<retweet>Retweeted)`"
+    r"|\*\*(?P<quote>Quoted)\*\*"
+    r"|`(?P<reply>Replied To)`"
+    r"|(?P<original>Tweeted))"
+)
+
+# ElonTweetsD type line, e.g. "**Reply** from Elon Musk(@elonmusk)"
+RE_DBOT_TYPE = re.compile(r"(?P<reply>Reply)|(?P<retweet>Repost|Retweet)|(?P<quote>Quote)")
+
+GROUP_TYPES = {
+    "retweet": TweetType.RETWEET,
+    "quote": TweetType.QUOTE,
+    "reply": TweetType.REPLY,
+    "original": TweetType.ORIGINAL,
+}
+
+
+def header_end(text):
+    end = text.find('\n')
+    return len(text) if end == -1 else end
+
+
+def classify_alert_header(text):
+    """One regex search over the header line. UNKNOWN for non-Elon or untyped (pinned, deleted) alerts."""
+    m = RE_ALERT_HEADER.search(text, 0, header_end(text))
+    return GROUP_TYPES[m.lastgroup] if m else TweetType.UNKNOWN
+
+
+def classify_dbot_line(line):
+    m = RE_DBOT_TYPE.search(line)
+    return GROUP_TYPES[m.lastgroup] if m else TweetType.ORIGINAL
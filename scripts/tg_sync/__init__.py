@@ -0,0 +1,60 @@
+"""
+Telegram fetch/sync helpers shared by the crawler scripts.
+
+tg_parser turns messages into ParsedTweet records; this package decides which
+messages to request from Telegram and keeps track of what was already synced.
+
+Scripts are run as `python scripts/<name>.py`, which puts this directory on sys.path.
+"""
+from .checkpoints import CheckpointStore, StateStore, Watermark, iter_since
+from .continuity import ContinuityStore, IdRanges, UntrackedIds, fetch_ids, fill_holes
+from .corrections import CorrectionError, MessageCorrections, adjust_heatmap
+from .gaps import Gap, fetch_missing, find_gaps, load_timeline
+from .merge import TweetMerger
+from .peers import PeerCache
+from .polling import PollPlanner
+from .pool import SessionPool, pool_specs
+from .pipeline import IngestPipeline, since_date
+from .race import ALERT_SOURCES, ArrivalRace
+from .scheduler import RequestScheduler, flood_wait_seconds
+from .search import ELON_SEARCH, SearchFetch
+from .shards import crawl_sharded, iter_sharded, time_shards
+from .takeout import takeout_session
+from .updates import UpdateStateStore
+
+__all__ = [
+    "CheckpointStore",
+    "StateStore",
+    "Watermark",
+    "iter_since",
+    "ELON_SEARCH",
+    "SearchFetch",
+    "ContinuityStore",
+    "IdRanges",
+    "UntrackedIds",
+    "fetch_ids",
+    "fill_holes",
+    "CorrectionError",
+    "MessageCorrections",
+    "adjust_heatmap",
+    "Gap",
+    "fetch_missing",
+    "find_gaps",
+    "load_timeline",
+    "TweetMerger",
+    "PeerCache",
+    "PollPlanner",
+    "SessionPool",
+    "pool_specs",
+    "IngestPipeline",
+    "since_date",
+    "ALERT_SOURCES",
+    "ArrivalRace",
+    "RequestScheduler",
+    "flood_wait_seconds",
+    "crawl_sharded",
+    "iter_sharded",
+    "time_shards",
+    "takeout_session",
+    "UpdateStateStore",
+]
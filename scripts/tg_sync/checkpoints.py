@@ -0,0 +1,126 @@
+"""
+Per-channel high-water marks for incremental crawling.
+
+The highest Telegram message id fully ingested per channel is stored in the
+Supabase `crawler_state` key/value table (see supabase_cache_schema.sql). The
+next run then only requests messages above it (iter_messages(min_id=...)).
+If the table is missing or Supabase is unreachable, a JSON file is used
+instead. In CI that file lives in .cache/, which actions/cache keeps between runs.
+
+    store = CheckpointStore(supabase)
+    mark = Watermark(store.get(channel))
+    async for message in iter_since(client, channel, mark.start, first_run_limit=100):
+        mark.seen(message.id)
+        if not write(message):
+            mark.failed(message.id)
+    store.set(channel, mark.value)
+"""
+import json
+import os
+from datetime import datetime, timezone
+
+STATE_TABLE = 'crawler_state'
+DEFAULT_STATE_PATH = os.getenv('TG_CRAWLER_STATE', os.path.join('.cache', 'crawler_state.json'))
+
+
+def checkpoint_key(channel):
+    return f"checkpoint:{str(channel).lower()}"
+
+
+class Watermark:
+    """Tracks the new checkpoint for one run; never moves past a message that failed to write."""
+
+    def __init__(self, start=0):
+        self.start = start
+        self.max_seen = start
+        self.min_failed = None
+
+    def seen(self, msg_id):
+        if msg_id > self.max_seen:
+            self.max_seen = msg_id
+
+    def failed(self, msg_id):
+        if self.min_failed is None or msg_id < self.min_failed:
+            self.min_failed = msg_id
+
+    @property
+    def value(self):
+        if self.min_failed is None:
+            return self.max_seen
+        return max(self.start, min(self.max_seen, self.min_failed - 1))
+
+
+def iter_since(client, channel, min_id, first_run_limit=100, limit=None):
+    """
+    Messages newer than min_id, oldest first, so a run cut short by `limit` still
+    leaves a gap-free checkpoint. Without a checkpoint it falls back to the newest
+    first_run_limit messages (the old behaviour).
+    """
+    if not min_id:
+        return client.iter_messages(channel, limit=first_run_limit)
+    return client.iter_messages(channel, min_id=min_id, reverse=True, limit=limit)
+
+
+class StateStore:
+    """Small key/value store: Supabase crawler_state first, JSON file fallback."""
+
+    def __init__(self, supabase=None, path=DEFAULT_STATE_PATH):
+        self.supabase = supabase
+        self.path = path
+        self.use_table = supabase is not None
+
+    def _read_file(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write_file(self, state):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def _table_failed(self, e):
+        print(f"⚠️ {STATE_TABLE} unavailable ({e}), using {self.path}")
+        self.use_table = False
+
+    def get(self, key, default=None):
+        if self.use_table:
+            try:
+                res = self.supabase.table(STATE_TABLE).select('value').eq('key', key).execute()
+                return res.data[0]['value'] if res.data else default
+            except Exception as e:
+                self._table_failed(e)
+        return self._read_file().get(key, default)
+
+    def set(self, key, value):
+        # The file is always written, so a later run without Supabase access still has the state
+        state = self._read_file()
+        state[key] = value
+        self._write_file(state)
+        if self.use_table:
+            try:
+                self.supabase.table(STATE_TABLE).upsert({
+                    "key": key,
+                    "value": value,
+                    "updated_at": datetime.now(timezone.utc).isoformat(),
+                }).execute()
+            except Exception as e:
+                self._table_failed(e)
+
+
+class CheckpointStore(StateStore):
+    """Highest ingested message id per channel."""
+
+    def get(self, channel, default=0):
+        value = super().get(checkpoint_key(channel))
+        return int(value["max_id"]) if value else default
+
+    def set(self, channel, max_id):
+        if max_id and max_id > self.get(channel):
+            super().set(checkpoint_key(channel), {"max_id": max_id})
@@ -0,0 +1,54 @@
+"""
+Command-line value flags shared by the crawler scripts.
+
+The scripts check bare switches with `"--daemon" in sys.argv`; the few flags
+that take a value (`--shards 8`, `--max-runtime=20700`, `--min-expected 2.5`)
+are read here. A missing or malformed value is a usage error: the script exits
+with status 2 and a one-line message, as argparse would, instead of a traceback.
+
+    shards = int_from_argv(sys.argv, '--shards')
+    workers = workers_from_argv(sys.argv)
+"""
+import os
+import sys
+
+CAST_NAMES = {int: "an integer", float: "a number"}
+
+
+def usage_error(argv, message):
+    prog = os.path.basename(argv[0]) if argv else "script"
+    print(f"{prog}: error: {message}", file=sys.stderr)
+    raise SystemExit(2)
+
+
+def value_from_argv(argv, flag, default, cast):
+    """Read `FLAG VALUE` / `FLAG=VALUE` from the command line, converted with cast."""
+    for i, arg in enumerate(argv):
+        if arg == flag:
+            if i + 1 >= len(argv):
+                usage_error(argv, f"{flag} expects {CAST_NAMES.get(cast, 'a value')}")
+            value = argv[i + 1]
+        elif arg.startswith(flag + '='):
+            value = arg.split('=', 1)[1]
+        else:
+            continue
+        try:
+            return cast(value)
+        except ValueError:
+            usage_error(argv, f"{flag} expects {CAST_NAMES.get(cast, 'a value')}, got {value!r}")
+    return default
+
+
+def int_from_argv(argv, flag, default=0):
+    """Read `FLAG N` / `FLAG=N` from the command line."""
+    return value_from_argv(argv, flag, default, int)
+
+
+def float_from_argv(argv, flag, default=0.0):
+    """Read `FLAG X` / `FLAG=X` (fractional values allowed) from the command line."""
+    return value_from_argv(argv, flag, default, float)
+
+
+def workers_from_argv(argv, default=0):
+    """Read `--workers N` / `--workers=N` from the command line."""
+    return int_from_argv(argv, '--workers', default)
@@ -0,0 +1,173 @@
+"""
+Per-channel record of which Telegram message ids were ingested, to prove nothing was missed.
+
+Channel message ids are consecutive, so the ids a channel has are exactly
+1..newest minus deletions. IdRanges keeps the ids ingested so far as run-length
+intervals ([[lo, hi], ...], inclusive). A crawler that never missed anything
+stores a single interval no matter how long the history is. Anything between
+two intervals is either a message we missed or one that was deleted, and
+get_messages(ids=[...]) tells which. Verifying completeness therefore costs one
+request per 100 missing ids instead of a re-crawl.
+
+Only messages that were handled (written, or not a tweet) are added; a failed
+write leaves a hole that the next check picks up. Ids Telegram reports as
+deleted are added too, so they are not requested again.
+
+This only holds for channels. Private and bot chats (ElonTweets_dBot) draw their
+ids from one counter shared by every chat of the account, so the other chats'
+ids would all look like holes. ContinuityStore.get(channel, peer) returns an
+UntrackedIds for such a peer: nothing is recorded and fill_holes has nothing to
+fetch, leaving those sources to the checkpoint catch-up (iter_since).
+
+    continuity = ContinuityStore(supabase)
+    ranges = continuity.get(channel, await client.get_input_entity(channel))
+    ...
+        ranges.add(message.id)
+    continuity.set(channel, ranges)
+
+    fetched, deleted = await fill_holes(client, channel, ranges, handle)
+"""
+from bisect import bisect_right
+
+from .checkpoints import StateStore
+
+IDS_PER_REQUEST = 100               # Telegram's cap for channels.getMessages
+
+# Matched by name like scheduler.FLOOD_ERRORS, so the module imports without Telethon installed
+CHANNEL_PEERS = {'InputPeerChannel', 'InputPeerChannelFromMessage'}
+
+
+def continuity_key(channel):
+    return f"ids:{str(channel).lower()}"
+
+
+def is_channel_peer(peer):
+    """True for channel input peers, whose message ids are consecutive per channel."""
+    return type(peer).__name__ in CHANNEL_PEERS
+
+
+class IdRanges:
+    """Sorted, disjoint, inclusive [lo, hi] id intervals."""
+
+    def __init__(self, ranges=()):
+        self.starts = []
+        self.ends = []
+        for lo, hi in sorted(ranges):
+            self.add_range(lo, hi)
+
+    def __len__(self):
+        return sum(hi - lo + 1 for lo, hi in zip(self.starts, self.ends))
+
+    def __contains__(self, msg_id):
+        i = bisect_right(self.starts, msg_id) - 1
+        return i >= 0 and msg_id <= self.ends[i]
+
+    def add(self, msg_id):
+        self.add_range(msg_id, msg_id)
+
+    def add_range(self, lo, hi):
+        # First interval that could touch [lo, hi] (adjacent ids merge too)
+        i = bisect_right(self.ends, lo - 2)
+        j = i
+        while j < len(self.starts) and self.starts[j] <= hi + 1:
+            lo = min(lo, self.starts[j])
+            hi = max(hi, self.ends[j])
+            j += 1
+        self.starts[i:j] = [lo]
+        self.ends[i:j] = [hi]
+
+    @property
+    def first(self):
+        return self.starts[0] if self.starts else 0
+
+    @property
+    def last(self):
+        return self.ends[-1] if self.ends else 0
+
+    def missing(self, lo=None, hi=None):
+        """[lo, hi] id ranges not ingested, between the first and last recorded id by default."""
+        if not self.starts and (lo is None or hi is None):
+            return []
+        lo = self.first if lo is None else lo
+        hi = self.last if hi is None else hi
+        holes = []
+        cursor = lo
+        for start, end in zip(self.starts, self.ends):
+            if end < cursor:
+                continue
+            if start > hi:
+                break
+            if start > cursor:
+                holes.append((cursor, start - 1))
+            cursor = end + 1
+        if cursor <= hi:
+            holes.append((cursor, hi))
+        return holes
+
+    def to_list(self):
+        return [[lo, hi] for lo, hi in zip(self.starts, self.ends)]
+
+    def describe(self):
+        holes = self.missing()
+        count = sum(hi - lo + 1 for lo, hi in holes)
+        return f"{len(self)} ids in {len(self.starts)} ranges ({self.first}..{self.last}), {count} missing in {len(holes)} holes"
+
+
+class UntrackedIds(IdRanges):
+    """Stand-in for a private/bot chat: ids are shared across the account, so nothing is recorded."""
+
+    def add_range(self, lo, hi):
+        pass
+
+    def describe(self):
+        return "not tracked (private chat ids are shared across the account)"
+
+
+class ContinuityStore(StateStore):
+    """IdRanges per channel."""
+
+    def get(self, channel, peer=None):
+        """Stored ranges for channel; an UntrackedIds when peer is given and is not a channel."""
+        if peer is not None and not is_channel_peer(peer):
+            return UntrackedIds()
+        return IdRanges(super().get(continuity_key(channel)) or ())
+
+    def set(self, channel, ranges):
+        if ranges.starts:
+            super().set(continuity_key(channel), ranges.to_list())
+
+
+async def fetch_ids(client, channel, holes, deleted=None):
+    """
+    Messages in the given id ranges, IDS_PER_REQUEST ids per get_messages call.
+    Ids Telegram returns no message for (deleted) are added to the `deleted` IdRanges.
+    """
+    ids = [msg_id for lo, hi in holes for msg_id in range(lo, hi + 1)]
+    for i in range(0, len(ids), IDS_PER_REQUEST):
+        chunk = ids[i:i + IDS_PER_REQUEST]
+        messages = await client.get_messages(channel, ids=chunk)
+        for msg_id, message in zip(chunk, messages):
+            if message is None:
+                if deleted is not None:
+                    deleted.add(msg_id)
+                continue
+            yield message
+
+
+async def fill_holes(client, channel, ranges, handle):
+    """
+    Fetch every id missing from ranges and pass it to `await handle(message)`; ids it
+    returns True for, and deleted ids, are added to ranges. Returns (fetched, deleted).
+    """
+    holes = ranges.missing()
+    if not holes:
+        return 0, 0
+    deleted = IdRanges()
+    fetched = 0
+    async for message in fetch_ids(client, channel, holes, deleted):
+        fetched += 1
+        if await handle(message):
+            ranges.add(message.id)
+    for lo, hi in deleted.to_list():
+        ranges.add_range(lo, hi)
+    return fetched, len(deleted)
@@ -0,0 +1,146 @@
+"""
+O(1) corrections for edited and deleted alert messages.
+
+When a source edits or deletes a message (a wrong tweet, say), the row it wrote
+to cached_tweets is stale, and so is one cached_heatmap bucket. Rebuilding the
+heatmap from every tweet fixed that before. The parse cache already maps each
+(chat_id, message id) to the tweet that message wrote, so a correction touches
+just that row and that bucket:
+
+- edit, same tweet id: upsert the row. If the ET hour or reply flag changed, the
+  old bucket gets -1 and the new one +1.
+- edit into another tweet or a non-tweet: delete the old row and take -1 from its
+  bucket. A new tweet is then ingested like a new message.
+- delete: delete the row and take -1 from its bucket.
+
+Only the message that owns a row (cache WRITTEN) corrects it. Copies that lost
+the ArrivalRace (DUPLICATE) never touch the row.
+
+A correction that fails raises CorrectionError after logging it. The cache is
+left as it was, so callers treat the update like a failed write (mark.failed /
+updates.failed) and the next catch-up retries it.
+
+Telegram sends deletions in private and bot chats without a chat id. Their
+message ids are unique across the account's private chats, so the owner is
+looked up by message id alone (ParseCache.private_chat).
+
+    corrections = MessageCorrections(supabase, cache, race)
+    try:
+        if message.edit_date and corrections.edited(message):
+            return                  # handled; otherwise ingest as a new message
+        corrections.deleted(event.chat_id, event.deleted_ids)
+    except CorrectionError:
+        ...                         # not applied: keep the checkpoint/pts behind it
+"""
+from tg_parser.cache import message_key
+
+
+class CorrectionError(Exception):
+    """An edit/delete correction could not be applied; retry the update later."""
+
+
+def adjust_heatmap(supabase, parsed, delta):
+    """Add delta (+1/-1) to the tweet or reply count of the tweet's ET hour bucket."""
+    date_norm, hour_str, date_str = parsed.buckets()
+    field = 'reply_count' if parsed.is_reply else 'tweet_count'
+    res = supabase.table('cached_heatmap').select('*').match({"date_normalized": date_norm, "hour": hour_str}).execute()
+    if res.data:
+        row = res.data[0]
+        supabase.table('cached_heatmap').update({field: max(0, row[field] + delta)}).eq('id', row['id']).execute()
+    elif delta > 0:
+        supabase.table('cached_heatmap').insert({
+            "date_str": date_str,
+            "date_normalized": date_norm,
+            "hour": hour_str,
+            "tweet_count": 0 if parsed.is_reply else delta,
+            "reply_count": delta if parsed.is_reply else 0,
+        }).execute()
+
+
+def bucket(parsed):
+    """What decides a tweet's heatmap cell: ET date, hour and reply flag."""
+    return parsed.buckets()[:2], parsed.is_reply
+
+
+class MessageCorrections:
+    """Applies edits/deletes of already-written messages to cached_tweets and cached_heatmap."""
+
+    def __init__(self, supabase, cache, race=None):
+        self.supabase = supabase
+        self.cache = cache
+        self.race = race            # ArrivalRace to forget removed tweet ids, if racing sources
+        self.updated = 0
+        self.removed = 0
+
+    def remove(self, tweet):
+        self.supabase.table('cached_tweets').delete().eq('id', tweet.id).execute()
+        adjust_heatmap(self.supabase, tweet, -1)
+        if self.race is not None:
+            self.race.forget(tweet.id)
+        self.removed += 1
+        print(f"   🗑️ Removed {tweet.id} ({tweet.buckets()[0]} {tweet.buckets()[1]})")
+
+    def edited(self, message):
+        """
+        Correct the row an edited message wrote. True when fully handled; False when
+        the message owns no row or now holds a different tweet (ingest it as new).
+        Raises CorrectionError when Supabase rejected the correction.
+        """
+        key = message_key(message)
+        if self.cache.lookup(*key)[0]:
+            return False            # this edit was already seen; the cache handles it
+        chat_id, msg_id, _ = key
+        old = self.cache.owned(chat_id, msg_id)
+        if old is None:
+            return False
+        # The cache keeps pointing at the old tweet until the correction went through
+        new = self.cache.reparse(message)
+        try:
+            if new is not None and new.id == old.id:
+                self.supabase.table('cached_tweets').upsert(new.to_row()).execute()
+                if bucket(new) != bucket(old):
+                    adjust_heatmap(self.supabase, old, -1)
+                    adjust_heatmap(self.supabase, new, 1)
+                self.cache.store(*key, new, written=True)
+                self.updated += 1
+                print(f"   ✏️ Updated {new.id} after edit of message {msg_id}")
+                return True
+            self.remove(old)
+        except Exception as e:
+            print(f"   ⚠️ Correction for edited message {msg_id} failed: {e}")
+            raise CorrectionError(f"edited message {msg_id}") from e
+        if new is None:
+            self.cache.store(*key, None)
+            return True
+        self.cache.forget(chat_id, msg_id)
+        return False
+
+    def deleted(self, chat_id, msg_ids):
+        """
+        Remove the rows written by deleted messages; returns how many were removed.
+        chat_id is None for private/bot chats. Raises CorrectionError, after trying
+        every id, if any removal failed.
+        """
+        removed = 0
+        failed = []
+        for msg_id in msg_ids:
+            owner = chat_id if chat_id is not None else self.cache.private_chat(msg_id)
+            if owner is None:
+                continue
+            old = self.cache.owned(owner, msg_id)
+            if old is None:
+                continue
+            try:
+                self.remove(old)
+                removed += 1
+            except Exception as e:
+                print(f"   ⚠️ Correction for deleted message {msg_id} failed: {e}")
+                failed.append(msg_id)
+                continue
+            self.cache.forget(owner, msg_id)
+        if failed:
+            raise CorrectionError(f"deleted messages {failed}")
+        return removed
+
+    def stats(self):
+        return f"{self.updated} edits applied, {self.removed} tweets removed"
@@ -0,0 +1,126 @@
+"""
+Gap detection over the whole cached_tweets timeline, and targeted backfill.
+
+The timeline is loaded as one array('q') of created_at values (oldest first),
+and consecutive differences are taken in a single pass over it. A gap on its
+own is not suspicious: Elon is quiet most nights. Each gap is scored by how
+many tweets the timeline's own ET hour-of-day profile predicts for the hours
+it covers. Only gaps that are long AND should have held tweets are reported.
+
+Repair fetches just the gap window from each source. It uses an offset_date
+cursor per window (shards.shard_messages) padded by SOURCE_LAG for the
+alert's delay after the tweet. Only tweets that are not already stored are
+upserted.
+
+    timeline = load_timeline(supabase)
+    for gap in find_gaps(timeline):
+        missing = await fetch_missing(client, ALERT_SOURCES, gap, known_ids(supabase, gap))
+"""
+import operator
+from array import array
+from datetime import datetime, timedelta, timezone
+from itertools import compress
+from typing import NamedTuple
+
+from tg_parser import FormatRouter
+from tg_parser.timeutil import ET_OFFSET_SECONDS
+
+from .shards import shard_messages
+
+MIN_GAP_HOURS = 6
+MIN_EXPECTED = 3.0              # tweets the hourly profile predicts before a gap is suspicious
+SOURCE_LAG = timedelta(hours=1) # alerts are posted after the tweet; widen the fetch window by this
+PAGE = 1000                     # Supabase rows per request
+
+
+class Gap(NamedTuple):
+    start: int                  # created_at of the last tweet before the gap
+    end: int                    # created_at of the first tweet after it
+    expected: float             # tweets the hour-of-day profile predicts inside it
+
+    @property
+    def hours(self):
+        return (self.end - self.start) / 3600
+
+    def describe(self):
+        t1 = datetime.fromtimestamp(self.start, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+        t2 = datetime.fromtimestamp(self.end, tz=timezone.utc).strftime('%Y-%m-%d %H:%M')
+        return f"{self.hours:.2f} hours between {t1} and {t2} UTC (~{self.expected:.1f} tweets expected)"
+
+
+def load_timeline(supabase, table='cached_tweets'):
+    """Every created_at in the table, oldest first, paged past Supabase's 1000-row cap."""
+    timeline = array('q')
+    offset = 0
+    while True:
+        res = supabase.from_(table).select('created_at').order('created_at').range(offset, offset + PAGE - 1).execute()
+        timeline.extend(row['created_at'] for row in res.data or [])
+        if len(res.data or []) < PAGE:
+            return timeline
+        offset += PAGE
+
+
+def hourly_rates(timeline):
+    """Average tweets per ET hour-of-day (24 floats) over the span of the timeline."""
+    counts = [0] * 24
+    offset = ET_OFFSET_SECONDS
+    for ts in timeline:
+        counts[(ts + offset) // 3600 % 24] += 1
+    days = max(1.0, (timeline[-1] - timeline[0]) / 86400) if timeline else 1.0
+    return [count / days for count in counts]
+
+
+def expected_tweets(rates, start, end):
+    """Tweets the hourly profile predicts in [start, end), pro-rating partial hours."""
+    total = 0.0
+    t = start
+    while t < end:
+        hour_end = min(end, (t // 3600 + 1) * 3600)
+        total += rates[((t + ET_OFFSET_SECONDS) // 3600) % 24] * (hour_end - t) / 3600
+        t = hour_end
+    return total
+
+
+def find_gaps(timeline, min_gap_hours=MIN_GAP_HOURS, min_expected=MIN_EXPECTED):
+    """Suspicious gaps in a sorted created_at array, longest first."""
+    if len(timeline) < 2:
+        return []
+    starts = timeline[:-1]
+    ends = timeline[1:]
+    diffs = array('q', map(operator.sub, ends, starts))
+    long_gaps = [d > min_gap_hours * 3600 for d in diffs]
+    rates = hourly_rates(timeline)
+    gaps = []
+    for start, end in zip(compress(starts, long_gaps), compress(ends, long_gaps)):
+        expected = expected_tweets(rates, start, end)
+        if expected >= min_expected:
+            gaps.append(Gap(start, end, expected))
+    gaps.sort(key=lambda gap: gap.end - gap.start, reverse=True)
+    return gaps
+
+
+def known_ids(supabase, gap, table='cached_tweets'):
+    """Tweet ids already stored inside the gap (normally none, but upserts must stay idempotent)."""
+    res = supabase.from_(table).select('id').gt('created_at', gap.start).lt('created_at', gap.end).execute()
+    return {row['id'] for row in res.data or []}
+
+
+async def fetch_missing(client, channels, gap, known=(), router=None):
+    """Tweets inside the gap that the given channels have and cached_tweets lacks."""
+    router = router or FormatRouter()
+    seen = set(known)
+    missing = []
+    start = datetime.fromtimestamp(gap.start, tz=timezone.utc) - SOURCE_LAG
+    end = datetime.fromtimestamp(gap.end, tz=timezone.utc) + SOURCE_LAG
+    for channel in channels:
+        scanned = 0
+        async for message in shard_messages(client, channel, start, end):
+            scanned += 1
+            if not message.message:
+                continue
+            parsed = router.parse(message, chat=channel)
+            if parsed and gap.start < parsed.created_at < gap.end and parsed.id not in seen:
+                seen.add(parsed.id)
+                missing.append(parsed)
+        print(f"   📡 {channel}: scanned {scanned} messages in window")
+    return missing
@@ -0,0 +1,48 @@
+"""
+Streaming dedup of tweets arriving from several channels at once.
+
+The same tweet can come from both @elonvitalikalerts and @ElonTweets_dBot. Each
+record is offered as soon as it is parsed. The merger keeps one record per
+tweet id, picking the richest one, so nothing has to be sorted or grouped at
+the end.
+
+Richness is (has content, has link, content length, source priority). This
+gives the same winner whatever order the concurrent fetches finish in. Ties go
+to the channel listed first, as the sequential sync did.
+"""
+
+
+class TweetMerger:
+    """Keeps the richest ParsedTweet per tweet id."""
+
+    def __init__(self, sources=()):
+        # Earlier sources win ties
+        self.priority = {source: -i for i, source in enumerate(sources)}
+        self.tweets = {}
+        self.ranks = {}
+        self.offered = 0
+
+    def rank(self, tweet, source):
+        content = tweet.content or ""
+        return bool(content), tweet.link is not None, len(content), self.priority.get(source, -len(self.priority))
+
+    def offer(self, tweet, source=None):
+        """Add a record; returns True if it is new or replaced a poorer duplicate."""
+        self.offered += 1
+        rank = self.rank(tweet, source)
+        current = self.ranks.get(tweet.id)
+        if current is not None and current >= rank:
+            return False
+        self.tweets[tweet.id] = tweet
+        self.ranks[tweet.id] = rank
+        return True
+
+    @property
+    def duplicates(self):
+        return self.offered - len(self.tweets)
+
+    def __len__(self):
+        return len(self.tweets)
+
+    def values(self):
+        return list(self.tweets.values())
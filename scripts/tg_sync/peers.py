@@ -0,0 +1,97 @@
+"""
+Persisted username -> input peer cache, so usernames are resolved once.
+
+Passing 'elonvitalikalerts' to iter_messages() or get_entity() makes Telethon
+call ResolveUsername unless the session already knows the username. A SQLite
+session remembers entities. A StringSession (CI) starts empty on every run,
+so each poll pays an extra round trip, and ResolveUsername is one of the most
+flood-limited requests.
+
+PeerCache keeps the resolved InputPeer (kind, id, access_hash) per username
+in the crawler_state table / JSON file (see checkpoints.StateStore), loaded
+once per run. An access_hash is per account, so a cached peer can go stale when
+another account's session is used. STALE_PEER_ERRORS tell the caller to
+forget() it and resolve again.
+
+    peers = PeerCache(StateStore(supabase))
+    client = RequestScheduler(TelegramClient(...), peers=peers)
+    async for message in client.iter_messages('elonvitalikalerts', ...):   # no ResolveUsername
+
+    peer = await peers.resolve('elonvitalikalerts', client.get_input_entity)   # bare client
+"""
+from .checkpoints import StateStore
+
+PEERS_KEY = 'peers'
+
+# Input peer class -> its id field; matched by name so the module imports without Telethon
+PEER_KINDS = {
+    'InputPeerChannel': 'channel_id',
+    'InputPeerUser': 'user_id',
+    'InputPeerChat': 'chat_id',
+}
+STALE_PEER_ERRORS = {'ChannelInvalidError', 'ChannelPrivateError', 'PeerIdInvalidError', 'UserIdInvalidError'}
+
+
+def is_stale_peer(error):
+    return type(error).__name__ in STALE_PEER_ERRORS
+
+
+def username_key(entity):
+    """Cache key for a username / t.me link, or None for anything already a peer or an id."""
+    if not isinstance(entity, str):
+        return None
+    name = entity.strip().lower().removeprefix('https://').removeprefix('t.me/').lstrip('@')
+    return name or None
+
+
+class PeerCache:
+    """{username: {"kind", "id", "access_hash"}} persisted through a StateStore."""
+
+    def __init__(self, store=None, key=PEERS_KEY):
+        self.store = store or StateStore()
+        self.key = key
+        self.peers = self.store.get(key) or {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, entity):
+        """The cached input peer for a username, or None."""
+        stored = self.peers.get(username_key(entity))
+        if not stored:
+            return None
+        from telethon.tl import types
+        kind = stored['kind']
+        fields = {PEER_KINDS[kind]: stored['id']}
+        if kind != 'InputPeerChat':
+            fields['access_hash'] = stored['access_hash']
+        return getattr(types, kind)(**fields)
+
+    def put(self, entity, peer):
+        name = username_key(entity)
+        kind = type(peer).__name__
+        if not name or kind not in PEER_KINDS:
+            return
+        value = {"kind": kind, "id": getattr(peer, PEER_KINDS[kind]), "access_hash": getattr(peer, 'access_hash', None)}
+        if self.peers.get(name) != value:
+            self.peers[name] = value
+            self.store.set(self.key, self.peers)
+
+    def forget(self, entity):
+        if self.peers.pop(username_key(entity), None) is not None:
+            self.store.set(self.key, self.peers)
+
+    async def resolve(self, entity, lookup):
+        """Input peer for entity; usernames come from the cache or `await lookup(entity)` (then cached)."""
+        if username_key(entity) is None:
+            return entity
+        peer = self.get(entity)
+        if peer is not None:
+            self.hits += 1
+            return peer
+        self.misses += 1
+        peer = await lookup(entity)
+        self.put(entity, peer)
+        return peer
+
+    def stats(self):
+        return f"{self.hits} cached peers used, {self.misses} resolved"
@@ -0,0 +1,126 @@
+"""
+Bounded-memory streaming ingest for history crawls.
+
+Instead of collecting every tweet and writing at the end, messages flow through
+five stages connected by bounded asyncio queues:
+
+    fetch -> parse -> validate + aggregate -> write
+
+A full queue blocks the stage feeding it (backpressure), so memory holds at
+most a few queues' worth of messages, however long the history is. The
+writer flushes batches continuously, in a worker thread (the Supabase and
+MySQL clients are blocking), while fetching carries on. The heatmap is
+aggregated on the fly in a HeatmapCounter (one counter per ET hour). If a
+crawl crashes, the batches already written stay written.
+
+    pipeline = IngestPipeline(write=upsert_rows, validate=in_window)
+    await pipeline.run(since_date(client.iter_messages(channel), six_months_ago))
+    save_heatmap(pipeline.heatmap.rows())
+"""
+import asyncio
+
+from tg_parser import HeatmapCounter
+from tg_parser.batch import BatchParser
+
+QUEUE_SIZE = 1000       # messages / parsed tweets buffered between stages
+MAX_BATCHES = 4         # write batches waiting for the writer
+PROGRESS_EVERY = 10     # batches between progress lines
+
+DONE = object()
+
+
+async def since_date(messages, since):
+    """Pass messages through until the first one older than `since` (newest-first cursors)."""
+    async for message in messages:
+        if message.date < since:
+            print(f"⏹️ Reached boundary at {message.date}")
+            break
+        yield message
+
+
+class IngestPipeline:
+    """fetch -> parse -> validate/aggregate -> write with bounded queues between stages."""
+
+    def __init__(self, write, parser=None, validate=None, batch_size=100,
+                 queue_size=QUEUE_SIZE, max_batches=MAX_BATCHES):
+        self.write = write              # blocking callable(list of ParsedTweet); runs in a thread
+        self.parser = parser or BatchParser()
+        self.validate = validate        # callable(ParsedTweet) -> bool, None to accept all
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.max_batches = max_batches
+        self.heatmap = HeatmapCounter()
+        self.fetched = 0
+        self.parsed = 0
+        self.invalid = 0
+        self.written = 0
+        self.failed = 0
+
+    async def fetch_stage(self, messages, out):
+        async for message in messages:
+            self.fetched += 1
+            await out.put(message)
+        await out.put(DONE)
+
+    async def parse_stage(self, inbox, out):
+        while (message := await inbox.get()) is not DONE:
+            for parsed in await self.parser.feed(message):
+                self.parsed += 1
+                await out.put(parsed)
+        for parsed in await self.parser.flush():
+            self.parsed += 1
+            await out.put(parsed)
+        await out.put(DONE)
+
+    async def aggregate_stage(self, inbox, out):
+        batch = []
+        while (parsed := await inbox.get()) is not DONE:
+            if self.validate is not None and not self.validate(parsed):
+                self.invalid += 1
+                continue
+            self.heatmap.add(parsed)
+            batch.append(parsed)
+            if len(batch) >= self.batch_size:
+                await out.put(batch)
+                batch = []
+        if batch:
+            await out.put(batch)
+        await out.put(DONE)
+
+    async def write_stage(self, inbox):
+        batches = 0
+        while (batch := await inbox.get()) is not DONE:
+            try:
+                await asyncio.to_thread(self.write, batch)
+                self.written += len(batch)
+            except Exception as e:
+                self.failed += len(batch)
+                print(f"   ⚠️ Error saving batch: {e}")
+            batches += 1
+            if batches % PROGRESS_EVERY == 0:
+                print(f"   💾 {self.progress()}")
+
+    def progress(self):
+        return (f"fetched {self.fetched} messages, parsed {self.parsed} tweets, "
+                f"written {self.written}, invalid {self.invalid}, failed {self.failed}")
+
+    async def run(self, messages):
+        """Drain an async iterable of Telethon messages through every stage."""
+        messages_q = asyncio.Queue(self.queue_size)
+        tweets_q = asyncio.Queue(self.queue_size)
+        batches_q = asyncio.Queue(self.max_batches)
+        tasks = [
+            asyncio.create_task(self.fetch_stage(messages, messages_q)),
+            asyncio.create_task(self.parse_stage(messages_q, tweets_q)),
+            asyncio.create_task(self.aggregate_stage(tweets_q, batches_q)),
+            asyncio.create_task(self.write_stage(batches_q)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # A failing stage would leave its neighbours blocked on a queue forever
+            for task in tasks:
+                task.cancel()
+            self.parser.close()
+        print(f"   ✅ {self.progress()}")
+        return self
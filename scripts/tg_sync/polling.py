@@ -0,0 +1,129 @@
+"""
+Adaptive poll intervals from Elon's hour-of-week activity.
+
+A flat poll interval is too slow in a 25-tweets-per-hour burst and wasted at 3 a.m.
+PollPlanner picks the time until the next poll from two signals:
+
+- the cached_heatmap profile: average tweets (including replies) in each of the
+  168 ET hours of the week over the last PROFILE_WEEKS weeks (or fewer, when the
+  heatmap does not go back that far)
+- recent inter-arrival times: while tweets are arriving (the last one no older
+  than BURST_WINDOW), the rate implied by the median gap between the last
+  RECENT_ARRIVALS tweets, if that is higher than the profile
+
+The interval is INTERVAL_SCALE / sqrt(rate) seconds, clamped to
+[MIN_INTERVAL, MAX_INTERVAL]. For Poisson arrivals, spacing polls by
+1/sqrt(rate) gives the lowest mean latency for a fixed number of polls. A
+12-tweets/hour burst polls about every 2 minutes and a dead hour every 15.
+
+    planner = PollPlanner.from_supabase(supabase)
+    while ...:
+        for parsed in synced_tweets:
+            planner.seen(parsed.created_at)
+        await asyncio.sleep(planner.next_interval())
+"""
+import time
+from math import sqrt
+from statistics import median
+
+from tg_parser.timeutil import DAY_SECONDS, ET_OFFSET_SECONDS, civil_from_days, days_from_civil
+
+PROFILE_WEEKS = 8
+MIN_INTERVAL = 45               # seconds; even a burst polls at most ~80 times an hour
+MAX_INTERVAL = 15 * 60          # quiet hours still poll four times an hour
+INTERVAL_SCALE = 400           # seconds * sqrt(tweets/hour): 1/h -> 400s, 16/h -> 100s
+RECENT_ARRIVALS = 20            # tweets whose gaps give the burst rate
+BURST_WINDOW = 30 * 60          # a burst is over once no tweet arrived for this long
+PAGE = 1000                     # Supabase rows per request
+
+
+def hour_of_week(timestamp):
+    """ET hour of the week, 0 = Monday 00:00."""
+    days, seconds = divmod(timestamp + ET_OFFSET_SECONDS, DAY_SECONDS)
+    # 1970-01-01 was a Thursday (weekday 3)
+    return (days + 3) % 7 * 24 + seconds // 3600
+
+
+def weekly_profile(rows):
+    """168 average tweets/hour from cached_heatmap rows.
+
+    Each hour of the week is averaged over the days the rows actually cover, from
+    the first to the last date, so a heatmap with only two weeks of history is not
+    diluted as if it had PROFILE_WEEKS.
+    """
+    counts = [0.0] * 168
+    first = last = None
+    for row in rows:
+        year, month, day = map(int, row['date_normalized'].split('-'))
+        days = days_from_civil(year, month, day)
+        first = days if first is None else min(first, days)
+        last = days if last is None else max(last, days)
+        hour = int(str(row['hour']).split(':')[0])
+        counts[(days + 3) % 7 * 24 + hour] += (row.get('tweet_count') or 0) + (row.get('reply_count') or 0)
+    if first is None:
+        return counts
+    full_weeks, extra_days = divmod(last - first + 1, 7)
+    first_weekday = (first + 3) % 7
+    # The leftover days of a partial week start at the first date's weekday
+    covered = [full_weeks + ((weekday - first_weekday) % 7 < extra_days) for weekday in range(7)]
+    return [count / (covered[i // 24] or 1) for i, count in enumerate(counts)]
+
+
+class PollPlanner:
+    """Seconds until the next poll, from the hour-of-week profile and the recent arrival rate."""
+
+    def __init__(self, profile, recent=()):
+        self.profile = profile
+        self.recent = sorted(recent)[-RECENT_ARRIVALS:]
+
+    @classmethod
+    def from_supabase(cls, supabase, weeks=PROFILE_WEEKS):
+        """Profile from the last `weeks` weeks of cached_heatmap, seeded with the newest tweet times."""
+        since = int(time.time()) - weeks * 7 * DAY_SECONDS
+        year, month, day = civil_from_days((since + ET_OFFSET_SECONDS) // DAY_SECONDS)
+        cutoff = f"{year:04d}-{month:02d}-{day:02d}"
+        rows = []
+        offset = 0
+        while True:
+            res = (supabase.table('cached_heatmap').select('date_normalized, hour, tweet_count, reply_count')
+                   .gte('date_normalized', cutoff).range(offset, offset + PAGE - 1).execute())
+            rows.extend(res.data or [])
+            if len(res.data or []) < PAGE:
+                break
+            offset += PAGE
+        res = supabase.table('cached_tweets').select('created_at').order('created_at', desc=True).limit(RECENT_ARRIVALS).execute()
+        return cls(weekly_profile(rows), [row['created_at'] for row in res.data or []])
+
+    def seen(self, created_at):
+        """Record a newly ingested tweet's time."""
+        if not created_at:
+            return
+        self.recent.append(created_at)
+        self.recent.sort()
+        del self.recent[:-RECENT_ARRIVALS]
+
+    def burst_rate(self, now):
+        """Tweets/hour implied by recent gaps, or 0 once the burst is over."""
+        if len(self.recent) < 2 or now - self.recent[-1] > BURST_WINDOW:
+            return 0.0
+        gap = median(b - a for a, b in zip(self.recent, self.recent[1:]))
+        return 3600 / max(gap, 1)
+
+    def profile_rate(self, now):
+        # The next hour counts too, so a quiet 07:55 doesn't sleep through the start of a busy 08:00
+        return max(self.profile[hour_of_week(int(now))], self.profile[hour_of_week(int(now) + MAX_INTERVAL)])
+
+    def rate(self, now=None):
+        now = now or time.time()
+        return max(self.profile_rate(now), self.burst_rate(now))
+
+    def next_interval(self, now=None):
+        rate = self.rate(now)
+        if rate <= 0:
+            return MAX_INTERVAL
+        return max(MIN_INTERVAL, min(MAX_INTERVAL, INTERVAL_SCALE / sqrt(rate)))
+
+    def describe(self, now=None):
+        now = now or time.time()
+        return (f"profile {self.profile_rate(now):.1f}/h, "
+                f"recent {self.burst_rate(now):.1f}/h")
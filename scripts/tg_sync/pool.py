@@ -0,0 +1,119 @@
+"""
+Several Telegram accounts crawling as one client.
+
+FloodWaits are per account, so one session caps a backfill however it is
+sharded. SessionPool holds one RequestScheduler per session and has the same
+iter_messages() interface. Each new cursor (a time shard, a channel) starts
+on the account with the fewest cursors that is not paused. When a cursor hits
+a FloodWait, its account is paused and the cursor moves to the next free
+account, resuming from its last message (see scheduler.resumable_messages).
+Only when every account is paused does it sleep. Results are merged by the
+caller exactly as with one client (crawl_sharded stitches shards in date
+order), so throughput scales with the number of accounts.
+
+    pool = SessionPool.from_specs(pool_specs(sys.argv), API_ID, API_HASH)
+    await pool.start()
+    tweets = await crawl_sharded(pool, channel, since, until, shards=8 * pool.size)
+    print(pool.summary())
+
+Sessions come from `--sessions name1,name2` (local session files, each logged in
+once) and/or TG_SESSION_STRINGS (StringSessions separated by commas or whitespace).
+"""
+import asyncio
+import os
+import re
+
+from .scheduler import RequestScheduler, resumable_messages
+
+
+def pool_specs(argv, env=None):
+    """Session names from --sessions a,b (or --sessions=a,b) plus StringSessions from TG_SESSION_STRINGS."""
+    env = os.environ if env is None else env
+    specs = []
+    for i, arg in enumerate(argv):
+        if arg == '--sessions' and i + 1 < len(argv):
+            specs.extend(argv[i + 1].split(','))
+        elif arg.startswith('--sessions='):
+            specs.extend(arg.split('=', 1)[1].split(','))
+    specs = [('file', name.strip()) for name in specs if name.strip()]
+    specs.extend(('string', s) for s in re.split(r'[\s,]+', env.get('TG_SESSION_STRINGS', '')) if s)
+    return specs
+
+
+class SessionPool:
+    """RequestSchedulers for several accounts behind one iter_messages()."""
+
+    def __init__(self, clients):
+        self.sessions = [c if isinstance(c, RequestScheduler) else RequestScheduler(c) for c in clients]
+        if not self.sessions:
+            raise ValueError("SessionPool needs at least one session")
+        self.cursors = {id(session): 0 for session in self.sessions}
+        self.moves = 0
+
+    @classmethod
+    def from_specs(cls, specs, api_id, api_hash):
+        from telethon import TelegramClient
+        from telethon.sessions import StringSession
+        clients = []
+        for kind, value in specs:
+            session = StringSession(value) if kind == 'string' else value
+            clients.append(TelegramClient(session, int(api_id), api_hash))
+        return cls(clients)
+
+    @property
+    def size(self):
+        return len(self.sessions)
+
+    @property
+    def primary(self):
+        """The first session, for work that needs one account (entity lookups, takeout)."""
+        return self.sessions[0]
+
+    async def start(self):
+        for session in self.sessions:
+            await session.start()
+
+    async def disconnect(self):
+        await asyncio.gather(*(session.disconnect() for session in self.sessions))
+
+    def least_busy(self):
+        # Unpaused accounts first, then the fewest open cursors, then the shortest remaining pause
+        return min(self.sessions, key=lambda s: (s.paused_for > 0, self.cursors[id(s)], s.paused_for))
+
+    async def iter_messages(self, entity, limit=None, **kwargs):
+        """client.iter_messages() spread over the pool; a FloodWait moves the cursor to another account."""
+        current = None
+
+        def pick(flooded):
+            nonlocal current
+            session = self.least_busy()
+            if flooded is not None:
+                self.cursors[id(flooded)] -= 1
+                if session is not flooded:
+                    self.moves += 1
+                    print(f"   🔀 Cursor moved from session {self.sessions.index(flooded) + 1} "
+                          f"to {self.sessions.index(session) + 1} after a FloodWait")
+            self.cursors[id(session)] += 1
+            current = session
+            return session
+
+        try:
+            async for message in resumable_messages(pick, entity, limit, **kwargs):
+                yield message
+        finally:
+            if current is not None:
+                self.cursors[id(current)] -= 1
+
+    async def get_messages(self, *args, **kwargs):
+        return await self.least_busy().get_messages(*args, **kwargs)
+
+    async def get_entity(self, entity):
+        return await self.primary.get_entity(entity)
+
+    async def get_input_entity(self, entity):
+        return await self.primary.get_input_entity(entity)
+
+    def summary(self):
+        lines = [f"{self.size} sessions, {self.moves} cursor moves"]
+        lines.extend(f"      session {i + 1}: {session.summary()}" for i, session in enumerate(self.sessions))
+        return "\n".join(lines)
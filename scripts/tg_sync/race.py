@@ -0,0 +1,118 @@
+"""
+First-arrival-wins racing across redundant alert channels.
+
+Both alert channels repost the same tweets. Listening to all of them at once
+gives the latency of whichever is fastest at the moment, and keeps data flowing
+when one goes quiet (ElonTweets_dBot stopped on Jan 11). The first arrival of a
+tweet id is written straight away. Later copies are dropped by a bounded set of
+recent ids, seeded from cached_tweets on startup so a restart doesn't write and
+count the same tweet again.
+
+Per source it records:
+- wins: first arrivals
+- lag: seconds from "Posted at" to arrival
+- behind: how far duplicates trail the winner
+- last_arrival: spots a feed that has gone quiet
+
+    race = ArrivalRace(ALERT_SOURCES)
+    if race.arrive(parsed, source):
+        write(parsed)
+    print(race.report())
+"""
+import os
+import time
+from collections import OrderedDict
+
+# Configured alert feeds, most complete first (also the tie-break order of TweetMerger)
+ALERT_SOURCES = tuple(os.getenv('TG_ALERT_SOURCES', 'elonvitalikalerts,ElonTweets_dBot').split(','))
+RECENT_IDS = 5000               # tweet ids remembered for duplicate detection
+QUIET_AFTER = 6 * 3600          # seconds without arrivals before a source is reported quiet
+
+
+class SourceStats:
+    __slots__ = ("wins", "duplicates", "lag_total", "lag_max", "behind_total", "behind_max", "behind_count",
+                 "last_arrival")
+
+    def __init__(self):
+        self.wins = 0
+        self.duplicates = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.behind_total = 0.0
+        self.behind_max = 0.0
+        self.behind_count = 0           # duplicates of live winners (seeded ids have no arrival time)
+        self.last_arrival = None
+
+    @property
+    def arrivals(self):
+        return self.wins + self.duplicates
+
+
+class ArrivalRace:
+    """Decides which copy of a tweet is written; tracks per-source arrival lag."""
+
+    def __init__(self, sources=ALERT_SOURCES, recent_ids=RECENT_IDS):
+        self.recent = OrderedDict()     # tweet id -> (winning source, arrival time); oldest first
+        self.recent_ids = recent_ids
+        self.stats = {source: SourceStats() for source in sources}
+
+    def remember(self, tweet_id, source, arrived):
+        self.recent[tweet_id] = (source, arrived)
+        if len(self.recent) > self.recent_ids:
+            self.recent.popitem(last=False)
+
+    def seed(self, tweet_ids):
+        """Mark ids already written (e.g. the newest rows of cached_tweets) as seen."""
+        for tweet_id in tweet_ids:
+            self.remember(tweet_id, None, None)
+
+    def arrive(self, tweet, source, arrived=None):
+        """
+        True if this is the first arrival of tweet.id and it should be written.
+        arrived is when the source posted it (message.date), defaulting to now.
+        """
+        arrived = time.time() if arrived is None else arrived
+        stats = self.stats.setdefault(source, SourceStats())
+        if stats.last_arrival is None or arrived > stats.last_arrival:
+            stats.last_arrival = arrived
+        if tweet.created_at:
+            lag = max(0.0, arrived - tweet.created_at)
+            stats.lag_total += lag
+            stats.lag_max = max(stats.lag_max, lag)
+
+        first = self.recent.get(tweet.id)
+        if first is None:
+            stats.wins += 1
+            self.remember(tweet.id, source, arrived)
+            return True
+
+        stats.duplicates += 1
+        if first[1] is not None:
+            behind = arrived - first[1]
+            stats.behind_total += behind
+            stats.behind_max = max(stats.behind_max, behind)
+            stats.behind_count += 1
+        return False
+
+    def forget(self, tweet_id):
+        """Drop a winner whose write failed, so the next copy gets a chance."""
+        self.recent.pop(tweet_id, None)
+
+    def quiet(self, now=None, after=QUIET_AFTER):
+        now = time.time() if now is None else now
+        return [source for source, stats in self.stats.items()
+                if stats.last_arrival is None or now - stats.last_arrival > after]
+
+    def report(self):
+        lines = []
+        for source, stats in self.stats.items():
+            if not stats.arrivals:
+                lines.append(f"{source}: no arrivals")
+                continue
+            line = (f"{source}: {stats.wins} first / {stats.duplicates} duplicate, "
+                    f"lag avg {stats.lag_total / stats.arrivals:.1f}s max {stats.lag_max:.1f}s")
+            if stats.behind_count:
+                line += (f", behind winner avg {stats.behind_total / stats.behind_count:.1f}s "
+                         f"max {stats.behind_max:.1f}s")
+            lines.append(line)
+        return "\n".join(lines)
@@ -0,0 +1,240 @@
+"""
+FloodWait-aware pacing for Telegram requests.
+
+Telethon sleeps through short FloodWaits on its own (flood_sleep_threshold,
+60s by default) and raises FloodWaitError for longer ones, which used to kill a
+backfill half way. RequestScheduler wraps a TelegramClient and takes over both:
+
+- while one of its own requests runs, the client's sleep threshold is 0, so every
+  FloodWait reaches the scheduler and is counted; the client's threshold is
+  restored as soon as no scheduler request is in flight, so client.start() and
+  other direct calls keep Telethon's own short-wait handling
+- history cursors resume after the wait from the last message they yielded, and
+  entity and other coroutine calls are retried
+- the pause between history requests (iter_messages' wait_time) adapts: it doubles
+  on a FloodWait, then shrinks a little after each flood-free page, so the crawl
+  settles at the fastest pace the account is allowed
+- a FloodWait seen by one cursor pauses every cursor sharing the scheduler (the
+  limit is per account, not per cursor)
+- with a PeerCache, usernames are resolved from it instead of ResolveUsername; a
+  cached peer Telegram rejects is forgotten and resolved again once
+
+The scheduler has the client's interface, so it can be passed anywhere a client
+is expected (crawl_sharded, SearchFetch, iter_since, ...):
+
+    client = RequestScheduler(TelegramClient(...))
+    await client.start()
+    async for message in client.iter_messages(channel, limit=50000):
+        ...
+    print(client.summary())     # messages/sec, flood waits, current pacing
+
+Telethon always requests history in pages of 100 messages (the API maximum),
+so pacing is what adapts. Smaller pages would only mean more requests.
+"""
+import asyncio
+import inspect
+import time
+from contextlib import contextmanager
+
+from .peers import is_stale_peer, username_key
+
+PAGE_SIZE = 100                 # messages per history request (Telethon's fixed chunk size)
+MAX_DELAY = 10.0                # slowest pacing between history requests, seconds
+MIN_BACKOFF_DELAY = 0.5         # pacing after the first FloodWait
+SPEEDUP = 0.9                   # pacing multiplier after each flood-free page
+MAX_FLOOD_WAIT = 15 * 60        # longer waits are raised instead of slept through
+
+# Matched by name like ENTITY_KINDS, so the module imports without Telethon installed
+FLOOD_ERRORS = {'FloodWaitError', 'FloodPremiumWaitError', 'SlowModeWaitError'}
+
+
+def flood_wait_seconds(error):
+    """Seconds Telegram asked us to wait, or None if error is not a FloodWait."""
+    if type(error).__name__ in FLOOD_ERRORS:
+        return getattr(error, 'seconds', None)
+    return None
+
+
+class RequestScheduler:
+    """TelegramClient proxy that paces history requests and sleeps through FloodWaits."""
+
+    def __init__(self, client, delay=0.0, max_delay=MAX_DELAY, max_flood_wait=MAX_FLOOD_WAIT, peers=None):
+        self.client = client
+        self.in_flight = 0          # scheduler requests running; the client threshold is 0 while > 0
+        self.saved_threshold = None
+        self.peers = peers          # PeerCache for username -> input peer, if any
+        self.delay = delay
+        self.max_delay = max_delay
+        self.max_flood_wait = max_flood_wait
+        self.resume_at = 0.0        # loop.time() until which every cursor is paused
+        self.started = time.perf_counter()
+        self.messages = 0
+        self.requests = 0
+        self.flood_waits = 0
+        self.flood_seconds = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.client, name)
+        if inspect.iscoroutinefunction(attr):
+            return lambda *args, **kwargs: self.call(attr, *args, **kwargs)
+        return attr
+
+    @contextmanager
+    def own_flood_waits(self):
+        """Zero the client's flood_sleep_threshold for the duration of a scheduler request."""
+        if self.in_flight == 0:
+            self.saved_threshold = self.client.flood_sleep_threshold
+            self.client.flood_sleep_threshold = 0
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            if self.in_flight == 0:
+                self.client.flood_sleep_threshold = self.saved_threshold
+
+    async def wait_turn(self):
+        pause = self.resume_at - asyncio.get_running_loop().time()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    @property
+    def paused_for(self):
+        """Seconds until this account may send requests again."""
+        return max(0.0, self.resume_at - asyncio.get_running_loop().time())
+
+    def note_flood_wait(self, error, seconds):
+        """Count a FloodWait, back off the pacing and pause every cursor; waits over max_flood_wait are raised."""
+        if seconds > self.max_flood_wait:
+            raise error
+        self.flood_waits += 1
+        self.flood_seconds += seconds
+        self.delay = min(self.max_delay, max(self.delay * 2, MIN_BACKOFF_DELAY))
+        self.resume_at = max(self.resume_at, asyncio.get_running_loop().time() + seconds)
+        print(f"   ⏳ FloodWait {seconds}s (#{self.flood_waits}), pacing now {self.delay:.2f}s per request")
+
+    async def flood_wait(self, error, seconds):
+        self.note_flood_wait(error, seconds)
+        await self.wait_turn()
+
+    def page_done(self):
+        self.requests += 1
+        self.delay *= SPEEDUP
+        if self.delay < 0.05:
+            self.delay = 0.0
+
+    async def call(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs), retrying after FloodWaits."""
+        while True:
+            await self.wait_turn()
+            try:
+                with self.own_flood_waits():
+                    result = await fn(*args, **kwargs)
+                self.requests += 1
+                return result
+            except Exception as e:
+                seconds = flood_wait_seconds(e)
+                if seconds is None:
+                    raise
+                await self.flood_wait(e, seconds)
+
+    async def resolve(self, entity):
+        """Input peer for a username from the PeerCache (resolving it once), else entity as given."""
+        if self.peers is None:
+            return entity
+        return await self.peers.resolve(entity, lambda name: self.call(self.client.get_input_entity, name))
+
+    async def call_peer(self, fn, entity, *args, **kwargs):
+        """call() with entity resolved through the PeerCache; a stale cached peer is resolved again once."""
+        try:
+            return await self.call(fn, await self.resolve(entity), *args, **kwargs)
+        except Exception as e:
+            if self.peers is None or not is_stale_peer(e) or username_key(entity) is None:
+                raise
+            self.peers.forget(entity)
+            return await self.call(fn, await self.resolve(entity), *args, **kwargs)
+
+    async def get_messages(self, entity, *args, **kwargs):
+        return await self.call_peer(self.client.get_messages, entity, *args, **kwargs)
+
+    async def get_entity(self, entity):
+        return await self.call_peer(self.client.get_entity, entity)
+
+    async def get_input_entity(self, entity):
+        return await self.call_peer(self.client.get_input_entity, entity)
+
+    async def iter_messages(self, entity, limit=None, **kwargs):
+        """client.iter_messages() that survives FloodWaits; a given wait_time is the minimum pacing."""
+        async for message in resumable_messages(lambda flooded: self, entity, limit, **kwargs):
+            yield message
+
+    @property
+    def rate(self):
+        """Messages per second since the scheduler was created."""
+        elapsed = time.perf_counter() - self.started
+        return self.messages / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.messages} messages in {time.perf_counter() - self.started:.0f}s "
+                f"({self.rate:.1f} msg/s), {self.requests} requests, "
+                f"{self.flood_waits} flood waits ({self.flood_seconds}s), pacing {self.delay:.2f}s")
+
+
+async def resumable_messages(pick, entity, limit=None, **kwargs):
+    """
+    iter_messages() on RequestSchedulers that survives FloodWaits, resuming from the
+    last message yielded. pick(None) chooses the scheduler to start on; after a
+    FloodWait pick(flooded) chooses where to resume: the same one (which sleeps it
+    out) or, in a SessionPool, another account that is not paused.
+    """
+    min_wait = kwargs.pop('wait_time', None) or 0
+    remaining = limit
+    session = pick(None)
+    peer = await session.resolve(entity)
+    retried = False
+    while True:
+        cursor = session.client.iter_messages(peer, limit=remaining, wait_time=max(min_wait, session.delay), **kwargs)
+        last = None
+        fetched = 0             # this cursor's own count: other cursors share session.messages
+        try:
+            while True:
+                # Telethon requests the next page inside __anext__; only that part runs with threshold 0
+                with session.own_flood_waits():
+                    try:
+                        message = await cursor.__anext__()
+                    except StopAsyncIteration:
+                        break
+                last = message
+                fetched += 1
+                session.messages += 1
+                if remaining is not None:
+                    remaining -= 1
+                if fetched % PAGE_SIZE == 0:
+                    session.page_done()
+                # Telethon reads wait_time before each page request, so pacing changes apply mid-cursor
+                cursor.wait_time = max(min_wait, session.delay)
+                await session.wait_turn()
+                yield message
+            return
+        except Exception as e:
+            seconds = flood_wait_seconds(e)
+            if seconds is not None:
+                session.note_flood_wait(e, seconds)
+                moved = pick(session)
+                if moved is not session:
+                    session = moved
+                    peer = await session.resolve(entity)
+                await session.wait_turn()
+            elif peer is not entity and is_stale_peer(e) and not retried:
+                # The cached access_hash belongs to another account (or expired): resolve again
+                session.peers.forget(entity)
+                peer = await session.resolve(entity)
+                retried = True
+            else:
+                raise
+        if remaining is not None and remaining <= 0:
+            return
+        if last is not None:
+            # Resume right after the last message yielded (older one, or newer with reverse=True)
+            kwargs['offset_id'] = last.id
+            kwargs.pop('offset_date', None)
@@ -0,0 +1,50 @@
+"""
+Server-side filtered history fetch for mixed channels.
+
+@elonvitalikalerts posts alerts for several accounts. Instead of downloading every
+message and dropping the non-Elon ones after parsing, ask Telegram to search
+the channel for "elonmusk" (messages.search via iter_messages(search=...)).
+Only candidate messages are then transferred and deserialized.
+
+Server search is a word index, not our parser, so the filtered set is verified:
+    - every returned message is still parsed; mentions that aren't Elon tweets are dropped
+    - verify() re-reads the newest messages unfiltered and returns any Elon tweet
+      the search did not return, so the caller can add it and notice a bad filter
+
+    fetch = SearchFetch(client, 'elonvitalikalerts')
+    async for message in fetch.iter_messages():
+        ...
+    missed = await fetch.verify()
+"""
+from tg_parser import parse_message
+
+ELON_SEARCH = "elonmusk"
+
+# Messages re-read without the filter by verify()
+VERIFY_SAMPLE = 500
+
+
+class SearchFetch:
+    """iter_messages(search=...) over one channel, remembering which message ids it returned."""
+
+    def __init__(self, client, channel, search=ELON_SEARCH):
+        self.client = client
+        self.channel = channel
+        self.search = search
+        self.fetched_ids = set()
+
+    async def iter_messages(self, limit=None, **kwargs):
+        async for message in self.client.iter_messages(self.channel, limit=limit, search=self.search, **kwargs):
+            self.fetched_ids.add(message.id)
+            yield message
+
+    async def verify(self, sample=VERIFY_SAMPLE, parse=parse_message):
+        """Elon tweets among the newest `sample` unfiltered messages that the search skipped."""
+        missed = []
+        async for message in self.client.iter_messages(self.channel, limit=sample):
+            if message.id in self.fetched_ids or not message.message:
+                continue
+            parsed = parse(message)
+            if parsed:
+                missed.append(parsed)
+        return missed
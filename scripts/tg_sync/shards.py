@@ -0,0 +1,124 @@
+"""
+Range-sharded parallel backfill.
+
+A 180-day rebuild normally walks one iter_messages() cursor from newest to
+oldest. Here the window is split into N consecutive time shards. Each shard is
+its own cursor: it starts at offset_date=shard end and stops at the shard
+start. At most `concurrency` shards run at once (4 per account, so a
+SessionPool runs more), and FloodWaits are handled by the client.
+
+Shards are half-open [start, end) ranges that tile the window exactly. Every
+message is filtered against its shard's range, so a message on a boundary
+lands in exactly one shard, whether or not Telegram's offset_date is
+inclusive. Results are stitched newest shard first, which gives the same
+newest-to-oldest order as the sequential walk.
+
+    tweets = await crawl_sharded(client, 'elonvitalikalerts', six_months_ago, now, shards=8)
+
+iter_sharded() yields the same messages unparsed, as shards deliver them, for
+the streaming ingest pipeline.
+"""
+import asyncio
+import time
+from datetime import timezone
+
+from tg_parser import FormatRouter
+
+DEFAULT_CONCURRENCY = 4
+
+
+def time_shards(since, until, count):
+    """count consecutive (start, end) datetime ranges covering [since, until), newest first."""
+    count = max(1, count)
+    step = (until - since) / count
+    bounds = [since + step * i for i in range(count)] + [until]
+    return [(bounds[i], bounds[i + 1]) for i in reversed(range(count))]
+
+
+async def shard_messages(client, channel, start, end, wait_time=None):
+    """Messages of one [start, end) shard, newest first."""
+    async for message in client.iter_messages(channel, offset_date=end, wait_time=wait_time):
+        date = message.date if message.date.tzinfo else message.date.replace(tzinfo=timezone.utc)
+        if date < start:
+            break
+        if date >= end:
+            continue
+        yield message
+
+
+async def crawl_shard(client, channel, start, end, parse, wait_time=None):
+    """(parsed tweets newest first, messages scanned) for one shard."""
+    tweets = []
+    scanned = 0
+    async for message in shard_messages(client, channel, start, end, wait_time):
+        scanned += 1
+        if message.message:
+            parsed = parse(message)
+            if parsed:
+                tweets.append(parsed)
+    return tweets, scanned
+
+
+def default_concurrency(client):
+    """DEFAULT_CONCURRENCY cursors per account (SessionPool.size accounts, else one)."""
+    return DEFAULT_CONCURRENCY * getattr(client, 'size', 1)
+
+
+async def crawl_sharded(client, channel, since, until, shards=8, concurrency=None, parse=None, wait_time=None):
+    """Parsed tweets in [since, until), newest first, crawled as parallel time shards."""
+    router = FormatRouter()
+    parse = parse or (lambda message: router.parse(message, chat=channel))
+    limiter = asyncio.Semaphore(concurrency or default_concurrency(client))
+    ranges = time_shards(since, until, shards)
+
+    async def run(i, start, end):
+        async with limiter:
+            started = time.perf_counter()
+            tweets, scanned = await crawl_shard(client, channel, start, end, parse, wait_time)
+            print(f"   🧩 Shard {i + 1}/{len(ranges)} {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M}: "
+                  f"{scanned} messages, {len(tweets)} tweets ({time.perf_counter() - started:.1f}s)")
+            return tweets, scanned
+
+    results = await asyncio.gather(*(run(i, start, end) for i, (start, end) in enumerate(ranges)))
+
+    stitched = []
+    for tweets, _ in results:
+        stitched.extend(tweets)
+    print(f"   🧵 Stitched {len(ranges)} shards: {sum(scanned for _, scanned in results)} messages, "
+          f"{len(stitched)} tweets")
+    return stitched
+
+
+async def iter_sharded(client, channel, since, until, shards=8, concurrency=None, queue_size=1000, wait_time=None):
+    """
+    Messages in [since, until) from parallel shard cursors, as they arrive (not in
+    date order). Shards block on a bounded queue when the consumer falls behind,
+    which is what the streaming pipeline needs instead of a stitched list.
+    """
+    queue = asyncio.Queue(queue_size)
+    limiter = asyncio.Semaphore(concurrency or default_concurrency(client))
+    ranges = time_shards(since, until, shards)
+    done = object()
+
+    async def run(i, start, end):
+        async with limiter:
+            scanned = 0
+            async for message in shard_messages(client, channel, start, end, wait_time):
+                scanned += 1
+                await queue.put(message)
+            print(f"   🧩 Shard {i + 1}/{len(ranges)} {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M}: "
+                  f"{scanned} messages")
+
+    async def produce():
+        try:
+            await asyncio.gather(*(run(i, start, end) for i, (start, end) in enumerate(ranges)))
+        finally:
+            await queue.put(done)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (message := await queue.get()) is not done:
+            yield message
+        await producer  # re-raise a shard failure
+    finally:
+        producer.cancel()
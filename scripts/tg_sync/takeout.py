@@ -0,0 +1,45 @@
+"""
+Bulk history export through a Telegram takeout session.
+
+Ordinary history requests (messages.getHistory) are the most flood-limited
+path Telegram has, so a six-month re-crawl spends much of its time in
+FloodWaits. A takeout session wraps the same requests in
+invokeWithTakeout. Telegram treats them as a user data export and applies far
+more lenient limits.
+
+takeout_session() opens one on the bare client and yields it wrapped in a
+RequestScheduler, so callers get the usual pacing, FloodWait resume and
+summary(). Everything that accepts a client (iter_messages, since_date,
+crawl_sharded, iter_sharded, IngestPipeline sources) works on it unchanged:
+
+    async with takeout_session(client) as history:
+        async for message in since_date(history.iter_messages(channel, limit=50000), since):
+            ...
+
+The first takeout request on an account may be refused with
+TakeoutInitDelayError. Telegram then asks the user to allow the export from
+another logged-in device, and it can be retried after the given delay.
+Enter the session before changing any data so a refusal costs nothing.
+"""
+from contextlib import asynccontextmanager
+
+from .scheduler import RequestScheduler
+
+# Matched by name like FLOOD_ERRORS, so the module imports without Telethon installed
+TAKEOUT_DELAY_ERROR = 'TakeoutInitDelayError'
+
+
+def takeout_delay_seconds(error):
+    """Seconds until a takeout may be started, or None if error is not a takeout delay."""
+    if type(error).__name__ == TAKEOUT_DELAY_ERROR:
+        return getattr(error, 'seconds', None) or 0
+    return None
+
+
+@asynccontextmanager
+async def takeout_session(client, **kwargs):
+    """RequestScheduler over a takeout session of client (a TelegramClient or RequestScheduler)."""
+    bare = getattr(client, 'client', client)
+    # finalize=True ends the export on exit, successful or not, so the next run can start a fresh one
+    async with bare.takeout(finalize=True, channels=True, **kwargs) as takeout:
+        yield RequestScheduler(takeout, peers=getattr(client, 'peers', None))
@@ -0,0 +1,113 @@
+"""
+Persisted Telethon update state, so a restarted listener only fetches what it missed.
+
+Telethon tracks its position in the update stream as pts/qts/date/seq for the
+account plus a pts per channel, and with catch_up=True it asks Telegram for the
+difference since that position on connect. A SQLite session file keeps the
+state between runs, but a StringSession (CI) keeps it only in memory, so every
+restart would start from "now".
+
+UpdateStateStore keeps the same state in the crawler_state table / JSON file
+(see checkpoints.StateStore):
+
+- before connecting, restore() loads it into the session if the session has none
+- while listening, processed(event) records the channel pts of each handled
+  update, so even a crash resumes right after the last processed message
+- failed(event) holds a channel's pts where it is for the rest of the run, so an
+  update whose write failed is replayed by catch_up on the next start
+- after disconnecting, capture() copies Telethon's own final state (including the
+  account pts/date that drive getDifference)
+
+    updates = UpdateStateStore(StateStore(supabase))
+    client = TelegramClient(session, api_id, api_hash, catch_up=True)
+    updates.restore(client.session)
+    ...
+    @client.on(events.NewMessage(chats=channel))
+    async def handler(event):
+        if handle(event.message):
+            updates.processed(event)
+        else:
+            updates.failed(event)
+    ...
+    updates.capture(client.session)
+    updates.save()
+"""
+import time
+from datetime import datetime, timezone
+
+from .checkpoints import StateStore
+
+UPDATES_KEY = 'updates:telegram_crawler'
+SAVE_EVERY = 30                 # seconds between saves while listening
+ACCOUNT = 0                     # Telethon's entity id for the account-wide state
+
+
+def event_channel(event):
+    """(channel id, update) for a new/edit/delete event; edits carry the message, channel deletions only channel_id."""
+    update = getattr(event, 'original_update', None)
+    message = getattr(update, 'message', None)
+    return getattr(update, 'channel_id', None) or getattr(getattr(message, 'peer_id', None), 'channel_id', None), update
+
+
+def unix(date):
+    if isinstance(date, datetime):
+        return int(date.timestamp())
+    return int(date or 0)
+
+
+class UpdateStateStore:
+    """{entity id: [pts, qts, date, seq]} persisted through a StateStore."""
+
+    def __init__(self, store=None, key=UPDATES_KEY):
+        self.store = store or StateStore()
+        self.key = key
+        self.states = self.store.get(key) or {}
+        self.dirty = False
+        self.saved_at = time.monotonic()
+        self.held = set()       # channels with an unapplied update: their pts must not move this run
+
+    def restore(self, session):
+        """Load the stored state into a Telethon session that has none; returns entries loaded."""
+        if not self.states or any(True for _ in session.get_update_states()):
+            return 0
+        from telethon.tl.types.updates import State
+        for entity_id, (pts, qts, date, seq) in self.states.items():
+            session.set_update_state(int(entity_id), State(
+                pts=pts, qts=qts, date=datetime.fromtimestamp(date, timezone.utc), seq=seq, unread_count=0))
+        return len(self.states)
+
+    def update(self, entity_id, pts, qts=0, date=0, seq=0):
+        entity_id = str(entity_id)
+        if entity_id in self.held:
+            return
+        current = self.states.get(entity_id)
+        # Never move backwards: a state captured at disconnect can be older than a processed event
+        if current is None or pts > current[0] or (entity_id == str(ACCOUNT) and unix(date) > current[2]):
+            self.states[entity_id] = [pts, qts, unix(date), seq]
+            self.dirty = True
+
+    def processed(self, event):
+        """Record the channel pts of a handled new/edit/delete event; saves at most every SAVE_EVERY seconds."""
+        channel_id, update = event_channel(event)
+        pts = getattr(update, 'pts', None)
+        if pts and channel_id:
+            self.update(channel_id, pts, date=getattr(getattr(update, 'message', None), 'date', 0))
+        if time.monotonic() - self.saved_at >= SAVE_EVERY:
+            self.save()
+
+    def failed(self, event):
+        """An event that was not applied: keep its channel's stored pts so the next catch_up replays it."""
+        channel_id, _ = event_channel(event)
+        if channel_id:
+            self.held.add(str(channel_id))
+
+    def capture(self, session):
+        """Copy Telethon's saved state (written to the session on disconnect): (entity id, State) pairs."""
+        for entity_id, state in session.get_update_states():
+            self.update(entity_id, state.pts, state.qts, state.date, state.seq)
+
+    def save(self):
+        if self.dirty:
+            self.store.set(self.key, self.states)
+            self.dirty = False
+        self.saved_at = time.monotonic()
@@ -22,6 +22,26 @@ export function getClient(): SupabaseClient | null {
     return _client;
 }
 
+// =============================================
+// TWEET ROWS
+// =============================================
+
+// cached_tweets.raw_data.type is mixed: rows written by the Python crawlers since
+// scripts/tg_parser hold an int code (see tg_parser/tweet_types.py TweetType), older
+// rows and rows saved by saveCachedTweets hold the string label.
+const TWEET_TYPE_LABELS = ['unknown', 'original', 'reply', 'retweet', 'quote'];
+
+export function tweetTypeLabel(type: number | string | undefined): string | undefined {
+    if (typeof type === 'number') return TWEET_TYPE_LABELS[type] || 'unknown';
+    return type;
+}
+
+/** raw_data fields of a cached_tweets row, with type normalized to its string label */
+export function rawTweetData(rawData: Record<string, any> | null | undefined): Record<string, any> {
+    if (!rawData) return {};
+    return { ...rawData, type: tweetTypeLabel(rawData.type) };
+}
+
 // =============================================
 // CACHE COUNT OPERATIONS
 // =============================================
@@ -232,7 +252,7 @@ export async function getCachedTweets(periodStart: number, limit: number = 100):
             text: row.text || '',
             msg: row.msg || '',
             timestamp: row.created_at || 0,
-            ...(row.raw_data || {})
+            ...rawTweetData(row.raw_data)
         }));
     } catch (error) {
         console.error('[Cache] getCachedTweets error:', error);
@@ -267,7 +287,7 @@ export async function getAllCachedTweets(limit: number = 1000): Promise<Tweet[]>
             text: row.text || '',
             msg: row.msg || '',
             timestamp: row.created_at || 0,
-            ...(row.raw_data || {})
+            ...rawTweetData(row.raw_data)
         }));
     } catch (error) {
         console.error('[Cache] getAllCachedTweets error:', error);
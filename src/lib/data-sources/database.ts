@@ -1,5 +1,5 @@
 import { DataSource, DataSourceConfig, Tweet, TweetStatus, TweetStatusRawResponse } from './index';
-import { getClient } from '../cache';
+import { getClient, rawTweetData } from '../cache';
 
 /**
  * LocalDatabaseDataSource
@@ -66,7 +66,7 @@ class LocalDatabaseDataSource implements DataSource {
                 timestamp: row.created_at, // Explicitly map to timestamp
                 created_at: row.created_at,
                 is_reply: row.is_reply,
-                ...row.raw_data
+                ...rawTweetData(row.raw_data)
             }));
         } catch (error) {
             console.error('[DatabaseDS] getTweets exception:', error);
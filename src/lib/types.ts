@@ -6,7 +6,7 @@ export interface Tweet {
     msg?: string; // API uses 'msg' for tweet content
     baseid?: string; // API uses lowercase 'baseid'
     jishu?: number;
-    type?: string;
+    type?: string; // label; int codes in cached_tweets.raw_data are mapped by rawTweetData
     action?: string;
     xid?: string; // Added field seen in API response
 }
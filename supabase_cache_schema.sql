@@ -57,3 +57,17 @@ CREATE INDEX IF NOT EXISTS idx_heatmap_date_str ON cached_heatmap(date_str);
 -- RLS for heatmap
 ALTER TABLE cached_heatmap ENABLE ROW LEVEL SECURITY;
 CREATE POLICY "Allow all on cached_heatmap" ON cached_heatmap FOR ALL USING (true) WITH CHECK (true);
+
+-- =============================================
+-- CRAWLER STATE (key/value)
+-- Per-channel checkpoints ("checkpoint:<channel>" -> {"max_id": 123})
+-- so crawlers running on ephemeral CI runners only fetch new messages
+-- =============================================
+CREATE TABLE IF NOT EXISTS crawler_state (
+    key TEXT PRIMARY KEY,
+    value JSONB NOT NULL,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE crawler_state ENABLE ROW LEVEL SECURITY;
+CREATE POLICY "Allow all on crawler_state" ON crawler_state FOR ALL USING (true) WITH CHECK (true);